@@ -32,7 +32,7 @@ classifiers = [
     'Programming Language :: Python :: 3.6',
     'Topic :: Scientific/Engineering']
 package_data = {
-    'tulip.spec': ['parsetab.py']}
+    'tulip.spec': ['ltl_lextab.py', 'ltl_parsetab.py']}
 
 
 def git_version(version):
@@ -59,15 +59,11 @@ def git_version(version):
 
 def run_setup():
     """Build parser, get version from `git`, install."""
-    # Build PLY table, to be installed as tulip package data
+    # Build PLY tables, to be installed as tulip package data
     try:
         import tulip.spec.lexyacc
-        tabmodule = tulip.spec.lexyacc.TABMODULE.split('.')[-1]
         outputdir = 'tulip/spec'
-        parser = tulip.spec.lexyacc.Parser()
-        parser.build(tabmodule, outputdir=outputdir,
-                     write_tables=True,
-                     debug=True, debuglog=logger)
+        tulip.spec.lexyacc.generate_tables(outputdir, debuglog=logger)
         plytable_build_failed = False
     except Exception as e:
         print('Failed to build PLY tables: {e}'.format(e=e))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""Tests for solving batches of specifications in parallel."""
+import logging
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+from nose.tools import assert_raises
+from tulip.spec import GRSpec, translate
+from tulip.interfaces import SynthesisStats
+from tulip.interfaces.batch import BatchSolver
+
+
+logging.getLogger('tulip.spec.lexyacc').setLevel(logging.WARNING)
+
+# Stands in for `gr1c`: realizable unless `SYSINIT` is false.
+# The strategy is that of `gr1cint_test.REFERENCE_AUTJSON_smallbool`.
+STAND_IN = r'''#!{python}
+import sys
+s = sys.stdin.read()
+assert 'SYS: y;' in s, s
+if 'SYSINIT: (False);' in s:
+    sys.exit(1)
+if '-r' in sys.argv:
+    sys.exit(0)
+assert sys.argv[-2:] == ['-t', 'json'], sys.argv
+print("""{{"version": 1,
+ "ENV": [{{"x": "boolean"}}],
+ "SYS": [{{"y": "boolean"}}],
+ "nodes": {{
+"0": {{"state": [0, 0], "mode": 0, "rgrad": 1,
+      "initial": false, "trans": ["1"]}},
+"1": {{"state": [1, 1], "mode": 1, "rgrad": 1,
+      "initial": false, "trans": ["0"]}},
+"2": {{"state": [0, 1], "mode": 0, "rgrad": 1,
+      "initial": true, "trans": ["1"]}}
+}}}}""")
+'''
+# Stands in for `gr1c`: realizable if the input is
+# one of the files in the directory `{dirname}`.
+MATCH_STAND_IN = r'''#!{python}
+import os
+import sys
+s = sys.stdin.read()
+for name in os.listdir({dirname!r}):
+    with open(os.path.join({dirname!r}, name)) as f:
+        if f.read() == s:
+            sys.exit(0)
+sys.exit(1)
+'''
+# Stand in for the `slugs` compiler, and for `slugs`,
+# which is realizable unless `SYS_INIT` is false.
+COMPILER_STAND_IN = r'''#!{python}
+import sys
+with open(sys.argv[1]) as f:
+    sys.stdout.write(f.read())
+'''
+SLUGS_STAND_IN = r'''#!{python}
+import sys
+with open(sys.argv[1]) as f:
+    s = f.read()
+assert '[OUTPUT]\ny\n' in s, s
+if '[SYS_INIT]\nFALSE' in s:
+    sys.stderr.write('Specification is unrealizable')
+else:
+    sys.stderr.write('Specification is realizable')
+'''
+
+
+class batch_test(object):
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        path = write_script(self.dirname, 'gr1c', STAND_IN)
+        self.batch = BatchSolver('gr1c', processes=2, path=path)
+
+    def tearDown(self):
+        self.batch.close()
+        shutil.rmtree(self.dirname)
+
+    def test_check_realizable(self):
+        stats = SynthesisStats()
+        assert self.batch.check_realizable(spec(), stats=stats)
+        assert not self.batch.check_realizable(spec({'False'}))
+        assert stats.solver == 'gr1c', stats
+        assert stats.translation_time >= 0, stats
+        assert stats.solver_wall_time >= 0, stats
+
+    def test_synthesize(self):
+        g = self.batch.synthesize(spec())
+        assert len(g) == 3, g.nodes()
+        assert g.node['2']['state'] == dict(x=0, y=1), g.node['2']
+        assert g.has_edge('2', '1'), g.edges()
+        assert self.batch.synthesize(spec({'False'})) is None
+
+    def test_map(self):
+        specs = [spec(), spec({'False'})] * 4
+        r = self.batch.map_check_realizable(specs)
+        assert r == [True, False] * 4, r
+        strategies = self.batch.map_synthesize(specs)
+        assert [g is None for g in strategies] == [False, True] * 4
+        for g in strategies[::2]:
+            assert len(g) == 3, g.nodes()
+
+    def test_map_stats(self):
+        stats = SynthesisStats()
+        specs = [spec(), spec({'False'})] * 2
+        strategies = self.batch.map_synthesize(specs, stats=stats)
+        assert len(strategies) == 4, strategies
+        assert stats.solver == 'gr1c', stats
+        assert stats.translation_time >= 0, stats
+        assert stats.solver_wall_time >= 0, stats
+        assert stats.solver_cpu_time >= 0, stats
+        assert stats.conversion_time >= 0, stats
+
+    def test_close(self):
+        self.batch.close()
+        assert_raises(ValueError, self.batch.synthesize, spec())
+        self.batch.close()
+
+
+def test_translation_matches_serial():
+    dirname = tempfile.mkdtemp()
+    expected = os.path.join(dirname, 'expected')
+    os.mkdir(expected)
+    try:
+        for i, s in enumerate(formula_specs()):
+            with open(os.path.join(expected, str(i)), 'w') as f:
+                f.write(translate(s, 'gr1c'))
+        path = os.path.join(dirname, 'gr1c')
+        with open(path, 'w') as f:
+            f.write(MATCH_STAND_IN.format(
+                python=sys.executable, dirname=expected))
+        os.chmod(path, stat.S_IRWXU)
+        # new specs, so that no clause is parsed yet
+        specs = formula_specs()
+        with BatchSolver('gr1c', processes=8, path=path) as batch:
+            r = batch.map_check_realizable(specs)
+        assert r == [True] * len(specs), r
+    finally:
+        shutil.rmtree(dirname)
+
+
+def formula_specs(n=40):
+    return [
+        GRSpec(
+            env_vars=dict(x=(0, 10)), sys_vars=dict(y=(0, 10)),
+            env_init=['x = {i}'.format(i=i % 10)],
+            sys_safety=[
+                "((x' > {i}) & (y < 5)) -> (y' = x)".format(i=i),
+                '(x <= {i}) | ((y >= 1) & !(x = y))'.format(i=i)],
+            sys_prog=[
+                'y = {i}'.format(i=i % 10),
+                '(x > 2) <-> (y < 8)'],
+            moore=False, plus_one=False, qinit='\A \E')
+        for i in range(n)]
+
+
+def test_slugs():
+    dirname = tempfile.mkdtemp()
+    try:
+        path = write_script(dirname, 'slugs', SLUGS_STAND_IN)
+        compiler = write_script(dirname, 'compiler.py', COMPILER_STAND_IN)
+        with BatchSolver('slugs', processes=2, path=path,
+                         slugs_compiler_path=compiler) as batch:
+            specs = [spec(), spec({'False'})] * 2
+            r = batch.map_check_realizable(specs)
+            assert r == [True, False] * 2, r
+    finally:
+        shutil.rmtree(dirname)
+
+
+def test_unknown_solver():
+    assert_raises(ValueError, BatchSolver, 'omega')
+
+
+def write_script(dirname, name, text):
+    path = os.path.join(dirname, name)
+    with open(path, 'w') as f:
+        f.write(text.format(python=sys.executable))
+    os.chmod(path, stat.S_IRWXU)
+    return path
+
+
+def spec(sys_init=tuple()):
+    return GRSpec(
+        env_vars={'x'}, sys_vars={'y'}, sys_init=sys_init,
+        moore=False, plus_one=False, qinit='\A \E')
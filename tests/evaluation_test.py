@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Tests for compiling formulas to python functions."""
+import logging
+logging.basicConfig(level=logging.ERROR)
+import nose.tools as nt
+import numpy as np
+from tulip.spec import GRSpec
+from tulip.spec import evaluation as ev
+from tulip.spec.parser import parse
+
+
+def test_to_expression():
+    t = parse("(x = 1) -> X (x = 2) & !b")
+    e = ev.to_expression(t)
+    assert e == ("((not (s['x'] == 1)) or "
+                 "((t['x'] == 2) and (not s['b'])))"), e
+    e = ev.to_expression(parse('loc = "a"'), vectorize=True)
+    assert e == "(s['loc'] == 'a')", e
+
+
+def test_compile_formula():
+    f = ev.compile_formula("(x = 1) -> X (x = 2) & !b")
+    assert f(dict(x=1, b=False), dict(x=2, b=True))
+    assert not f(dict(x=1, b=True), dict(x=2))
+    assert f(dict(x=0, b=True))
+    f = ev.compile_formula('(ite x = 1, y = x + 1, y = x - 1)')
+    assert f(dict(x=1, y=2))
+    assert f(dict(x=3, y=2))
+    assert not f(dict(x=3, y=4))
+    f = ev.compile_formula('True')
+    assert f(dict())
+    nt.assert_raises(ValueError, ev.compile_formula, '[] a')
+    nt.assert_raises(ValueError, ev.compile_formula, 'X X a')
+
+
+def test_compile_formula_vectorized():
+    f = ev.compile_formula("(x = 1) -> X (x = 2) & !b", vectorize=True)
+    s = dict(x=np.array([1, 1, 0]), b=np.array([False, True, True]))
+    t = dict(x=np.array([2, 2, 5]))
+    r = f(s, t)
+    assert r.tolist() == [True, False, True], r
+    f = ev.compile_formula('True', vectorize=True)
+    assert f(s).tolist() == [True, True, True]
+
+
+def test_compile_part():
+    spec = GRSpec(
+        sys_vars={'loc': ['a', 'b'], 'x': (0, 3)},
+        sys_init=['loc = "a"'],
+        sys_safety=['loc = "a" -> X (loc = "b")', 'x < 3'])
+    f = ev.compile_part(spec, 'sys_safety')
+    assert f(dict(loc='a', x=1), dict(loc='b'))
+    assert not f(dict(loc='a', x=1), dict(loc='a'))
+    assert not f(dict(loc='b', x=3), dict(loc='a'))
+    f = ev.compile_part(spec, 'sys_safety', no_str=True)
+    assert f(dict(loc=0, x=1), dict(loc=1))
+    assert not f(dict(loc=0, x=1), dict(loc=0))
+    # empty part
+    f = ev.compile_part(spec, 'env_init')
+    assert f(dict())
+    f = ev.compile_part(spec, 'sys_init', vectorize=True)
+    r = f(dict(loc=np.array(['a', 'b', 'a'])))
+    assert r.tolist() == [True, False, True], r
+    nt.assert_raises(ValueError, ev.compile_part, spec, 'sys_init_')
@@ -97,6 +97,37 @@ class GRSpec_test(object):
         g.env_vars["x"] = (0, 3)
         nt.assert_raises(ValueError, self.f.__or__, g)
 
+    def test_ior(self):
+        g = GRSpec(env_vars={"z"}, env_prog=["!z"])
+        self.f.ast('y&&!x')
+        g.ast('!z')
+        h = self.f
+        h |= g
+        assert h is self.f
+        assert 'z' in h.env_vars
+        assert h.env_prog == ["!x", "x", "!z"], h.env_prog
+        # cached AST reused
+        assert h._ast['!z'] is g._ast['!z']
+        assert g.env_prog == ["!z"], g.env_prog
+        # Domain mismatch leaves `self` unchanged
+        g = GRSpec(sys_vars={"y": (0, 5)}, sys_safety=["y = 1"])
+        with nt.assert_raises(ValueError):
+            h |= g
+        assert h.sys_safety == ["y"], h.sys_safety
+
+    def test_copy(self):
+        t = self.f.ast('y&&!x')
+        g = self.f.copy()
+        assert GR1specs_equal(g, self.f)
+        # cached AST shared
+        assert g._ast['y&&!x'] is t
+        # changes to the copy leave the original unchanged
+        g.sys_safety.append('!y')
+        g.env_vars['w'] = 'boolean'
+        assert self.f.sys_safety == ['y'], self.f.sys_safety
+        assert 'w' not in self.f.env_vars
+        assert g.input_variables is g.env_vars
+
     def test_to_canon(self):
         # Fragile!
         assert (self.f.to_canon() ==
@@ -168,6 +199,20 @@ def test_str_to_int():
     assert s._bool_int[x] == "( ( X a ) = 0 )"
 
 
+def test_cache_garbage():
+    s = GRSpec(sys_vars={'a': ['x', 'y']}, sys_safety=['a = "x"'])
+    s.ast('a = "x"')
+    # replaced clauses are collected eventually
+    for i in range(10):
+        s.sys_safety = ['a = "x" | {i} = 1'.format(i=j) for j in range(i)]
+        s.parse()
+    assert len(s._ast) <= 4 * len(s.sys_safety), len(s._ast)
+    s.sys_safety = ['a = "x"']
+    s.str_to_int()
+    d = s.sub_values({'a': 'y'})
+    assert set(d) == {'a = "x"', '( a = 0 )'}, d
+
+
 def test_compile_init():
     env_vars = {'x': (0, 0), 'y': (0, 0), 'z': (0, 1)}
     sys_vars = {'w': (0, 0)}
@@ -52,6 +52,89 @@ def test_split_gr1():
         gr1.split_gr1('[]<> ( x & (X y) )')
 
 
+def test_split_gr1_deep():
+    # deeper than the recursion limit
+    n = 2000
+    f = '[]<>(' + ' | '.join('x{i}'.format(i=i) for i in range(n)) + ')'
+    t = parser.parse(f, parser='pratt')
+    d = gr1.split_gr1(t)
+    (s,) = d['GF']
+    assert s.count('x') == n, s
+    assert s.endswith('| x1998 ) | x1999 )'), s[-40:]
+
+
+def test_temporal_classes():
+    t = parser.parse('x & [](X y) & <>z')
+    c = gr1.temporal_classes(t)
+    (u, v), w = t.operands[0].operands, t.operands[1]
+    assert c[u] == gr1.STATE, c
+    assert c[v] == gr1.TEMPORAL, c
+    assert c[v.operands[0]] == gr1.NEXT, c
+    assert c[w] == gr1.TEMPORAL, c
+    assert c[t] == gr1.TEMPORAL, c
+
+
+def test_str_to_grspec():
+    f = '(x & []<>x) -> ([]y & [](y -> X !y) & []<>!y)'
+    s = gr1.str_to_grspec(f)
+    assert s.env_init == ['x'], s.env_init
+    assert s.env_safety == [], s.env_safety
+    assert s.env_prog == ['x'], s.env_prog
+    assert s.sys_init == [], s.sys_init
+    assert s.sys_safety == ['y', '( y -> ( X ( ! y ) ) )'], s.sys_safety
+    assert s.sys_prog == ['( ! y )'], s.sys_prog
+    # clauses are not parsed again
+    trees = dict(s._unchecked_ast)
+    for x in s.sys_safety:
+        assert x in trees, x
+        assert trees[x].flatten() == x
+    s.env_vars = dict(x='boolean')
+    s.sys_vars = dict(y='boolean')
+    s.parse()
+    for x in s.sys_safety:
+        assert s.ast(x) is trees[x], x
+    assert not s._unchecked_ast, s._unchecked_ast
+
+
+def test_str_to_grspec_undefined():
+    f = 'x & []<>x -> []y & []<>(y & z)'
+    s = gr1.str_to_grspec(f)
+    s.env_vars = dict(x='boolean')
+    s.sys_vars = dict(y='boolean')
+    with assert_raises(ValueError):
+        s.parse()
+
+
+def test_check():
+    gr1.check('(a U b) & []a')
+    gr1.check('[]<>(<>z)')
+    with assert_raises(Exception):
+        gr1.check('<>[]a')
+
+
+def test_check_does_not_render_subtrees():
+    # rendering each visited subtree made `check` quadratic
+    f = ' & '.join('[](x{i} -> X y{i})'.format(i=i) for i in range(50))
+    cls = spec.ast.nodes.Operator
+    calls = list()
+    str_ = cls.__str__
+
+    def counting_str(self, *arg, **kw):
+        calls.append(self)
+        return str_(self, *arg, **kw)
+
+    logger = logging.getLogger(gr1.__name__)
+    level = logger.level
+    logger.setLevel(logging.DEBUG)
+    cls.__str__ = counting_str
+    try:
+        gr1.check(f)
+    finally:
+        cls.__str__ = str_
+        logger.setLevel(level)
+    assert not calls, len(calls)
+
+
 def test_has_operator():
     t = parser.parse(' [](x & y) ')
     g = transformation.Tree.from_recursive_ast(t)
@@ -9,6 +9,7 @@ from nose.tools import assert_raises
 import os
 from tulip.spec import GRSpec, translate
 from tulip.interfaces import gr1py
+from tulip.interfaces import SynthesisStats
 
 
 class basic_test(object):
@@ -65,3 +66,15 @@ class basic_test(object):
         assert len(g.env_vars) == 0
         assert len(g.sys_vars) == 1 and 'y' in g.sys_vars
         assert len(g) == 2, [g.nodes(data=True), g.edges(data=True)]
+
+    def test_synthesize_stats(self):
+        stats = SynthesisStats()
+        g = gr1py.synthesize(self.dcounter, stats=stats)
+        assert g is not None
+        assert stats.solver_wall_time >= 0, stats
+        # dumping and loading the strategy is conversion
+        assert stats.conversion_time >= 0, stats
+        stats = SynthesisStats()
+        assert gr1py.synthesize(self.f_un, stats=stats) is None
+        assert stats.solver_wall_time >= 0, stats
+        assert stats.conversion_time is None, stats
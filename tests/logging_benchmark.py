@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Time of debug logging in the construction of transition systems.
+
+Run as a script, with the number of states as argument:
+
+    python logging_benchmark.py 2000
+
+Each task runs with the C{tulip} loggers at level C{WARNING},
+when debug messages are not formatted, and at level C{DEBUG},
+with a handler that discards the records, when they are.
+The difference is the time spent formatting messages.
+"""
+from __future__ import print_function
+import argparse
+import logging
+import time
+
+from tulip import synth
+from tulip import transys as trs
+from tulip.transys import products
+
+
+def build_fts(n, actions=True):
+    """Return FTS with C{n} states on a ring, with labeled states.
+
+    @param actions: if C{True}, then label edges with system actions
+    """
+    ts = trs.FTS()
+    ts.atomic_propositions.add_from({'p', 'q'})
+    ts.sys_actions.add_from({'a', 'b'})
+    ts.states.add_from(range(n))
+    ts.states.initial.add(0)
+    for i in range(n):
+        ts.states[i]['ap'] = {'p'} if i % 3 else {'q'}
+        if actions:
+            ts.transitions.add(i, (i + 1) % n, sys_actions='a')
+            ts.transitions.add(i, (i + 7) % n, sys_actions='b')
+        else:
+            ts.transitions.add_from([(i, (i + 1) % n), (i, (i + 7) % n)])
+    return ts
+
+
+def build_ba():
+    """Return Buchi automaton for C{[]<>q}."""
+    ba = trs.BA()
+    ba.atomic_propositions.add_from({'p', 'q'})
+    ba.states.add_from({0, 1})
+    ba.states.initial.add(0)
+    ba.states.accepting.add(1)
+    for u in (0, 1):
+        ba.transitions.add(u, 0, letter={'p'})
+        ba.transitions.add(u, 1, letter={'q'})
+    return ba
+
+
+def benchmark(n):
+    """Print time of each task with and without debug messages."""
+    ts = build_fts(n)
+    unlabeled = build_fts(n, actions=False)
+    ba = build_ba()
+    tasks = [
+        ('FTS construction', lambda: build_fts(n)),
+        ('ts_ba_sync_prod',
+         lambda: products.ts_ba_sync_prod(unlabeled, ba)),
+        ('sys_to_spec', lambda: synth.sys_to_spec(ts, False, 'loc'))]
+    logger = logging.getLogger('tulip')
+    handler = logging.NullHandler()
+    logger.addHandler(handler)
+    print('{n} states'.format(n=n))
+    try:
+        for name, task in tasks:
+            times = dict()
+            for level in (logging.WARNING, logging.DEBUG):
+                logger.setLevel(level)
+                t0 = time.time()
+                task()
+                times[level] = time.time() - t0
+            print((
+                '{name}: {w:.3f} sec at WARNING, '
+                '{d:.3f} sec at DEBUG ({r:.1f}x)').format(
+                    name=name, w=times[logging.WARNING],
+                    d=times[logging.DEBUG],
+                    r=times[logging.DEBUG] / times[logging.WARNING]))
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument('n', type=int, nargs='?', default=2000,
+                   help='number of states')
+    args = p.parse_args()
+    benchmark(args.n)
+
+
+if __name__ == '__main__':
+    main()
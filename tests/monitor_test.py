@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Tests for the runtime monitor of GR(1) specifications."""
+import logging
+logging.basicConfig(level=logging.ERROR)
+import nose.tools as nt
+from tulip.spec import GRSpec
+from tulip.spec.monitor import Monitor
+
+
+def _spec():
+    return GRSpec(
+        env_vars={'x'}, sys_vars={'y': (0, 3)},
+        env_init=['x'], sys_init=['y = 0'],
+        env_safety=["x -> ! X x"],
+        sys_safety=["(y' = y + 1) | (y' = 0)"],
+        env_prog=['x'], sys_prog=['y = 2'])
+
+
+def test_monitor_step():
+    m = Monitor(_spec())
+    assert m.init(dict(x=True, y=0)) == []
+    assert m.step(dict(x=False, y=1)) == []
+    assert m.step(dict(y=2)) == []
+    # `y` unchanged
+    r = m.step(dict(x=True))
+    assert r == [('sys_safety', "(y' = y + 1) | (y' = 0)")], r
+    assert not m.env_violated
+    assert m.sys_violated
+    # `x` stays true
+    r = m.step(dict(x=True, y=0))
+    assert r == [('env_safety', "x -> ! X x")], r
+    assert m.env_violated
+    assert m.step(dict(x=False)) == []
+    assert m.n == 5
+    assert m.violations == [
+        (3, 'sys_safety', "(y' = y + 1) | (y' = 0)"),
+        (4, 'env_safety', "x -> ! X x")], m.violations
+
+
+def test_monitor_init():
+    m = Monitor(_spec())
+    r = m.init(dict(x=False, y=1))
+    assert set(r) == {('env_init', 'x'), ('sys_init', 'y = 0')}, r
+    assert m.env_violated
+    assert m.sys_violated
+    # initial conditions are not evaluated again by `step`
+    assert m.step(dict(x=True, y=2)) == []
+    assert m.step(dict(x=False, y=3)) == []
+    assert m._false == set(), m._false
+    assert m.n == 2, m.n
+    m = Monitor(_spec())
+    with nt.assert_raises(ValueError):
+        m.step(dict(x=True))
+
+
+def test_monitor_progress():
+    m = Monitor(_spec())
+    m.init(dict(x=True, y=0))
+    assert m.counts == dict(env_prog=[1], sys_prog=[0]), m.counts
+    assert m.last == dict(env_prog=[0], sys_prog=[None]), m.last
+    m.step(dict(x=False, y=1))
+    m.step(dict(y=2))
+    m.step(dict(x=True, y=0))
+    m.step(dict(y=1))
+    assert m.counts == dict(env_prog=[3], sys_prog=[1]), m.counts
+    assert m.last == dict(env_prog=[4], sys_prog=[2]), m.last
@@ -8,6 +8,7 @@ import logging
 
 from tulip.spec import form
 from tulip.interfaces import omega as omega_int
+from tulip.interfaces import SynthesisStats
 
 from omega_interface_test import grspec_1
 
@@ -35,3 +36,13 @@ def test_is_circular_cudd():
     f.sys_prog = ['y']
     triv = omega_int.is_circular(f, use_cudd=True)
     assert triv, triv
+
+
+def test_synthesis_cudd_options():
+    sp = grspec_1()
+    opt = dict(reordering=False, max_memory=2 * 1024**3)
+    stats = SynthesisStats()
+    h = omega_int.synthesize_enumerated_streett(
+        sp, use_cudd=True, bdd_options=opt, stats=stats)
+    assert h is not None
+    assert stats.bdd_peak_nodes >= stats.bdd_nodes, stats
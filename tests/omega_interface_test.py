@@ -5,6 +5,7 @@ import networkx as nx
 
 from tulip.spec import form
 from tulip.interfaces import omega as omega_int
+from tulip.interfaces import SynthesisStats
 from tulip import synth
 
 
@@ -102,6 +103,52 @@ def test_synthesis_strings():
     assert r == dict(y='a'), r
 
 
+def test_synthesis_symbolic():
+    sp = grspec_4()
+    ctrl = omega_int.synthesize_symbolic_streett(sp)
+    assert ctrl is not None
+    assert set(ctrl.inputs) == {'x'}, ctrl.inputs
+    assert set(ctrl.outputs) == {'y'}, ctrl.outputs
+    # same reactions as the enumerated strategy
+    u = 'Sinit'
+    u, r = ctrl.reaction(u, dict(x=0))
+    assert r == dict(y='a'), r
+    u, r = ctrl.reaction(u, dict(x=2))
+    assert r == dict(y='b'), r
+    u, r = ctrl.reaction(u, dict(x=1))
+    assert r == dict(y='b'), r
+    u, r = ctrl.reaction(u, dict(x=0))
+    assert r == dict(y='a'), r
+    assert u['x'] == 0, u
+    # outside the domain of `x`
+    nt.assert_raises(ValueError, ctrl.reaction, u, dict(x=3))
+    nt.assert_raises(ValueError, ctrl.reaction, u, dict())
+
+
+def test_synthesis_symbolic_qinit():
+    sp = grspec_4()
+    sp.qinit = r'\A \E'
+    sp.env_init = ['x = 0']
+    sp.sys_init = ['y = "a"']
+    ctrl = omega_int.synthesize_symbolic_streett(sp)
+    assert ctrl is not None
+    assert ctrl.qinit == r'\A \E', ctrl.qinit
+    u, r = ctrl.reaction('Sinit', dict(x=0))
+    assert r == dict(y='a'), r
+    # the system would pick initial values
+    for qinit in (r'\E \A', r'\E \E'):
+        sp.qinit = qinit
+        nt.assert_raises(
+            ValueError, omega_int.synthesize_symbolic_streett, sp)
+
+
+def test_synthesis_symbolic_unrealizable():
+    sp = grspec_0()
+    sp.sys_prog = ['False']
+    ctrl = omega_int.synthesize_symbolic_streett(sp)
+    assert ctrl is None, ctrl
+
+
 def test_synthesis_moore():
     sp = grspec_2()
     h = omega_int.synthesize_enumerated_streett(sp)
@@ -132,6 +179,37 @@ def test_synthesis_unrealizable():
     assert h is None, h
 
 
+def test_init_bdd_fallback():
+    bdd = omega_int._init_bdd(None)
+    if omega_int.cudd is None:
+        assert isinstance(bdd, omega_int._bdd.BDD), bdd
+    else:
+        assert isinstance(bdd, omega_int.cudd.BDD), bdd
+    bdd = omega_int._init_bdd(False, dict(max_nodes=10**6))
+    assert isinstance(bdd, omega_int._bdd.BDD), bdd
+    assert bdd.max_nodes == 10**6, bdd.max_nodes
+
+
+def test_synthesis_stats():
+    sp = grspec_0()
+    stats = SynthesisStats()
+    h = omega_int.synthesize_enumerated_streett(
+        sp, use_cudd=False, stats=stats)
+    assert h is not None
+    assert stats.bdd_nodes > 0, stats
+    assert stats.translation_time >= 0, stats
+    assert stats.solver_wall_time >= 0, stats
+    assert stats.solver_cpu_time >= 0, stats
+    # enumeration is conversion, not solving
+    assert stats.conversion_time >= 0, stats
+    stats = SynthesisStats()
+    r = omega_int.is_realizable(sp, use_cudd=False, stats=stats)
+    assert r
+    assert stats.bdd_nodes > 0, stats
+    assert stats.solver_wall_time >= 0, stats
+    assert stats.conversion_time is None, stats
+
+
 def test_is_circular_true():
     f = form.GRSpec()
     f.sys_vars['y'] = 'bool'
@@ -150,6 +228,48 @@ def test_is_circular_false():
     assert not triv, triv
 
 
+def test_realizability_session_guarantees():
+    sp = grspec_0()
+    s = omega_int.RealizabilitySession(sp)
+    assert s.is_realizable()
+    # no effect on the winning set
+    s.add(env_init='x')
+    assert s._win is not None
+    assert s.is_realizable()
+    # warm start from previous winning set
+    s.add(sys_safety="y'")
+    assert s._bound is not None
+    r = s.is_realizable()
+    sp.sys_safety.append("y'")
+    assert r == omega_int.is_realizable(sp), r
+    assert not r
+    # the given spec is not modified
+    assert s.spec.sys_safety == sp.sys_safety, s.spec.sys_safety
+
+
+def test_realizability_session_assumptions():
+    sp = form.GRSpec()
+    sp.moore = False
+    sp.env_vars = dict(x='boolean')
+    sp.sys_vars = dict(y='boolean')
+    sp.sys_safety = ["y' <-> x'"]
+    sp.sys_prog = ['y']
+    s = omega_int.RealizabilitySession(sp)
+    assert not s.is_realizable()
+    s.add(env_prog=['x'])
+    assert s._bound is None
+    assert s.is_realizable()
+    s.add(sys_prog='!y')
+    assert not s.is_realizable()
+    s.add(env_prog='!x')
+    assert s.is_realizable()
+    assert len(s.aut.win['<>[]']) == 2, s.aut.win
+    nt.assert_raises(ValueError, s.add, sys_liveness='y')
+    # no part is changed if some part is unknown
+    nt.assert_raises(ValueError, s.add, sys_prog='y', sys_liveness='y')
+    assert s.spec.sys_prog == ['y', '!y'], s.spec.sys_prog
+
+
 def grspec_0():
     sp = form.GRSpec()
     sp.moore = False
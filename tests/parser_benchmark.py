@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Throughput of the LTL parsers, on specifications of gridworlds.
+
+Run as a script, with the width of the gridworld as argument:
+
+    python parser_benchmark.py 20
+"""
+from __future__ import print_function
+import argparse
+import random
+import time
+
+from tulip import gridworld
+from tulip.spec import parser
+
+
+def benchmark(width, repetitions=3):
+    """Print formulas parsed per second by each parser.
+
+    Also check that the parsers return the same trees.
+    """
+    random.seed(0)
+    gw = gridworld.random_world(
+        (width, width), wall_density=0.2,
+        num_init=1, num_goals=2)
+    spec = gw.spec()
+    formulas = [
+        f for part in spec._parts
+        for f in getattr(spec, part)]
+    n = len(formulas)
+    size = sum(len(f) for f in formulas)
+    print('{n} formulas, {s} characters'.format(n=n, s=size))
+    trees = dict()
+    for name in sorted(parser.PARSERS):
+        best = None
+        for _ in range(repetitions):
+            t0 = time.time()
+            r = [parser.parse(f, parser=name) for f in formulas]
+            t1 = time.time()
+            if best is None or t1 - t0 < best:
+                best = t1 - t0
+        trees[name] = [repr(u) for u in r]
+        print('{name}: {t:.3f} sec, {k:.0f} formulas/sec'.format(
+            name=name, t=best, k=n / best))
+    ply, pratt = trees['ply'], trees['pratt']
+    assert ply == pratt, 'the parsers return different trees'
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument('width', type=int, nargs='?', default=20,
+                   help='the gridworld has width x width cells')
+    args = p.parse_args()
+    benchmark(args.width)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,16 @@ from __future__ import print_function
 import logging
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('ltl_parser_log').setLevel(logging.ERROR)
+import copy
+import imp
+import os
+import random
+import shutil
+import sys
+import tempfile
+import warnings
 import nose.tools as nt
-from tulip.spec import ast, lexyacc
+from tulip.spec import ast, lexyacc, pratt
 from tulip.spec.parser import parse
 
 
@@ -98,6 +106,25 @@ def test_fol_nodes():
     nt.assert_raises(TypeError, nodes.Bool, 'bee')
 
 
+def test_hash_consing():
+    nodes = ast.make_fol_nodes()
+    x = nodes.Binary('=', nodes.Var('loc'), nodes.Num('3'))
+    y = nodes.Binary('=', nodes.Var('loc'), nodes.Num('3'))
+    assert x is y
+    assert nodes.Var('loc') is not nodes.Str('loc')
+    assert nodes.Unary('X', x) is not nodes.Unary('G', x)
+    # tables are per family of nodes
+    other = ast.make_fol_nodes()
+    assert other.Var('loc') is not nodes.Var('loc')
+    # copies are distinct
+    z = copy.copy(x)
+    assert z is not x
+    assert z.flatten() == x.flatten()
+    # parsed subformulas are shared
+    t = parse('(loc = 3) & X (loc = 3)')
+    assert t.operands[0] is t.operands[1].operands[0]
+
+
 def test_lex():
     # catch token precedence errors
     # for example if "EVENTUALLY" is defined before "FALSE",
@@ -120,6 +147,153 @@ def test_lex():
     assert tok.value == 'X0reach'
 
 
+def test_generated_tables_fresh():
+    # tables written as by `setup.py`, with the installed PLY
+    outputdir = tempfile.mkdtemp()
+    names = (lexyacc.LEXTAB, lexyacc.TABMODULE)
+    try:
+        lexyacc.generate_tables(outputdir)
+        for name in names:
+            fname = os.path.join(
+                outputdir, name.split('.')[-1] + '.py')
+            imp.load_source(name, fname)
+        parser = lexyacc.Parser()
+        assert lexyacc._lextab_is_fresh(parser.lexer)
+        assert lexyacc._parsetab_is_fresh(parser, lexyacc.TABMODULE)
+        assert parser.lexer.lexer.lexoptimize
+        r = parser.parse('[]<>(x -> X y)')
+        assert r.flatten() == '( G ( F ( x -> ( X y ) ) ) )', r.flatten()
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+        shutil.rmtree(outputdir)
+
+
+def test_stale_tables():
+    class Lexer(lexyacc.Lexer):
+        t_DQUOTES = r'\"\"'
+
+    class Parser(lexyacc.Parser):
+        def p_string(self, p):
+            """expr : DQUOTES NAME NAME DQUOTES"""
+            p[0] = self.ast.Str(p[2])
+
+    lexer = Lexer()
+    assert not lexyacc._lextab_is_fresh(lexer)
+    assert not lexer.lexer.lexoptimize
+    parser = Parser(lexer=lexer)
+    assert not lexyacc._parsetab_is_fresh(parser, lexyacc.TABMODULE)
+    r = parser.parse('x = "" a b ""')
+    assert isinstance(r.operands[1], ast.nodes.Str), r
+
+
+PRATT_TOKENS = [
+    'a', 'b', 'x1.y', '3', '12', 'True', 'false', 'next', 'X', 'G', 'F',
+    '[]', '<>', '!', '&', '&&', '|', '||', '^', '->', '<->',
+    'U', 'W', 'V', '=', '!=', '<', '<=', '>', '>=',
+    '+', '-', '*', '/', '<<>>', '(', ')', 'ite', ',', '"', "'",
+    '# comment\n', '\n', '$']
+PRATT_UNARY = ['!', 'X', 'G', 'F', '[]', '<>', 'next']
+PRATT_BINARY = [
+    '&', '&&', '|', '||', '^', '->', '<->', 'U', 'W', 'V',
+    '=', '!=', '<', '<=', '>', '>=', '+', '-', '*', '/']
+
+
+def test_pratt_parser_examples():
+    formulas = [
+        "x & y' -> [] <> (z = 3)",
+        'a <<>> 3 & b',
+        'a & b <<>> 3 & c',
+        '(ite a, b, c) + -3',
+        'x = "a"',
+        'next X0reach',
+        '! a U b',
+        'a | G b & c',
+        'a U G b U c',
+        'a * G b + c',
+        'X ! a & b',
+        "a ' ' = - 2",
+        'a -> b -> c',
+        'TRUE <-> False']
+    for f in formulas:
+        pratt_parser_check(f)
+
+
+def test_pratt_parser_random():
+    # random sequences of tokens, mostly syntax errors
+    rng = random.Random(0)
+    for _ in range(1000):
+        n = rng.randint(1, 8)
+        f = ' '.join(rng.choice(PRATT_TOKENS) for _ in range(n))
+        pratt_parser_check(f)
+    # random formulas
+    for _ in range(1000):
+        f = random_formula(rng, 6)
+        assert pratt_parser_check(f), f
+
+
+def pratt_parser_check(formula):
+    """Assert that PLY and Pratt parsers agree on `formula`.
+
+    Return `True` if `formula` is syntactically correct.
+    """
+    trees = list()
+    for p in ('ply', 'pratt'):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                trees.append(repr(parse(formula, parser=p)))
+        except Exception:
+            trees.append(None)
+    ply, pratt = trees
+    assert ply == pratt, (formula, ply, pratt)
+    return ply is not None
+
+
+def random_formula(rng, depth):
+    r = rng.random()
+    if depth <= 0 or r < 0.2:
+        return rng.choice(
+            ['a', 'b', 'x1', '3', '-4', 'True', 'FALSE', '"s"'])
+    f = random_formula(rng, depth - 1)
+    if r < 0.35:
+        return rng.choice(PRATT_UNARY) + ' ' + f
+    if r < 0.45:
+        return '(' + f + ')'
+    if r < 0.5:
+        return f + "'"
+    if r < 0.55:
+        return f + ' <<>> 5'
+    g = random_formula(rng, depth - 1)
+    if r < 0.58:
+        h = random_formula(rng, depth - 1)
+        return '(ite {f}, {g}, {h})'.format(f=f, g=g, h=h)
+    return ' '.join([f, rng.choice(PRATT_BINARY), g])
+
+
+def test_pratt_tokenize():
+    tokens = pratt.tokenize('[]<>(x1 && next y) # comment')
+    assert tokens == [
+        ('ALWAYS', 'G'), ('EVENTUALLY', 'F'), ('LPAREN', '('),
+        ('NAME', 'x1'), ('AND', '&'), ('NEXT', 'X'), ('NAME', 'y'),
+        ('RPAREN', ')')], tokens
+
+
+def test_pratt_tokens_match_lexer():
+    lexer = lexyacc.Lexer().lexer
+    for s in [
+            "x' <-> !y\n-> (z != 3) & a U b",
+            'a <<>> 2 >= 1 - c || d ^ e <= f # comment\n/ g']:
+        lexer.input(s)
+        r = [(t.type, t.value) for t in lexer]
+        tokens = pratt.tokenize(s)
+        assert tokens == r, (tokens, r)
+
+
+def test_parse_unknown_parser():
+    nt.assert_raises(ValueError, parse, 'a', parser='lalr')
+
+
 def lexer_token_precedence_test():
     s = 'False'
     r = parse(s)
@@ -369,6 +369,46 @@ def test_only_mode_control():
     assert not r
 
 
+def test_synthesize_symbolic():
+    specs = spec.GRSpec(
+        env_vars={'x'}, sys_vars={'y'},
+        sys_safety={"y' <-> x'"},
+        moore=False, plus_one=False)
+    ctrl = synth.synthesize(specs, symbolic=True)
+    assert ctrl is not None
+    u, out = ctrl.reaction('Sinit', dict(x=True))
+    u, out = ctrl.reaction(u, dict(x=False))
+    assert out == dict(y=False), out
+    u, out = ctrl.reaction(u, dict(x=True))
+    assert out == dict(y=True), out
+    assert_raises(
+        ValueError, synth.synthesize, specs,
+        solver='gr1py', symbolic=True)
+
+
+def test_synthesis_stats():
+    specs = spec.GRSpec(
+        env_vars={'x'}, sys_vars={'y'},
+        sys_safety={"y' <-> x'"},
+        moore=False, plus_one=False)
+    stats = synth.SynthesisStats()
+    ctrl = synth.synthesize(specs, stats=stats)
+    assert ctrl is not None
+    assert stats.solver == 'omega', stats
+    assert stats.translation_time >= 0, stats
+    assert stats.solver_wall_time >= 0, stats
+    assert stats.solver_cpu_time >= 0, stats
+    assert stats.conversion_time >= 0, stats
+    assert stats.strategy_size > 0, stats
+    d = stats.as_dict()
+    assert d['strategy_size'] == stats.strategy_size, d
+    stats = synth.SynthesisStats()
+    r = synth.is_realizable(specs, stats=stats)
+    assert r
+    assert stats.solver_wall_time >= 0, stats
+    assert stats.conversion_time is None, stats
+
+
 def multiple_env_actions_test():
     multiple_env_actions_check('omega')
 
@@ -3,7 +3,7 @@ from __future__ import print_function
 import logging
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('tulip.ltl_parser_log').setLevel(logging.ERROR)
-# import nose.tools as nt
+import nose.tools as nt
 from tulip.spec.ast import nodes
 from tulip.spec.parser import parse
 from tulip.spec import transformation as tx
@@ -39,6 +39,18 @@ def tree_from_recursive_ast_test():
     assert g.has_edge(minus, x)
 
 
+def tree_from_shared_ast_test():
+    # hash-consing shares the operands of: x & x
+    x = nodes.Var('x')
+    t = nodes.Binary('&', x, x)
+    assert t.operands[0] is t.operands[1]
+    g = tx.Tree.from_recursive_ast(t)
+    assert len(g) == 3
+    assert all(len(g.in_edges(u)) == 1 for u in g if u is not t)
+    r = g.to_recursive_ast()
+    assert r.flatten() == '( x & x )'
+
+
 def tree_to_recursive_ast_test():
     g = tx.Tree()
     x = nodes.Var('x')
@@ -112,3 +124,54 @@ def test_str_to_int():
     print(s)
     assert s == ('( ( loc = 1 ) -> '
                  '( X ( ( env_alice = 0 ) & ( env_bob = 1 ) ) ) )')
+
+
+def test_sub_constants_ast():
+    x = '(loc = "s2") -> X((((env_alice = "left") && (env_bob = "bright"))))'
+    var_str2int = {
+        'loc': ['s0', 's2'],
+        'env_alice': ['left', 'right'],
+        'env_bob': ['bleft', 'bright']}
+    r = parse(x)
+    s = r.flatten()
+    t = tx.sub_constants(r, var_str2int)
+    assert t.flatten() == ('( ( loc = 1 ) -> '
+                           '( X ( ( env_alice = 0 ) & ( env_bob = 1 ) ) ) )')
+    # unchanged
+    assert r.flatten() == s
+    # subtrees without constants are shared
+    r = parse('(a = "hehe") & G b')
+    t = tx.sub_constants(r, {'a': ['hehe', 'haha']})
+    assert t.flatten() == '( ( a = 0 ) & ( G b ) )', t.flatten()
+    assert t is not r
+    assert t.operands[1] is r.operands[1]
+
+
+def test_sub_bool_with_subtree_ast():
+    r = parse('a & X b')
+    t = tx.sub_bool_with_subtree(r, {'b': parse('x = 1')})
+    assert t.flatten() == '( a & ( X ( x = 1 ) ) )', t.flatten()
+    assert r.flatten() == '( a & ( X b ) )'
+
+
+def test_check_for_undefined_identifiers():
+    r = parse('a & X b')
+    tx.check_for_undefined_identifiers(r, {'a': 'boolean', 'b': 'boolean'})
+    nt.assert_raises(
+        ValueError, tx.check_for_undefined_identifiers,
+        r, {'a': 'boolean'})
+
+
+def test_deep_ast():
+    # deeper than the recursion limit
+    n = 10**4
+    t = nodes.Var('a')
+    for _ in range(n):
+        t = nodes.Unary('!', t)
+    t = nodes.Binary('=', t, nodes.Str('hehe'))
+    assert len(list(tx.iter_nodes(t))) == n + 3
+    tx.check_for_undefined_identifiers(t, {'a': ['hehe']})
+    u = tx.sub_constants(t, {'a': ['haha', 'hehe']})
+    assert u.operands[1].value == '1', u.operands[1]
+    assert t.operands[1].value == 'hehe', t.operands[1]
+    assert tx.collect_primed_vars(t) == set()
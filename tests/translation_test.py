@@ -4,10 +4,10 @@ import logging
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('tulip.ltl_parser_log').setLevel(logging.ERROR)
 from nose.tools import raises
-#from tulip.spec.parser import parse
 from tulip import spec
 from tulip.spec import translation as ts
 from tulip.spec import form
+from tulip.spec.parser import parse
 
 
 def test_translate_ast_to_gr1c():
@@ -28,6 +28,37 @@ def test_translate_ast_to_gr1c():
                            "( ( env_alice' = 0 ) & ( env_bob' = 1 ) ) )")
 
 
+def test_translate_ast_shared():
+    t = parse('(loc = 3) & X (loc = 3)')
+    a, b = t.operands
+    r = ts.translate_ast(t, 'gr1c')
+    assert r.flatten() == "( ( loc = 3 ) & ( loc' = 3 ) )", r.flatten()
+    # shared subformula is translated once
+    assert r.operands[0] is r.operands[1].operands[0]
+    assert ts.translate_ast(a, 'gr1c') is r.operands[0]
+
+
+def test_translate_repeated_clauses():
+    x = 'loc = "s2"'
+    s = spec.GRSpec(sys_vars={'loc': ['s0', 's2']},
+                    sys_init=[x], sys_safety=[x, 'X (' + x + ')'],
+                    sys_prog=[x])
+    r = ts.translate(s, 'gr1c')
+    assert "SYSINIT: (( loc = 1 ));" in r, r
+    assert "SYSTRANS: [](( loc = 1 ))\n& [](( loc' = 1 ));" in r, r
+    assert "SYSGOAL: []<>(( loc = 1 ));" in r, r
+
+
+def test_translate_iter():
+    s = spec.GRSpec(env_vars={'a'}, sys_vars={'x': (0, 3)},
+                    env_init=['a'], sys_safety=['x = 1', "x' = 2"],
+                    sys_prog=['x = 1'])
+    for lang in ['gr1c', 'slugs']:
+        pieces = ts.translate_iter(s, lang)
+        assert not isinstance(pieces, (str, list)), pieces
+        assert ''.join(pieces) == ts.translate(s, lang)
+
+
 @raises(TypeError)
 def check_translate_unrecognized_types(spc):
     ts.translate(spc, 'gr1c')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Time to build large transition systems, edge by edge and in bulk.
+
+Also compare the memory of an FTS and of a CompactFTS,
+and time the bisimulation of a CompactFTS.
+Run as a script, with the number of edges as argument:
+
+    python transys_benchmark.py 1000000
+"""
+from __future__ import print_function
+import argparse
+import random
+import time
+import tracemalloc
+
+from tulip import transys as trs
+from tulip.transys.transys import simu_abstract
+
+
+def benchmark(n):
+    """Print time to add C{n} labeled edges to an FTS.
+
+    Compare C{Transitions.add_from} to C{Transitions.add_from_arrays},
+    and check that they construct the same graph.
+    """
+    m = max(n // 4, 1)
+    us = [i % m for i in range(n)]
+    vs = [(7 * i + i // m + 1) % m for i in range(n)]
+    actions = ['abc'[i % 3] for i in range(n)]
+    print('{n} edges, {m} states'.format(n=n, m=m))
+    times = dict()
+    edges = dict()
+    for name in ('add_from', 'add_from_arrays'):
+        ts = trs.FTS()
+        ts.sys_actions.add_from({'a', 'b', 'c'})
+        ts.states.add_from(range(m))
+        t0 = time.time()
+        if name == 'add_from':
+            ts.transitions.add_from(
+                (u, v, {'sys_actions': a})
+                for u, v, a in zip(us, vs, actions))
+        else:
+            ts.transitions.add_from_arrays(
+                us, vs, labels={'sys_actions': actions})
+        times[name] = time.time() - t0
+        edges[name] = sorted(
+            (u, v, d['sys_actions'])
+            for u, v, d in ts.edges_iter(data=True))
+        print('{name}: {t:.3f} sec'.format(name=name, t=times[name]))
+    print('speedup: {r:.1f}'.format(
+        r=times['add_from'] / times['add_from_arrays']))
+    assert edges['add_from'] == edges['add_from_arrays'], (
+        'the graphs differ')
+
+
+def benchmark_memory(n):
+    """Print memory of an FTS and of a CompactFTS with C{n} edges."""
+    m = max(n // 4, 1)
+    us = [i % m for i in range(n)]
+    vs = [(7 * i + i // m + 1) % m for i in range(n)]
+    actions = ['abc'[i % 3] for i in range(n)]
+    ap = [{'p'} if i % 2 else set() for i in range(m)]
+    sizes = dict()
+    for name in ('FTS', 'CompactFTS'):
+        tracemalloc.start()
+        t0 = time.time()
+        if name == 'FTS':
+            ts = trs.FTS()
+            ts.atomic_propositions.add('p')
+            ts.sys_actions.add_from({'a', 'b', 'c'})
+            ts.states.add_from(range(m))
+            for i, x in enumerate(ap):
+                ts.states[i]['ap'] = x
+            ts.transitions.add_from_arrays(
+                us, vs, labels={'sys_actions': actions})
+        else:
+            ts = trs.CompactFTS(
+                range(m), us, vs, labels={'sys_actions': actions}, ap=ap)
+        t = time.time() - t0
+        sizes[name], _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('{name}: {b:.1f} MB, built in {t:.3f} sec'.format(
+            name=name, b=sizes[name] / 2.0**20, t=t))
+        del ts
+    print('ratio: {r:.1f}'.format(r=sizes['FTS'] / sizes['CompactFTS']))
+
+
+def benchmark_simu(n):
+    """Print time of the bisimulation of a CompactFTS with C{n} edges."""
+    m = max(n // 4, 1)
+    us = [i % m for i in range(n)]
+    vs = [(7 * i + i // m + 1) % m for i in range(n)]
+    r = random.Random(0)
+    ap = [{'p'} if r.random() < 0.5 else set() for i in range(m)]
+    ts = trs.CompactFTS(range(m), us, vs, ap=ap)
+    t0 = time.time()
+    simu, _ = simu_abstract(ts, 'bi')
+    t = time.time() - t0
+    print('bisimulation: {k} cells, in {t:.3f} sec'.format(
+        k=len(simu), t=t))
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument('n', type=int, nargs='?', default=10**6,
+                   help='number of edges')
+    args = p.parse_args()
+    benchmark(args.n)
+    benchmark_memory(args.n)
+    benchmark_simu(args.n)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Tests for transys.compact (part of transys subpackage)"""
+import logging
+logging.basicConfig(level=logging.WARNING)
+import numpy as np
+from nose.tools import assert_raises
+
+from tulip import synth
+from tulip import transys as trs
+from tulip.transys import products
+from tulip.transys.transys import simu_abstract
+
+
+def _fts():
+    ts = trs.FTS()
+    ts.atomic_propositions.add_from({'p', 'q'})
+    ts.sys_actions.add_from({'a', 'b'})
+    ts.env_actions.add_from({'x'})
+    ts.states.add_from(['s0', 's1', 's2', 's3'])
+    ts.states.initial.add('s0')
+    ts.states['s0']['ap'] = {'p'}
+    ts.states['s2']['ap'] = {'p', 'q'}
+    ts.transitions.add('s0', 's1', sys_actions='a')
+    ts.transitions.add('s0', 's1', sys_actions='b', env_actions='x')
+    ts.transitions.add('s0', 's2')
+    ts.transitions.add('s1', 's2', sys_actions='a')
+    ts.transitions.add('s2', 's3', sys_actions='b')
+    ts.transitions.add('s3', 's0', sys_actions='a')
+    ts.transitions.add('s3', 's3', sys_actions='b')
+    return ts
+
+
+def _edges(ts):
+    return _sorted(ts.transitions(data=True))
+
+
+def _sorted(edges):
+    return sorted((u, v, sorted(d.items())) for u, v, d in edges)
+
+
+def test_from_to_fts():
+    ts = _fts()
+    c = trs.CompactFTS.from_fts(ts)
+    assert len(c) == 4, len(c)
+    assert len(c.transitions) == 7, len(c.transitions)
+    assert set(c.states.initial) == {'s0'}, c.states.initial
+    assert c.states['s2'] == {'ap': {'p', 'q'}}, c.states['s2']
+    assert c.node['s1'] == {'ap': set()}, c.node['s1']
+    assert c.actions == ts.actions, c.actions
+    assert set(c.aps) == {'p', 'q'}, c.aps
+    assert _edges(c) == _edges(ts), _edges(c)
+    back = c.to_fts()
+    assert isinstance(back, trs.FTS)
+    assert _edges(back) == _edges(ts), _edges(back)
+    assert (sorted(back.states(data=True)) ==
+            sorted(ts.states(data=True))), back.states(data=True)
+    assert set(back.states.initial) == {'s0'}, back.states.initial
+    assert back.actions == ts.actions, back.actions
+
+
+def test_post_pre():
+    c = trs.CompactFTS.from_fts(_fts())
+    assert c.states.post('s0') == {'s1', 's2'}, c.states.post('s0')
+    assert c.states.post({'s0', 's3'}) == {'s0', 's1', 's2', 's3'}
+    assert c.states.post() == {'s0'}
+    assert c.states.pre('s3') == {'s2', 's3'}, c.states.pre('s3')
+    assert c.successors('s0') == ['s1', 's2'], c.successors('s0')
+    assert c.predecessors('s0') == ['s3'], c.predecessors('s0')
+    assert not c.states.is_terminal('s3')
+    with assert_raises(ValueError):
+        c.states.post('s4')
+
+
+def test_find():
+    ts = _fts()
+    c = trs.CompactFTS.from_fts(ts)
+    for states in (None, ['s0'], ['s0', 's3', 'missing']):
+        for label in ({}, {'sys_actions': 'a'}, {'sys_actions': 'b'},
+                      {'sys_actions': 'b', 'env_actions': 'x'},
+                      {'sys_actions': 'c'}, {'other': 1}):
+            r = c.transitions.find(states, with_attr_dict=dict(label))
+            r_ = ts.transitions.find(states, with_attr_dict=dict(label))
+            assert _sorted(r) == _sorted(r_), (states, label, r, r_)
+    r = c.transitions.find(['s0'], to_states=['s2'])
+    assert r == [('s0', 's2', {})], r
+    r = c.states.find(with_attr_dict={'ap': {'p'}})
+    assert r == [('s0', {'ap': {'p'}})], r
+    r = c.states.find('s1')
+    assert r == [('s1', {'ap': set()})], r
+    assert c.states.find(ap={'q'}) == list()
+
+
+def test_arrays():
+    n = 100
+    us = np.arange(3 * n) % n
+    vs = (us + np.arange(3 * n) // n + 1) % n
+    acts = np.array(['a', 'b', 'c'])[np.arange(3 * n) % 3]
+    ap = [{'p'} if i % 2 else None for i in range(n)]
+    c = trs.CompactFTS(range(n), us, vs, labels={'sys_actions': acts},
+                       ap=ap, initial=[0])
+    assert len(c.transitions) == 3 * n
+    assert c._succ.dtype == np.int8, c._succ.dtype
+    assert c._edge_index['sys_actions'].dtype == np.int8
+    assert c.states.post(5) == {6, 7, 8}, c.states.post(5)
+    r = c.transitions.find([5], with_attr_dict={'sys_actions': 'c'})
+    assert r == [(5, 6, {'sys_actions': 'c'})], r
+    assert c.states[0] == {'ap': set()}, c.states[0]
+    assert set(c.sys_actions) == {'a', 'b', 'c'}, c.sys_actions
+    ts = c.to_fts()
+    assert _edges(ts) == _edges(c)
+    with assert_raises(ValueError):
+        trs.CompactFTS(range(2), [0, 1], [1])
+    with assert_raises(ValueError):
+        trs.CompactFTS(range(2), [0, 1], [1, 2])
+    with assert_raises(ValueError):
+        trs.CompactFTS(['a', 'a'])
+
+
+def test_sys_to_spec():
+    ts = _fts()
+    c = trs.CompactFTS.from_fts(ts)
+    for f in (synth.sys_to_spec, synth.env_to_spec):
+        ts.owner = c.owner = 'sys' if f is synth.sys_to_spec else 'env'
+        spec = f(ts, False, 'loc')
+        spec_ = f(c, False, 'loc')
+        assert spec.sys_vars == spec_.sys_vars, spec_.sys_vars
+        assert spec.env_vars == spec_.env_vars, spec_.env_vars
+        for part in spec._parts:
+            x = getattr(spec, part)
+            y = getattr(spec_, part)
+            assert sorted(x) == sorted(y), (part, x, y)
+
+
+def test_products_and_simu():
+    ts = trs.FTS()
+    ts.atomic_propositions.add_from({'p', 'q'})
+    ts.states.add_from(range(12))
+    ts.states.initial.add(0)
+    for i in range(12):
+        ts.states[i]['ap'] = {'p'} if i % 3 else {'q'}
+        ts.transitions.add_from([(i, (i + 1) % 12), (i, (i + 5) % 12)])
+    c = trs.CompactFTS.from_fts(ts)
+    ba = trs.BA()
+    ba.atomic_propositions.add_from({'p', 'q'})
+    ba.states.add_from({0, 1})
+    ba.states.initial.add(0)
+    ba.states.accepting.add(1)
+    for u in (0, 1):
+        ba.transitions.add(u, 0, letter={'p'})
+        ba.transitions.add(u, 1, letter={'q'})
+    prod, accepting = products.ts_ba_sync_prod(ts, ba)
+    prod_, accepting_ = products.ts_ba_sync_prod(c, ba)
+    assert accepting == accepting_, accepting_
+    assert sorted(prod.transitions()) == sorted(prod_.transitions())
+    simu, part = simu_abstract(ts, 'bi')
+    simu_, part_ = simu_abstract(c, 'bi')
+    assert part == part_, part_
+    assert sorted(simu.transitions()) == sorted(simu_.transitions())
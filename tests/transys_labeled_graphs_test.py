@@ -3,8 +3,9 @@
 from __future__ import print_function
 
 from nose.tools import raises, assert_raises
+import numpy as np
 from tulip.transys import labeled_graphs
-from tulip.transys.mathset import PowerSet, MathSet
+from tulip.transys.mathset import PowerSet, MathSet, TypedDict
 from tulip.transys.transys import FTS
 
 
@@ -274,6 +275,51 @@ class LabeledDiGraph_test(object):
     def test_add_edge_illegal_value(self):
         self.G.add_edge(1, 2, month='haha')
 
+    def test_add_edges_from_arrays(self):
+        G = self.G
+        G.states.add_from({3, 4})
+        G.add_edges_from_arrays(
+            [1, 2, 3, 3], [2, 3, 4, 4],
+            labels={'month': ['Feb', 'Jan', 'Jan', 'Feb']},
+            day='Tue')
+        assert G.number_of_edges() == 5, G.edges(data=True)
+        assert G[1][2][1] == {'month': 'Feb', 'day': 'Tue'}, G[1][2]
+        assert G[3][4] == {
+            0: {'month': 'Jan', 'day': 'Tue'},
+            1: {'month': 'Feb', 'day': 'Tue'}}, G[3][4]
+        d = G[2][3][0]
+        assert isinstance(d, TypedDict)
+        with assert_raises(ValueError):
+            d['month'] = 'Mar'
+        # existing edge
+        G.add_edges_from_arrays([1], [2], month='Jan', day='Tue')
+        assert G.number_of_edges() == 5, G.edges(data=True)
+        # unhashable labels
+        G.add_edges_from_arrays(
+            [1, 1, 1], [2, 2, 2], labels={'comb': [{1}, {2}, {1}]})
+        assert G.number_of_edges() == 7, G.edges(data=True)
+
+    def test_add_edges_from_arrays_numpy(self):
+        G = self.G
+        G.states.add_from(range(10))
+        us = np.arange(10)
+        G.add_edges_from_arrays(us, (us + 1) % 10)
+        assert G.number_of_edges() == 11, G.edges()
+        assert all(type(u) is int for u in G.succ)
+        assert all(type(v) is int for v in G.succ[0])
+
+    def test_add_edges_from_arrays_checks(self):
+        G = self.G
+        with assert_raises(ValueError):
+            G.add_edges_from_arrays([1], [2], labels={'month': ['Mar']})
+        with assert_raises(AttributeError):
+            G.add_edges_from_arrays([1], [2], labels={'mo': ['Jan']})
+        with assert_raises(ValueError):
+            G.add_edges_from_arrays([1], [5])
+        with assert_raises(ValueError):
+            G.add_edges_from_arrays([1, 2], [2])
+        assert G.number_of_edges() == 1, G.edges(data=True)
+
     @raises(ValueError)
     def test_node_subscript_assign_illegal_value(self):
         self.G.node[1]['month'] = 'abc'
@@ -283,6 +329,56 @@ class LabeledDiGraph_test(object):
         self.G[1][2][0]['day'] = 'abc'
 
 
+def label_index_test():
+    ts = FTS()
+    ts.atomic_propositions.add_from({'p', 'q'})
+    ts.sys_actions.add_from({'a', 'b'})
+    ts.states.add_from([(0, {'ap': {'p'}}), (1, {'ap': {'q'}}), 2])
+    ts.transitions.add(0, 1, sys_actions='a')
+    ts.index_labels()
+    ts.transitions.add(0, 2, sys_actions='b')
+    ts.transitions.add(0, 0, sys_actions='a')
+    ts.states.add(3, ap={'p'})
+
+    def find_states(**kw):
+        return sorted(s for s, _ in ts.states.find(**kw))
+
+    def find_transitions(*arg, **kw):
+        return sorted((u, v) for u, v, _ in ts.transitions.find(*arg, **kw))
+
+    assert find_states(ap={'p'}) == [0, 3]
+    assert find_states(ap=set()) == [2]
+    assert find_transitions([0], sys_actions='a') == [(0, 0), (0, 1)]
+    assert find_transitions(0, sys_actions='b') == [(0, 2)]
+    assert find_transitions([0], to_states=[1], sys_actions='a') == [(0, 1)]
+    # assignment
+    ts.states[3]['ap'] = {'q'}
+    ts[0][1][0]['sys_actions'] = 'b'
+    assert find_states(ap={'p'}) == [0]
+    assert find_states(ap={'q'}) == [1, 3]
+    assert find_transitions([0], sys_actions='b') == [(0, 1), (0, 2)]
+    # removal
+    ts.states.remove(1)
+    ts.remove_edge(0, 2)
+    assert find_states(ap={'q'}) == [3]
+    assert find_transitions([0], sys_actions='b') == []
+    assert find_transitions([0], sys_actions='a') == [(0, 0)]
+    # bulk
+    ts.add_edges_from_arrays([2, 3], [3, 2], labels={'sys_actions': 'ab'})
+    assert find_transitions([2, 3], sys_actions='a') == [(2, 3)]
+    # same results as without index
+    ts._label_index = None
+    assert find_states(ap={'q'}) == [3]
+    assert find_transitions([2, 3], sys_actions='a') == [(2, 3)]
+
+
+def states_find_given_test():
+    ts = FTS()
+    ts.states.add_from(range(5))
+    r = ts.states.find([3, 1, 3, 7])
+    assert r == [(3, {'ap': set()}), (1, {'ap': set()})], r
+
+
 def open_fts_multiple_env_actions_test():
     env_modes = MathSet({'up', 'down'})
     env_choice = MathSet({'left', 'right'})
@@ -328,5 +424,16 @@ def test_remove_deadends():
     g.remove_edge(4, 0)
     g.add_edge(0, 0)
 
-    g.remove_deadends()
+    removed = g.remove_deadends(quiet=True)
     assert(len(g) == 1)
+    assert(removed == {1, 2, 3, 4})
+
+    # long line into a cycle, and a branch into the line
+    n = 10**4
+    g = labeled_graphs.LabeledDiGraph()
+    g.add_nodes_from(range(n + 2))
+    g.add_edges_from((i, i + 1) for i in range(n - 1))
+    g.add_edges_from([(0, n), (n, n + 1), (n + 1, n)])
+    removed = g.remove_deadends(quiet=True)
+    assert(removed == set(range(1, n)))
+    assert(set(g) == {0, n, n + 1})
@@ -6,6 +6,7 @@ import logging
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+from nose.tools import assert_raises
 from tulip.transys import machines
 
 def test_strip_ports():
@@ -42,3 +43,89 @@ def test_strip_ports():
         assert(u == x)
         assert(v == y)
         assert(d == b)
+
+
+def test_reaction():
+    mealy = machines.MealyMachine()
+    mealy.add_inputs({'x': {0, 1}, 'y': {0, 1}})
+    mealy.add_outputs({'z': {0, 1}})
+    mealy.add_nodes_from(range(3))
+    mealy.states.initial.add(0)
+    mealy.add_edge(0, 1, x=0, y=0, z=1)
+    mealy.add_edge(0, 2, x=1, y=0, z=0)
+    mealy.add_edge(1, 0, x=0, y=1, z=0)
+
+    assert(mealy.reaction(0, dict(x=1, y=0)) == (2, dict(z=0)))
+    assert(mealy.reaction(0, dict(y=0, x=0)) == (1, dict(z=1)))
+    assert(mealy.reactionpart(1, dict(x=0)) == (0, dict(z=0)))
+    # outputs are copied
+    _, outputs = mealy.reaction(0, dict(x=0, y=0))
+    outputs['z'] = 0
+    assert(mealy.reaction(0, dict(x=0, y=0)) == (1, dict(z=1)))
+    states, outputs = machines.guided_run(
+        mealy, 0, dict(x=[0, 0, 1], y=[0, 1, 0]))
+    assert(states == [1, 0, 2])
+    assert(outputs == dict(z=[1, 0, 0]))
+    # invalid inputs
+    with assert_raises(Exception):
+        mealy.reaction(0, dict(x=1, y=1))
+    with assert_raises(Exception):
+        mealy.reaction(0, dict(x=1, y=0, w=0))
+    with assert_raises(Exception):
+        mealy.reaction(2, dict(x=0, y=0))
+    # tables change with the edges
+    mealy.add_edge(0, 0, x=1, y=0, z=1)
+    with assert_raises(Exception):
+        mealy.reaction(0, dict(x=1, y=0))
+    mealy.remove_edge(0, 2)
+    assert(mealy.reaction(0, dict(x=1, y=0)) == (0, dict(z=1)))
+    mealy.states.remove(1)
+    with assert_raises(Exception):
+        mealy.reaction(0, dict(x=0, y=0))
+
+
+def test_mealy_table():
+    mealy = machines.MealyMachine()
+    mealy.add_inputs({'x': {0, 1, 2}})
+    mealy.add_outputs({'z': {'a', 'b'}})
+    mealy.add_nodes_from(range(4))
+    mealy.states.initial.add(0)
+    mealy.add_edge(0, 1, x=0, z='a')
+    mealy.add_edge(0, 0, x=1, z='b')
+    mealy.add_edge(1, 0, x=0, z='b')
+    mealy.add_edge(1, 3, x=1, z='a')
+    mealy.add_edge(0, 2, x=2, z='a')
+    mealy.add_edge(0, 3, x=2, z='b')
+    table = machines.MealyTable(mealy)
+    assert(table.input_values['x'] == [0, 1, 2])
+    x = table.encode('x', [
+        [0, 0, 1, 0],
+        [1, 0, 1, 1],
+        [0, 2, 0, 0],
+        [2, 0, 0, 0]])
+    x[3, 0] = 3
+    states, outputs, status = table.run(dict(x=x))
+    assert(status.tolist() == [
+        table.OK, table.DEAD_END, table.INVALID_INPUT,
+        table.INVALID_INPUT])
+    states = [[table.states[i] if i >= 0 else None for i in s]
+              for s in states.tolist()]
+    assert(states == [
+        [1, 0, 0, 1],
+        [0, 1, 3, None],
+        [1, None, None, None],
+        [None, None, None, None]]), states
+    z = table.decode('z', outputs['z']).tolist()
+    assert(z[0] == ['a', 'b', 'b', 'a']), z
+    assert(z[1] == ['b', 'a', 'a', None]), z
+    # same as `guided_run`
+    r = machines.guided_run(mealy, 0, dict(x=[0, 0, 1, 0]))
+    assert(r == ([1, 0, 0, 1], dict(z=['a', 'b', 'b', 'a']))), r
+    # nondeterministic
+    states, _, status = table.run(dict(x=[[1, 2]]))
+    assert(status.tolist() == [table.NONDETERMINISTIC])
+    assert(states.tolist() == [[0, -1]])
+    with assert_raises(ValueError):
+        table.encode('x', [4])
+    with assert_raises(ValueError):
+        table.run(dict(y=[[0]]))
@@ -3,7 +3,9 @@ import logging
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 logging.getLogger('tulip.transys.products').setLevel(logging.DEBUG)
+import nose.tools
 from tulip import transys as trs
+from tulip.transys import algorithms
 from tulip.transys.mathset import MathSet, PowerSet
 
 
@@ -126,3 +128,194 @@ def on_the_fly_test():
     prodba.add_all_states()
     check_prodba(prodba)
     prodba.save('prodba_full.pdf')
+
+
+def _lasso_ts():
+    ts = trs.FTS()
+    ts.atomic_propositions.add('p')
+    ts.states.add_from({'s0', 's1', 's2'})
+    ts.states.initial.add('s0')
+    ts.states['s1']['ap'] = {'p'}
+    ts.transitions.add_from([('s0', 's1'), ('s1', 's2'),
+                             ('s2', 's2'), ('s2', 's0')])
+    return ts
+
+
+def _lasso_ba():
+    # accepts the words that satisfy <>[] ! p
+    ba = trs.BA()
+    ba.atomic_propositions.add('p')
+    ba.states.add_from({'q0', 'q1'})
+    ba.states.initial.add('q0')
+    ba.states.accepting.add('q1')
+    ba.transitions.add('q0', 'q0', letter={'p'})
+    ba.transitions.add('q0', 'q0', letter=set())
+    ba.transitions.add('q0', 'q1', letter=set())
+    ba.transitions.add('q1', 'q1', letter=set())
+    return ba
+
+
+def find_accepting_lasso_test():
+    ts = _lasso_ts()
+    ba = _lasso_ba()
+    lasso = trs.find_accepting_lasso(ts, ba)
+    assert lasso is not None
+    prefix, cycle = lasso
+    assert prefix[0][0] == 's0', prefix
+    assert prefix[-1] == cycle[0] == cycle[-1], (prefix, cycle)
+    assert cycle[0][1] in ba.states.accepting, cycle
+    prod, _ = trs.products.ts_ba_sync_prod(ts, ba)
+    assert set(prefix[0:1]) <= set(prod.states.initial), prefix
+    path = prefix + cycle[1:]
+    for u, v in zip(path, path[1:]):
+        assert prod.transitions.find([u], [v]), (u, v)
+    assert all(s == 's2' for s, q in cycle), cycle
+    # <>[] ! p fails if p holds infinitely often
+    ts.transitions.remove('s2', 's2')
+    assert trs.find_accepting_lasso(ts, ba) is None
+    c = trs.CompactFTS.from_fts(ts)
+    assert trs.find_accepting_lasso(c, ba) is None
+    ts.transitions.add('s2', 's2')
+    c = trs.CompactFTS.from_fts(ts)
+    assert trs.find_accepting_lasso(c, ba) is not None
+
+
+def _simu_ts():
+    ts = trs.FTS()
+    ts.atomic_propositions.add_from({'a', 'b', 'c', 'd'})
+    ts.states.add_from(
+        [('q1', {'ap': {'a'}}), ('q2', {'ap': {'a'}}),
+         ('q3', {'ap': {'b'}}), ('q4', {'ap': {'b'}}),
+         ('q5', {'ap': {'b'}}), ('q6', {'ap': {'c'}}),
+         ('q7', {'ap': {'d'}})])
+    ts.states.initial.add('q1')
+    ts.transitions.add_from([
+        ('q1', 'q3'), ('q1', 'q4'), ('q3', 'q6'), ('q4', 'q6'),
+        ('q2', 'q4'), ('q2', 'q5'), ('q5', 'q7'), ('q6', 'q6'),
+        ('q7', 'q7')])
+    return ts
+
+
+def simu_abstract_bi_test():
+    ts = _simu_ts()
+    simu, part = trs.transys.simu_abstract(ts, 'bi')
+    cells = {k: frozenset(v) for k, v in part['simu2ts'].items()}
+    assert set(cells.values()) == {
+        frozenset({'q1'}), frozenset({'q2'}), frozenset({'q3', 'q4'}),
+        frozenset({'q5'}), frozenset({'q6'}), frozenset({'q7'})}, cells
+    edges = {(cells[u], cells[v]) for u, v in simu.transitions()}
+    edges_ = {(cells[i], cells[j])
+              for u, v in ts.transitions()
+              for i in part['ts2simu'][u]
+              for j in part['ts2simu'][v]}
+    assert edges == edges_, edges
+    assert {cells[k] for k in simu.states.initial} == {
+        frozenset({'q1'})}, simu.states.initial
+    for k, c in cells.items():
+        assert simu.states[k]['ap'] == ts.states[next(iter(c))]['ap']
+
+
+def simu_abstract_dual_test():
+    ts = _simu_ts()
+    simu, part = trs.transys.simu_abstract(ts, 'dual')
+    cells = {k: v for k, v in part['simu2ts'].items()}
+    # the cells are closed under `si & pre(sj)`
+    found = {frozenset(c) for c in cells.values()}
+    assert len(found) == len(cells), cells
+    assert frozenset({'q1', 'q2'}) in found, found
+    assert frozenset({'q3', 'q4'}) in found, found
+    for i, si in cells.items():
+        for j, sj in cells.items():
+            pre = {u for u, v in ts.transitions() if v in sj}
+            isect = si & pre
+            if isect == si:
+                assert j in simu.states.post(i), (i, j)
+            else:
+                assert j not in simu.states.post(i), (i, j)
+                assert not isect or frozenset(isect) in found, isect
+    with nose.tools.assert_raises(ValueError):
+        trs.transys.simu_abstract(ts, 'tri')
+
+
+def _ring(n, name, actions=True):
+    ts = trs.FTS()
+    ts.atomic_propositions.add_from({name + str(i) for i in range(n)})
+    ts.sys_actions.add_from({'go', 'stay'})
+    ts.states.add_from(range(n))
+    ts.states.initial.add(0)
+    for i in range(n):
+        ts.states[i]['ap'] = {name + str(i)}
+        if actions:
+            ts.transitions.add(i, (i + 1) % n, sys_actions='go')
+            ts.transitions.add(i, i, sys_actions='stay')
+        else:
+            ts.transitions.add(i, (i + 1) % n)
+    return ts
+
+
+def async_prod_test():
+    ts1 = _ring(3, 'a')
+    ts2 = _ring(4, 'b', actions=False)
+    prod = algorithms.async_prod(ts1, ts2)
+    assert len(prod) == 12, len(prod)
+    assert set(prod.states.initial) == {(0, 0)}, prod.states.initial
+    assert prod.states[(1, 2)]['ap'] == {'a1', 'b2'}, prod.states[(1, 2)]
+    r = prod.transitions.find([(0, 0)])
+    r = sorted((u, v, sorted(d.items())) for u, v, d in r)
+    assert r == [
+        ((0, 0), (0, 0), [('sys_actions', 'stay')]),
+        ((0, 0), (0, 1), []),
+        ((0, 0), (1, 0), [('sys_actions', 'go')])], r
+    # self-loops of both factors with the same label are one edge
+    prod = algorithms.async_prod(ts1, _ring(2, 'b'))
+    r = prod.transitions.find([(0, 0)], [(0, 0)])
+    assert len(r) == 1, r
+
+
+def ts_sync_prod_test():
+    ts1 = _ring(3, 'a')
+    ts2 = _ring(4, 'b', actions=False)
+    # only the diagonal is reachable from (0, 0)
+    ts2.transitions.remove(0, 1)
+    ts2.transitions.add(0, 0)
+    prod = algorithms.ts_sync_prod(ts1, ts2)
+    assert set(prod) == {(0, 0), (1, 0), (2, 0)}, set(prod)
+    r = prod.transitions.find([(0, 0)], [(1, 0)])
+    assert r == [((0, 0), (1, 0), {'sys_actions': ('go', None)})], r
+    assert ('stay', None) in prod.sys_actions
+    with nose.tools.assert_raises(TypeError):
+        algorithms.ts_sync_prod(ts1, trs.BA())
+
+
+def tensor_cartesian_product_test():
+    ts1 = _ring(3, 'a')
+    ts2 = _ring(2, 'b')
+    prod = algorithms.tensor_product(ts1, ts2)
+    assert isinstance(prod, trs.FiniteTransitionSystem), type(prod)
+    assert len(prod) == 6, len(prod)
+    r = prod.transitions.find([(0, 0)], [(1, 1)])
+    assert r == [((0, 0), (1, 1), {'sys_actions': ('go', 'go')})], r
+    prod = algorithms.cartesian_product(ts1, ts2)
+    assert isinstance(prod, trs.FiniteTransitionSystem), type(prod)
+    assert prod.states[(2, 1)]['ap'] == {'a2', 'b1'}, prod.states[(2, 1)]
+    assert len(prod.transitions()) == 6 * 3, len(prod.transitions())
+    # graphs that are not FTS
+    g1 = trs.labeled_graphs.LabeledDiGraph(
+        node_label_types=[dict(name='color', values={'red', 'blue'})],
+        edge_label_types=[dict(name='day', values={'Mon', 'Tue'})])
+    g1.add_nodes_from([(0, dict(color='red')), (1, dict(color='blue'))])
+    g1.add_edge(0, 1, day='Mon')
+    g1.add_edge(1, 0, day='Tue')
+    g2 = trs.labeled_graphs.LabeledDiGraph(
+        node_label_types=[dict(name='color', values={'red', 'blue'})])
+    g2.add_nodes_from([('x', dict(color='red'))])
+    g2.add_edge('x', 'x')
+    g2.states.initial.add('x')
+    g1.states.initial.add(0)
+    prod = algorithms.tensor_product(g1, g2)
+    assert set(prod) == {(0, 'x'), (1, 'x')}, set(prod)
+    assert prod.node[(1, 'x')]['color'] == 'bluered', prod.node[(1, 'x')]
+    r = prod.transitions.find([(0, 'x')])
+    assert r == [((0, 'x'), (1, 'x'), {'day': ('Mon', None)})], r
+    prod = algorithms.cartesian_product(g1, g2)
+    assert len(prod.transitions()) == 4, prod.transitions()
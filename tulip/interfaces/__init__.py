@@ -35,3 +35,4 @@ from __future__ import print_function
 
 from tulip.interfaces import gr1c as gr1cint
 from tulip.interfaces._inspect import print_env
+from tulip.interfaces._stats import SynthesisStats
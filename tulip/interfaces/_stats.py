@@ -0,0 +1,163 @@
+# Copyright by California Institute of Technology
+# All rights reserved. See LICENSE file at:
+# https://github.com/tulip-control/tulip-control
+"""Time and memory measurements of solver calls."""
+from __future__ import absolute_import
+
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class SynthesisStats(object):
+    """Measurements of a synthesis or realizability check.
+
+    Pass an instance as the argument `stats` of
+    `synth.synthesize`, `synth.is_realizable`,
+    or of the solver interfaces, to have it filled in.
+    Attributes that were not measured are `None`.
+
+    Attributes:
+
+      - `solver`: name of the solver
+      - `translation_time`: sec spent converting the
+        specification to the solver's input
+      - `solver_wall_time`: sec elapsed while solving
+      - `solver_cpu_time`: sec of CPU time while solving,
+        including solver subprocesses
+      - `peak_rss`: peak resident memory in bytes,
+        maximum over this process and solver subprocesses
+        (see `peak_rss` about what this bounds)
+      - `strategy_size`: number of nodes of the
+        strategy returned by the solver
+      - `conversion_time`: sec spent loading or enumerating
+        the strategy returned by the solver,
+        and converting it to a `MealyMachine`
+      - `bdd_nodes`: number of BDD nodes at the end
+      - `bdd_peak_nodes`: maximum number of BDD nodes
+    """
+
+    _attributes = (
+        'solver', 'translation_time',
+        'solver_wall_time', 'solver_cpu_time',
+        'peak_rss', 'strategy_size', 'conversion_time',
+        'bdd_nodes', 'bdd_peak_nodes')
+
+    def __init__(self, solver=None):
+        self.solver = solver
+        self.translation_time = None
+        self.solver_wall_time = None
+        self.solver_cpu_time = None
+        self.peak_rss = None
+        self.strategy_size = None
+        self.conversion_time = None
+        self.bdd_nodes = None
+        self.bdd_peak_nodes = None
+
+    def __repr__(self):
+        args = ', '.join(
+            '{k}={v!r}'.format(k=k, v=getattr(self, k))
+            for k in self._attributes)
+        return '{cls}({args})'.format(
+            cls=type(self).__name__, args=args)
+
+    def __str__(self):
+        return '\n'.join(
+            '{k}: {v}'.format(k=k, v=getattr(self, k))
+            for k in self._attributes)
+
+    def as_dict(self):
+        """Return `dict` of attribute values."""
+        return {k: getattr(self, k) for k in self._attributes}
+
+    def add_translation(self, start):
+        """Add wall time since `start` to `translation_time`.
+
+        @param start: as returned by `clock`
+        """
+        wall, _ = _since(start)
+        self.record_translation(wall)
+
+    def record_translation(self, wall):
+        """Add translation time measured elsewhere.
+
+        @param wall: sec
+        """
+        self.translation_time = _add(self.translation_time, wall)
+
+    def add_solver(self, start):
+        """Add wall and CPU time since `start`, update `peak_rss`.
+
+        @param start: as returned by `clock`
+        """
+        wall, cpu = _since(start)
+        self.record_solver(wall, cpu, peak_rss())
+
+    def record_solver(self, wall, cpu, rss=None):
+        """Add solver times measured elsewhere, update `peak_rss`.
+
+        @param wall, cpu: sec
+        @param rss: peak resident memory in bytes, or `None`
+        """
+        self.solver_wall_time = _add(self.solver_wall_time, wall)
+        self.solver_cpu_time = _add(self.solver_cpu_time, cpu)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def add_conversion(self, start):
+        """Add wall time since `start` to `conversion_time`.
+
+        @param start: as returned by `clock`
+        """
+        wall, _ = _since(start)
+        self.conversion_time = _add(self.conversion_time, wall)
+
+
+def clock():
+    """Return wall time and CPU time, as a `tuple`.
+
+    The CPU time includes terminated child processes.
+    """
+    t = os.times()
+    return time.time(), t[0] + t[1] + t[2] + t[3]
+
+
+def peak_rss():
+    """Return peak resident set size in bytes.
+
+    The maximum over this process and
+    terminated child processes.
+    Return `None` if the platform does not provide it.
+
+    Both values are maxima over the lifetime of this process,
+    as reported by `getrusage`, not over a single solver call.
+    `RUSAGE_CHILDREN` is the peak of the largest child
+    waited for so far, so after an earlier, larger solver run
+    (or any other subprocess) the result is an upper bound
+    on the memory of the current call.
+    """
+    if resource is None:
+        return None
+    r = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == 'darwin':
+        return r
+    return 1024 * r
+
+
+def _since(start):
+    wall, cpu = clock()
+    return wall - start[0], cpu - start[1]
+
+
+def _add(x, y):
+    if x is None:
+        return y
+    return x + y
@@ -0,0 +1,262 @@
+# Copyright by California Institute of Technology
+# All rights reserved. See LICENSE file at:
+# https://github.com/tulip-control/tulip-control
+"""Solve batches of specifications with `gr1c` or `slugs` in parallel.
+
+The functions in `interfaces.gr1c` and `interfaces.slugs` solve
+one specification per call, and search for (and, for `gr1c`,
+check the version of) the solver each time.
+
+A `BatchSolver` locates the solver once, translates the
+specifications in the calling thread (the parser of `tulip.spec`
+is not thread-safe), and then runs up to `processes` solver
+executables at the same time, from a pool of threads.
+
+This is a thread-parallel runner, not a backend of persistent
+solver processes: neither `gr1c` nor `slugs` offers a mode for
+solving several specifications in one process, so each
+specification starts the solver executable once. The input of
+`slugs` and of its compiler is passed in temporary files,
+as in `interfaces.slugs`, because they read files, and
+`/dev/stdin` is not portable.
+
+Example:
+
+    >>> with BatchSolver('gr1c', processes=4) as batch:
+    ...     strategies = batch.map_synthesize(specs)
+"""
+from __future__ import absolute_import
+import logging
+from multiprocessing.pool import ThreadPool
+import os
+import subprocess
+import tempfile
+
+from tulip.spec import translate
+from tulip.interfaces import gr1c
+from tulip.interfaces import slugs
+from tulip.interfaces import _stats
+from tulip.interfaces._stats import SynthesisStats
+
+
+SOLVERS = ('gr1c', 'slugs')
+logger = logging.getLogger(__name__)
+
+
+class BatchSolver(object):
+    """Run a GR(1) solver on several specifications in parallel.
+
+    @param solver: `'gr1c'` or `'slugs'`
+    @param processes: number of solver processes that run
+        at the same time, if `None` then the number of CPUs
+    @param path: path to the solver executable,
+        if `None` then search the `PATH`.
+        Useful for a stand-in executable in tests.
+    @param slugs_compiler_path: consult `slugs._call_slugs`
+    """
+
+    def __init__(self, solver='gr1c', processes=None,
+                 path=None, slugs_compiler_path=None):
+        if solver == 'gr1c':
+            if path is None:
+                gr1c._assert_gr1c()
+                path = gr1c.GR1C_BIN_PREFIX + 'gr1c'
+            self._compiler = None
+        elif solver == 'slugs':
+            path, self._compiler = slugs._find_slugs(
+                slugs_compiler_path, path)
+        else:
+            raise ValueError(
+                'unknown solver "{s}", available: {a}'.format(
+                    s=solver, a=SOLVERS))
+        self.solver = solver
+        self.path = path
+        self._pool = ThreadPool(processes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Stop the threads."""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def check_realizable(self, spec, stats=None):
+        """Decide realizability of specification.
+
+        Consult `gr1c.check_realizable` and
+        `slugs.check_realizable`.
+
+        @type spec: L{GRSpec}
+        @type stats: L{SynthesisStats}
+        @rtype: C{bool}
+        """
+        (r,) = self._map([spec], False, stats)
+        return r
+
+    def synthesize(self, spec, stats=None):
+        """Return strategy that realizes specification.
+
+        Consult `gr1c.synthesize` and `slugs.synthesize`.
+
+        @type spec: L{GRSpec}
+        @type stats: L{SynthesisStats}
+        @return: strategy, or `None` if unrealizable
+        @rtype: C{networkx.DiGraph}
+        """
+        (r,) = self._map([spec], True, stats)
+        return r
+
+    def map_check_realizable(self, specs, stats=None):
+        """Return `list` of realizability of each spec.
+
+        The specifications are checked in parallel.
+
+        @type specs: iterable of L{GRSpec}
+        @param stats: totals over the batch.
+            The solver CPU time is that of all solver
+            processes that ran during the batch.
+        @type stats: L{SynthesisStats}
+        """
+        return self._map(specs, False, stats)
+
+    def map_synthesize(self, specs, stats=None):
+        """Return `list` of strategies, one for each spec.
+
+        The specifications are solved in parallel.
+        Consult `map_check_realizable` about `stats`.
+
+        @type specs: iterable of L{GRSpec}
+        @type stats: L{SynthesisStats}
+        """
+        return self._map(specs, True, stats)
+
+    def _map(self, specs, synth, stats):
+        if self._pool is None:
+            raise ValueError('the batch solver is closed')
+        if stats is None:
+            stats = SynthesisStats()
+        stats.solver = self.solver
+        specs = list(specs)
+        # translate in this thread, because the parser
+        # of `tulip.spec` is not thread-safe
+        start = _stats.clock()
+        jobs = [self._job(spec, synth) for spec in specs]
+        stats.add_translation(start)
+        start = os.times()
+        replies = self._pool.map(self._solve, jobs)
+        end = os.times()
+        # CPU time of terminated child processes
+        cpu = sum(end[2:4]) - sum(start[2:4])
+        wall = 0
+        results = list()
+        for spec, reply in zip(specs, replies):
+            translation, solver, returncode, out, err = reply
+            stats.record_translation(translation)
+            wall += solver
+            results.append(self._result(
+                spec, synth, returncode, out, err, stats))
+        stats.record_solver(wall, cpu, _stats.peak_rss())
+        return results
+
+    def _job(self, spec, synth):
+        """Return solver input and options for `spec`."""
+        if self.solver == 'gr1c':
+            s = translate(spec, 'gr1c')
+            options = ['-n', gr1c.select_options(spec)]
+            if synth:
+                options.extend(['-t', 'json'])
+            else:
+                options.append('-r')
+            return s, options
+        assert not spec.moore
+        assert not spec.plus_one
+        s = translate(spec, 'slugs')
+        options = slugs._slugs_options(synth, symbolic=False)
+        return s, options
+
+    def _solve(self, job):
+        """Run the solver on translated input, in a thread.
+
+        @return: wall time of the `slugs` compiler
+            (zero for `gr1c`) and of the solver,
+            return code, stdout, stderr of the solver
+        """
+        s, options = job
+        translation = 0
+        if self.solver == 'slugs':
+            start = _stats.clock()
+            returncode, s, err = _run_with_file([self._compiler], s)
+            translation, _ = _stats._since(start)
+            if returncode != 0:
+                raise Exception(
+                    'slugs compiler failed:\n{err}'.format(err=err))
+        start = _stats.clock()
+        if self.solver == 'gr1c':
+            returncode, out, err = _run([self.path] + options, s)
+        else:
+            returncode, out, err = _run_with_file(
+                [self.path], s, options)
+        solver, _ = _stats._since(start)
+        return translation, solver, returncode, out, err
+
+    def _result(self, spec, synth, returncode, out, err, stats):
+        """Return solver result, from its output."""
+        if self.solver == 'gr1c':
+            return self._gr1c_result(synth, returncode, out, err, stats)
+        realizable = slugs._check_slugs_output(returncode, out, err)
+        if not synth:
+            return realizable
+        if not realizable:
+            return None
+        start = _stats.clock()
+        strategy = slugs._load_strategy(out, spec)
+        stats.add_conversion(start)
+        return strategy
+
+    def _gr1c_result(self, synth, returncode, out, err, stats):
+        if returncode != 0:
+            logger.info(
+                'gr1c return code: {c}\n{out}\n{err}'.format(
+                    c=returncode, out=out, err=err))
+            if synth:
+                return None
+            return False
+        if not synth:
+            return True
+        start = _stats.clock()
+        strategy = gr1c.load_aut_json(out)
+        stats.add_conversion(start)
+        return strategy
+
+
+def _run(cmd, s):
+    """Return return code, stdout, stderr of `cmd` with input `s`."""
+    logger.debug('Calling: ' + ' '.join(cmd))
+    p = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True)
+    out, err = p.communicate(s)
+    return p.returncode, out, err
+
+
+def _run_with_file(cmd, s, options=tuple()):
+    """Run `cmd` with a temporary file that contains `s`.
+
+    The file name is passed after `cmd` and before `options`.
+    """
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(s.encode('utf-8'))
+    try:
+        return _run(list(cmd) + [f.name] + list(options), None)
+    finally:
+        os.unlink(f.name)
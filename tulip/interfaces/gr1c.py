@@ -47,12 +47,15 @@ from pkg_resources import parse_version
 import logging
 import copy
 import os
+import shutil
 import subprocess
 import tempfile
 import json
 import xml.etree.ElementTree as ET
 import networkx as nx
-from tulip.spec import GRSpec, translate
+from tulip.spec import GRSpec, translate_iter
+from tulip.interfaces import _stats
+from tulip.interfaces._stats import SynthesisStats
 
 
 GR1C_MIN_VERSION = '0.9.0'
@@ -396,7 +399,7 @@ def check_syntax(spec_str):
         logger.info(p.stdout.read() )
         return False
 
-def check_realizable(spec):
+def check_realizable(spec, stats=None):
     """Decide realizability of specification.
 
     Consult the documentation of L{synthesize} about parameters.
@@ -405,22 +408,24 @@ def check_realizable(spec):
     """
     logger.info('checking realizability...')
     _assert_gr1c()
+    if stats is None:
+        stats = SynthesisStats()
     init_option = select_options(spec)
-    s = translate(spec, 'gr1c')
-    f = tempfile.TemporaryFile()
-    try:
-        f.write(bytes(s, 'utf-8'))
-    except TypeError:  # Try to be compatible with Python 2.7
-        f.write(bytes(s))
-    f.seek(0)
+    start = _stats.clock()
+    f = _spec_file(spec)
+    stats.add_translation(start)
     logger.info('starting realizability check')
+    start = _stats.clock()
     p = subprocess.Popen([GR1C_BIN_PREFIX+"gr1c", "-n", init_option, "-r"],
                          stdin=f,
                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
                          universal_newlines=True)
     p.wait()
-
-    logger.info('gr1c input:\n' + s +_hl)
+    stats.add_solver(start)
+    if logger.isEnabledFor(logging.DEBUG):
+        f.seek(0)
+        s = f.read().decode('utf-8')
+        logger.debug('gr1c input:\n' + s +_hl)
 
     if p.returncode == 0:
         return True
@@ -428,7 +433,7 @@ def check_realizable(spec):
         logger.info(p.stdout.read() )
         return False
 
-def synthesize(spec):
+def synthesize(spec, stats=None):
     """Synthesize strategy realizing the given specification.
 
     @type spec: L{GRSpec}
@@ -438,17 +443,41 @@ def synthesize(spec):
     <https://tulip-control.github.io/gr1c/md_spc_format.html#initconditions>}
     for a detailed description.
 
+    @param stats: record measurements in this object
+    @type stats: L{SynthesisStats}
+
     @return: strategy as C{networkx.DiGraph},
         or None if unrealizable or error occurs.
     """
     _assert_gr1c()
+    if stats is None:
+        stats = SynthesisStats()
     init_option = select_options(spec)
+    start = _stats.clock()
+    f = _spec_file(spec)
+    stats.add_translation(start)
+    if logger.isEnabledFor(logging.DEBUG):
+        s = f.read().decode('utf-8')
+        f.seek(0)
+        logger.debug('\n{hl}\n gr1c input:\n {s}\n{hl}'.format(
+            s=s, hl=_hl))
+    # to make debugging by manually running gr1c easier
+    fname = 'spec.gr1c'
+    try:
+        if logger.getEffectiveLevel() < logging.DEBUG:
+            with open(fname, 'wb') as fout:
+                shutil.copyfileobj(f, fout)
+            f.seek(0)
+            logger.debug('wrote input to file "{f}"'.format(f=fname))
+    except:
+        logger.error('failed to write auxiliary file: "{f}"'.format(f=fname))
+    start = _stats.clock()
     try:
         p = subprocess.Popen(
             [GR1C_BIN_PREFIX + "gr1c",
              "-n", init_option,
              "-t", "json"],
-            stdin=subprocess.PIPE,
+            stdin=f,
             stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
             universal_newlines=True
         )
@@ -458,20 +487,8 @@ def synthesize(spec):
         else:
             raise
 
-    s = translate(spec, 'gr1c')
-    logger.info('\n{hl}\n gr1c input:\n {s}\n{hl}'.format(s=s, hl=_hl))
-
-    # to make debugging by manually running gr1c easier
-    fname = 'spec.gr1c'
-    try:
-        if logger.getEffectiveLevel() < logging.DEBUG:
-            with open(fname, 'w') as f:
-                f.write(s)
-            logger.debug('wrote input to file "{f}"'.format(f=fname))
-    except:
-        logger.error('failed to write auxiliary file: "{f}"'.format(f=fname))
-
-    (stdoutdata, stderrdata) = p.communicate(s)
+    (stdoutdata, stderrdata) = p.communicate()
+    stats.add_solver(start)
 
     msg = (
         ('{spaces} gr1c return code: {c}\n\n'
@@ -482,13 +499,29 @@ def synthesize(spec):
 
     if p.returncode == 0:
         logger.debug(msg)
+        start = _stats.clock()
         strategy = load_aut_json(stdoutdata)
+        stats.add_conversion(start)
         return strategy
     else:
         print(msg)
         return None
 
 
+def _spec_file(spec):
+    """Return temporary file that contains C{spec} in gr1c syntax.
+
+    The clauses are written as they are translated,
+    so the whole input is not constructed as a string.
+    The file is positioned at its start.
+    """
+    f = tempfile.TemporaryFile()
+    for s in translate_iter(spec, 'gr1c'):
+        f.write(s.encode('utf-8'))
+    f.seek(0)
+    return f
+
+
 def select_options(spec):
     """Return `gr1c` initial option based on `GRSpec` inits."""
     # Let x denote environment variables,
@@ -39,6 +39,8 @@ import logging
 from tulip.spec import translate
 from tulip.interfaces.gr1c import load_aut_json
 from tulip.interfaces.gr1c import select_options
+from tulip.interfaces import _stats
+from tulip.interfaces._stats import SynthesisStats
 try:
     import gr1py
     import gr1py.cli
@@ -50,31 +52,47 @@ logger = logging.getLogger(__name__)
 _hl = 60 * '-'
 
 
-def check_realizable(spec):
+def check_realizable(spec, stats=None):
     """Decide realizability of specification.
 
     Consult the documentation of L{synthesize} about parameters.
 
     @return: True if realizable, False if not, or an error occurs.
     """
+    if stats is None:
+        stats = SynthesisStats()
     init_option = select_options(spec)
+    start = _stats.clock()
     tsys, exprtab = _spec_to_gr1py(spec)
-    return gr1py.solve.check_realizable(
+    stats.add_translation(start)
+    start = _stats.clock()
+    r = gr1py.solve.check_realizable(
         tsys, exprtab, init_flags=init_option)
+    stats.add_solver(start)
+    return r
 
-def synthesize(spec):
+def synthesize(spec, stats=None):
     """Synthesize strategy realizing the given specification.
 
     cf. L{tulip.interfaces.gr1c.synthesize}
     """
+    if stats is None:
+        stats = SynthesisStats()
     init_option = select_options(spec)
+    start = _stats.clock()
     tsys, exprtab = _spec_to_gr1py(spec)
+    stats.add_translation(start)
+    start = _stats.clock()
     strategy = gr1py.solve.synthesize(
         tsys, exprtab, init_flags=init_option)
+    stats.add_solver(start)
     if strategy is None:
         return None
+    start = _stats.clock()
     s = gr1py.output.dumps_json(tsys.symtab, strategy)
-    return load_aut_json(s)
+    g = load_aut_json(s)
+    stats.add_conversion(start)
+    return g
 
 
 def _spec_to_gr1py(spec):
@@ -28,71 +28,138 @@ try:
     import omega
     from omega.logic import bitvector as bv
     from omega.games import gr1
+    from omega.logic import syntax as stx
+    from omega.symbolic import fol as _fol
     from omega.symbolic import symbolic as sym
     from omega.games import enumeration as enum
 except ImportError:
     omega = None
 import networkx as nx
 
+from tulip.interfaces import _stats
+from tulip.interfaces._stats import SynthesisStats
+
 
 log = logging.getLogger(__name__)
 
 
-def is_realizable(spec, use_cudd=False):
+def is_realizable(spec, use_cudd=None, bdd_options=None, stats=None):
     """Return `True` if, and only if, realizable.
 
     See `synthesize_enumerated_streett` for more details.
     """
+    if stats is None:
+        stats = SynthesisStats()
+    start = _stats.clock()
     aut = _grspec_to_automaton(spec)
     sym.fill_blanks(aut)
-    bdd = _init_bdd(use_cudd)
+    bdd = _init_bdd(use_cudd, bdd_options)
     aut.bdd = bdd
     a = aut.build()
-    t0 = time.time()
+    stats.add_translation(start)
+    start = _stats.clock()
     z, _, _ = gr1.solve_streett_game(a)
-    t1 = time.time()
-    return gr1.is_realizable(z, a)
+    r = gr1.is_realizable(z, a)
+    stats.add_solver(start)
+    _report_bdd(bdd, stats)
+    return r
 
 
-def synthesize_enumerated_streett(spec, use_cudd=False):
+def synthesize_enumerated_streett(
+        spec, use_cudd=None, bdd_options=None, stats=None):
     """Return transducer enumerated as a graph.
 
     @type spec: `tulip.spec.form.GRSpec`
-    @param use_cudd: efficient BDD computations with `dd.cudd`
+    @param use_cudd: efficient BDD computations with `dd.cudd`.
+        If `None`, then use `dd.cudd` if it is installed,
+        otherwise `dd.bdd`.
+    @param bdd_options: settings of the BDD manager,
+        see `_init_bdd`
+    @type bdd_options: `dict`
+    @param stats: record measurements in this object
+    @type stats: `SynthesisStats`
     @rtype: `networkx.DiGraph`
     """
+    if stats is None:
+        stats = SynthesisStats()
+    r = _synthesize_streett_transducer(
+        spec, use_cudd, bdd_options, stats)
+    if r is None:
+        return None
+    t, a = r
+    start = _stats.clock()
+    g = enum.action_to_steps(t, qinit=spec.qinit)
+    h = _strategy_to_state_annotated(g, a)
+    stats.add_conversion(start)
+    log.info('Strategy enumerated in {enu} sec.'.format(
+        enu=time.time() - start[0]))
+    _report_bdd(t.bdd, stats)
+    return h
+
+
+def synthesize_symbolic_streett(
+        spec, use_cudd=None, bdd_options=None, stats=None):
+    """Return transducer represented with BDDs.
+
+    Unlike `synthesize_enumerated_streett`,
+    the strategy is not enumerated.
+    Consult that function for the parameters.
+
+    @type spec: `tulip.spec.form.GRSpec`
+    @return: `None` if unrealizable
+    @rtype: `SymbolicController`
+    """
+    _check_symbolic_qinit(spec.qinit)
+    if stats is None:
+        stats = SynthesisStats()
+    r = _synthesize_streett_transducer(
+        spec, use_cudd, bdd_options, stats)
+    if r is None:
+        return None
+    t, _ = r
+    _report_bdd(t.bdd, stats)
+    return SymbolicController(t, spec)
+
+
+def _synthesize_streett_transducer(spec, use_cudd, bdd_options, stats):
+    """Return transducer and game, or `None` if unrealizable.
+
+    @type stats: `SynthesisStats`
+    @return: `(t, a)` where:
+        - `t`: transducer as `omega.symbolic.symbolic.Automaton`
+        - `a`: compiled game as `omega.symbolic.symbolic.Automaton`
+    """
+    start = _stats.clock()
     aut = _grspec_to_automaton(spec)
     sym.fill_blanks(aut)
-    bdd = _init_bdd(use_cudd)
+    bdd = _init_bdd(use_cudd, bdd_options)
     aut.bdd = bdd
     a = aut.build()
     assert a.action['sys'][0] != bdd.false
+    stats.add_translation(start)
     t0 = time.time()
+    start = _stats.clock()
     z, yij, xijk = gr1.solve_streett_game(a)
     t1 = time.time()
+    log.info('Winning set computed in {win} sec.'.format(win=t1 - t0))
     # unrealizable ?
     if not gr1.is_realizable(z, a):
         print('WARNING: unrealizable')
+        stats.add_solver(start)
+        _report_bdd(bdd, stats)
         return None
     t = gr1.make_streett_transducer(z, yij, xijk, a)
     t2 = time.time()
+    stats.add_solver(start)
     (u,) = t.action['sys']
     assert u != bdd.false
-    g = enum.action_to_steps(t, qinit=spec.qinit)
-    h = _strategy_to_state_annotated(g, a)
     del u, yij, xijk
-    t3 = time.time()
-    log.info((
-        'Winning set computed in {win} sec.\n'
-        'Symbolic strategy computed in {sym} sec.\n'
-        'Strategy enumerated in {enu} sec.').format(
-            win=t1 - t0,
-            sym=t2 - t1,
-            enu=t3 - t2))
-    return h
+    log.info('Symbolic strategy computed in {sym} sec.'.format(
+        sym=t2 - t1))
+    return t, a
 
 
-def is_circular(spec, use_cudd=False):
+def is_circular(spec, use_cudd=None, bdd_options=None):
     """Return `True` if trivial winning set non-empty.
 
     @type spec: `tulip.spec.form.GRSpec`
@@ -101,24 +168,376 @@ def is_circular(spec, use_cudd=False):
     """
     aut = _grspec_to_automaton(spec)
     sym.fill_blanks(aut)
-    bdd = _init_bdd(use_cudd)
+    bdd = _init_bdd(use_cudd, bdd_options)
     aut.bdd = bdd
     triv, t = gr1.trivial_winning_set(aut)
     return triv != t.bdd.false
 
 
-def _init_bdd(use_cudd):
+class RealizabilitySession(object):
+    """Check realizability of a growing specification.
+
+    The BDD manager, variable order, and compiled
+    automaton are created once, from the specification
+    passed to the constructor.
+    Clauses added with `add` are translated and
+    conjoined to the existing BDD nodes.
+
+    Adding guarantees can only shrink the winning set,
+    so the fixpoint is then initialized with the winning
+    set of the previous solution.
+    Adding assumptions can enlarge the winning set,
+    so the fixpoint is then recomputed starting from `TRUE`.
+    Initial conditions do not affect the winning set,
+    so adding them only repeats the realizability check.
+
+    All variables must be declared in the initial specification.
+
+    Example:
+
+      >>> s = RealizabilitySession(spec)
+      >>> s.is_realizable()
+      >>> s.add(sys_safety="y' -> x")
+      >>> s.is_realizable()
+    """
+
+    def __init__(self, spec, use_cudd=None, bdd_options=None):
+        """Build the automaton of `spec`.
+
+        @type spec: `tulip.spec.form.GRSpec`
+        @param use_cudd, bdd_options: as for
+            `synthesize_enumerated_streett`
+        """
+        self.spec = spec.copy()
+        aut = _grspec_to_automaton(self.spec)
+        sym.fill_blanks(aut)
+        self.bdd = _init_bdd(use_cudd, bdd_options)
+        aut.bdd = self.bdd
+        self.aut = aut.build()
+        # placeholders added by `fill_blanks`
+        self._blank = {
+            'env_prog': not spec.env_prog,
+            'sys_prog': not spec.sys_prog}
+        # winning set of current game, if known
+        self._win = None
+        # superset of the winning set, for warm start
+        self._bound = None
+
+    def add(self, **clauses):
+        """Conjoin clauses to the specification.
+
+        Keyword arguments are names of specification parts,
+        for example `sys_safety`, and the values are a formula
+        or a list of formulae, as in `GRSpec`.
+        """
+        spec = self.spec
+        # check all parts before changing any
+        unknown = set(clauses).difference(spec._parts)
+        if unknown:
+            raise ValueError(
+                'unknown specification part(s): {p}'.format(p=unknown))
+        clauses = {
+            part: [formulae] if isinstance(formulae, str) else list(formulae)
+            for part, formulae in clauses.items()}
+        for part, formulae in clauses.items():
+            getattr(spec, part).extend(formulae)
+        spec.str_to_int()
+        f = spec._bool_int.__getitem__
+        for part, formulae in clauses.items():
+            for x in formulae:
+                self._add_clause(part, f(x))
+
+    def _add_clause(self, part, s):
+        """Conjoin integer-valued clause `s` to `part`."""
+        aut = self.aut
+        bdd = self.bdd
+        owner, kind = part.split('_')
+        if kind == 'prog':
+            if owner == 'env':
+                key = '<>[]'
+                s = '!({s})'.format(s=s)
+            else:
+                key = '[]<>'
+            u = aut.add_expr(s)
+            if self._blank[part]:
+                aut.win[key] = [u]
+                self._blank[part] = False
+            else:
+                aut.win[key].append(u)
+        else:
+            attr = aut.init if kind == 'init' else aut.action
+            u = aut.add_expr(s)
+            (v,) = attr[owner]
+            attr[owner] = [bdd.apply('and', v, u)]
+        if kind == 'init':
+            return
+        if owner == 'sys':
+            # guarantees shrink the winning set
+            if self._win is not None:
+                self._bound = self._win
+        else:
+            self._bound = None
+        self._win = None
+
+    def winning_set(self):
+        """Return winning set as BDD node of `self.bdd`."""
+        if self._win is None:
+            z, _, _ = _solve_streett_game(self.aut, self._bound)
+            self._win = z
+            self._bound = None
+        return self._win
+
+    def is_realizable(self):
+        """Return `True` if, and only if, realizable."""
+        z = self.winning_set()
+        return gr1.is_realizable(z, self.aut)
+
+
+class SymbolicController(object):
+    """Strategy represented with BDDs, without enumeration.
+
+    The states of the controller are `dict`s that assign
+    integer values to the variables of the specification,
+    and to the counter of recurrence goals `_goal`.
+    String variables are encoded as integers,
+    as in `GRSpec.str_to_int`.
+    The state `'Sinit'` precedes the first reaction,
+    as in the `MealyMachine` returned by `synth.strategy2mealy`.
+
+    Each reaction picks a satisfying assignment of
+    the transducer action, after substituting the
+    current state and the next input values.
+    So memory is proportional to the BDDs,
+    not to the number of enumerated states.
+
+    The first reaction receives the initial input values,
+    so only `spec.qinit` modes where the environment picks
+    its initial values are supported: `'\\A \\A'` and `'\\A \\E'`.
+    """
+
+    def __init__(self, t, spec):
+        """Wrap transducer `t` synthesized from `spec`.
+
+        @type t: `omega.symbolic.symbolic.Automaton`
+        @type spec: `tulip.spec.form.GRSpec`
+        """
+        _check_symbolic_qinit(spec.qinit)
+        self.qinit = spec.qinit
+        self.aut = t
+        self.bdd = t.bdd
+        self.initial_state = 'Sinit'
+        self.inputs = dict(spec.env_vars)
+        self.outputs = dict(spec.sys_vars)
+        self._str_vars = {
+            k: v for k, v in self.inputs.items()
+            if isinstance(v, list)}
+        self._str_vars.update(
+            (k, v) for k, v in self.outputs.items()
+            if isinstance(v, list))
+        fol = _fol.Context()
+        fol.bdd = t.bdd
+        fol.vars = sym._prime_and_order_table(t.vars)
+        self._fol = fol
+        sys_vars = [
+            var for var, d in t.vars.items()
+            if d['owner'] == 'sys']
+        self._sys_vars = set(sys_vars)
+        self._sys_pvars = {stx.prime(var) for var in sys_vars}
+        (env_action,) = t.action['env']
+        (sys_action,) = t.action['sys']
+        self._action = t.bdd.apply('and', env_action, sys_action)
+        (self._init,) = t.init['env']
+
+    def reaction(self, from_state, inputs):
+        """Return next state and outputs, reacting to `inputs`.
+
+        Same interface as `MealyMachine.reaction`.
+
+        @param from_state: `'Sinit'` or a state
+            returned by a previous reaction
+        @type from_state: `str` or `dict`
+        @param inputs: assigns a value to each input
+        @type inputs: `dict`
+        @return: `(next_state, outputs)`
+        @rtype: `tuple` of two `dict`
+        """
+        missing = set(self.inputs).difference(inputs)
+        if missing:
+            raise ValueError(
+                'missing input port(s): {m}'.format(m=missing))
+        fol = self._fol
+        values = self._str_to_int(inputs)
+        if from_state == self.initial_state:
+            u = fol.replace(self._init, values)
+            care = self._sys_vars
+        else:
+            u = fol.replace(self._action, from_state)
+            primed = {stx.prime(k): v for k, v in values.items()}
+            u = fol.replace(u, primed)
+            care = self._sys_pvars
+        d = fol.pick(u, full=True, care_vars=care)
+        if d is None:
+            raise ValueError((
+                'not a valid input {i} at state {s}').format(
+                    i=inputs, s=from_state))
+        next_state = dict(values)
+        next_state.update(
+            (stx.unprime(k) if stx.isprimed(k) else k, v)
+            for k, v in d.items())
+        outputs = {
+            k: self._int_to_str(k, next_state[k])
+            for k in self.outputs}
+        return next_state, outputs
+
+    def _str_to_int(self, values):
+        """Return `values` with strings replaced by integers."""
+        d = dict()
+        for k, v in values.items():
+            if k in self._str_vars:
+                v = self._str_vars[k].index(v)
+            d[k] = v
+        return d
+
+    def _int_to_str(self, var, value):
+        if var in self._str_vars:
+            return self._str_vars[var][value]
+        return value
+
+
+def _check_symbolic_qinit(qinit):
+    """Raise `ValueError` if `SymbolicController` can't implement `qinit`.
+
+    In the modes `'\\E \\A'` and `'\\E \\E'` the controller
+    picks initial values before (or instead of) the environment,
+    which a reaction to given inputs cannot express.
+    """
+    if qinit in (r'\A \A', r'\A \E'):
+        return
+    raise ValueError((
+        'symbolic controller does not support '
+        'qinit = {q!r}, synthesize an enumerated '
+        'strategy instead').format(q=qinit))
+
+
+def _solve_streett_game(aut, z=None):
+    """Return winning set and iterants for Streett(1) game.
+
+    Same as `omega.games.gr1.solve_streett_game`,
+    but starting the greatest fixpoint from `z`.
+
+    @param z: BDD node that contains the winning set,
+        or `None` for `TRUE`
+    """
+    bdd = aut.bdd
+    if z is None:
+        z = bdd.true
+    zold = None
+    while z != zold:
+        zold = z
+        xijk = list()
+        yij = list()
+        for goal in aut.win['[]<>']:
+            y, yj, xjk = gr1._attractor_under_assumptions(z, goal, aut)
+            z = bdd.apply('and', z, y)
+            xijk.append(xjk)
+            yij.append(yj)
+    return z, yij, xijk
+
+
+def _init_bdd(use_cudd, bdd_options=None):
+    """Return BDD manager, configured with `bdd_options`.
+
+    If `use_cudd is None`, then use `dd.cudd` if it
+    is installed, otherwise fall back to `dd.bdd`.
+
+    For `dd.cudd`, the options `memory_estimate` and
+    `initial_cache_size` (bytes, slots) are passed to the
+    constructor, and the rest to `dd.cudd.BDD.configure`,
+    for example:
+
+      - `reordering`: enable dynamic variable reordering
+      - `max_memory`: upper bound in bytes
+      - `max_cache_hard`: upper bound of cache entries
+
+    For `dd.bdd`, the option `max_nodes` bounds the number
+    of nodes, and the rest are passed to `configure`,
+    if the installed version of `dd` supports it.
+
+    @type use_cudd: `bool` or `None`
+    @type bdd_options: `dict`
+    """
     if _bdd is None:
         raise ImportError(
             'Failed to import `dd.bdd`.\n'
             'Install package `dd`.')
+    if use_cudd is None:
+        use_cudd = cudd is not None
+        log.debug('auto-selected BDD package: {p}'.format(
+            p='dd.cudd' if use_cudd else 'dd.bdd'))
+    if bdd_options is None:
+        bdd_options = dict()
+    kw = dict(bdd_options)
     if not use_cudd:
-        return _bdd.BDD()
+        bdd = _bdd.BDD()
+        max_nodes = kw.pop('max_nodes', None)
+        if max_nodes is not None:
+            bdd.max_nodes = max_nodes
+        if kw and not hasattr(bdd, 'configure'):
+            raise ValueError((
+                'options {kw} are unsupported by '
+                'this version of `dd.bdd`').format(kw=kw))
+        if kw:
+            bdd.configure(**kw)
+        return bdd
     if cudd is None:
         raise ImportError(
             'Failed to import module `dd.cudd`.\n'
             'Compile the Cython bindings of `dd` to CUDD.')
-    return cudd.BDD()
+    init = {
+        k: kw.pop(k)
+        for k in ('memory_estimate', 'initial_cache_size')
+        if k in kw}
+    bdd = cudd.BDD(**init)
+    if kw:
+        bdd.configure(**kw)
+    return bdd
+
+
+def bdd_statistics(bdd):
+    """Return `dict` of node counts and memory used.
+
+    Keys:
+
+      - `n_nodes`: number of nodes in `bdd`
+      - `peak_nodes`: maximum number of nodes, or `None`
+        if not reported by the BDD package
+      - `peak_rss`: peak resident memory in bytes,
+        or `None` if unknown (see `_stats.peak_rss`)
+
+    @param bdd: `dd.bdd.BDD` or `dd.cudd.BDD`
+    @rtype: `dict`
+    """
+    if hasattr(bdd, 'statistics'):
+        d = bdd.statistics()
+        n = d['n_nodes']
+        peak = d['peak_nodes']
+    else:
+        n = len(bdd)
+        peak = None
+    return dict(n_nodes=n, peak_nodes=peak, peak_rss=_stats.peak_rss())
+
+
+def _report_bdd(bdd, stats):
+    """Log BDD statistics, and record them in `stats`.
+
+    @type stats: `SynthesisStats`
+    """
+    d = bdd_statistics(bdd)
+    log.info((
+        'BDD nodes: {n_nodes}, peak nodes: {peak_nodes}, '
+        'peak RSS: {peak_rss} bytes').format(**d))
+    stats.bdd_nodes = d['n_nodes']
+    stats.bdd_peak_nodes = d['peak_nodes']
 
 
 def _int_bounds(aut):
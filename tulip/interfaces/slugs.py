@@ -41,7 +41,9 @@ import os
 import subprocess
 import tempfile
 import networkx as nx
-from tulip.spec import GRSpec, translate
+from tulip.spec import GRSpec, translate_iter
+from tulip.interfaces import _stats
+from tulip.interfaces._stats import SynthesisStats
 
 
 # If this path begins with '/', then it is considered to be absolute.
@@ -52,51 +54,77 @@ BDD_FILE = 'strategy_bdd.txt'
 logger = logging.getLogger(__name__)
 
 
-def check_realizable(spec):
+def check_realizable(spec, stats=None):
     """Decide realizability of specification.
 
     Consult the documentation of L{synthesize} about parameters.
 
     @return: True if realizable, False if not, or an error occurs.
     """
-    if isinstance(spec, GRSpec):
-        assert not spec.moore
-        assert not spec.plus_one
-        struct = translate(spec, 'slugs')
-    else:
-        struct = spec
-    with tempfile.NamedTemporaryFile(delete=False) as fin:
-        try:
-            fin.write(bytes(struct, 'utf-8'))
-        except TypeError:  # Try to be compatible with Python 2.7
-            fin.write(bytes(struct))
-        
-    realizable, out = _call_slugs(fin.name, synth=False)
+    if stats is None:
+        stats = SynthesisStats()
+    start = _stats.clock()
+    fin = _spec_file(spec)
+    stats.add_translation(start)
+    realizable, out = _call_slugs(fin.name, synth=False, stats=stats)
+    os.unlink(fin.name)
     return realizable
 
 
-def synthesize(spec, symbolic=False):
+def synthesize(spec, symbolic=False, stats=None):
     """Return strategy satisfying the specification C{spec}.
 
     @type spec: L{GRSpec} or C{str} in structured slugs syntax.
+    @param stats: record measurements in this object
+    @type stats: L{SynthesisStats}
     @return: If realizable return synthesized strategy, otherwise C{None}.
     @rtype: C{networkx.DiGraph}
     """
+    if stats is None:
+        stats = SynthesisStats()
+    start = _stats.clock()
+    fin = _spec_file(spec)
+    stats.add_translation(start)
+    realizable, out = _call_slugs(
+        fin.name, synth=True, symbolic=symbolic, stats=stats)
+    os.unlink(fin.name)
+    if not realizable:
+        return None
+    start = _stats.clock()
+    h = _load_strategy(out, spec)
+    stats.add_conversion(start)
+    return h
+
+
+def _spec_file(spec):
+    """Return closed temporary file that contains C{spec}.
+
+    The caller should remove the file.
+    A L{GRSpec} is written as its clauses are translated,
+    so the whole input is not constructed as a string.
+
+    @type spec: L{GRSpec} or C{str} in structured slugs syntax.
+    """
     if isinstance(spec, GRSpec):
         assert not spec.moore
         assert not spec.plus_one
-        struct = translate(spec, 'slugs')
+        pieces = translate_iter(spec, 'slugs')
     else:
-        struct = spec
+        pieces = [spec]
     with tempfile.NamedTemporaryFile(delete=False) as fin:
-        try:
-            fin.write(bytes(struct, 'utf-8'))
-        except TypeError:  # Try to be compatible with Python 2.7
-            fin.write(bytes(struct))
-    realizable, out = _call_slugs(fin.name, synth=True, symbolic=symbolic)
-    if not realizable:
-        return None
-    os.unlink(fin.name)
+        for s in pieces:
+            fin.write(s.encode('utf-8'))
+    return fin
+
+
+def _load_strategy(out, spec):
+    """Return strategy from JSON output of `slugs`.
+
+    @param out: output of `slugs --explicitStrategy --jsonOutput`
+    @type out: C{str}
+    @type spec: L{GRSpec}
+    @rtype: C{networkx.DiGraph}
+    """
     # collect int vars
     vrs = dict(spec.sys_vars)
     vrs.update(spec.env_vars)
@@ -146,7 +174,8 @@ def _bitfields_to_ints(bit_state, vrs):
     return int_state
 
 
-def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
+def _call_slugs(filename, synth=True, symbolic=True,
+                slugs_compiler_path=None, stats=None):
     """Call `slugs` and return results.
 
     slugs_compiler_path is the path to the slugsin converter format.
@@ -154,15 +183,59 @@ def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
     identifier SLUGS_COMPILER_PATH.  If this path begins with '/',
     then it is considered to be absolute.  Otherwise, it is relative
     to the path of the `slugs` executable.
+
+    The compiler is timed as translation, and `slugs` as solver,
+    in `stats` (L{SynthesisStats}).
+    """
+    if stats is None:
+        stats = SynthesisStats()
+    slugs_path, slugs_compiler_path = _find_slugs(slugs_compiler_path)
+    start = _stats.clock()
+    with tempfile.NamedTemporaryFile(delete=False) as slugs_infile:
+        subprocess.check_call([slugs_compiler_path, filename],
+                              stdout=slugs_infile,
+                              stderr=subprocess.STDOUT,
+                              universal_newlines=True)
+    stats.add_translation(start)
+    options = [slugs_path, slugs_infile.name]
+    options.extend(_slugs_options(synth, symbolic))
+    logger.debug('Calling: ' + ' '.join(options))
+    start = _stats.clock()
+    try:
+        p = subprocess.Popen(
+            options,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True)
+    except OSError as e:
+        if e.errno == os.errno.ENOENT:
+            raise Exception('slugs not found in path.')
+        else:
+            raise
+    out, err = p.communicate()
+    stats.add_solver(start)
+    realizable = _check_slugs_output(p.returncode, out, err)
+    return realizable, out
+
+
+def _find_slugs(slugs_compiler_path=None, slugs_path=None):
+    """Return paths to `slugs` and its compiler.
+
+    Consult L{_call_slugs} about `slugs_compiler_path`.
+
+    @param slugs_path: path to `slugs` executable,
+        if `None` then search the `PATH`
+    @rtype: C{tuple} of C{str}
     """
     if slugs_compiler_path is None:
         slugs_compiler_path = SLUGS_COMPILER_PATH
 
-    slugs_path = None
-    for exe_path in os.environ['PATH'].split(':'):
-        if os.path.exists(os.path.join(exe_path, 'slugs')):
-            slugs_path = os.path.join(exe_path, 'slugs')
-            break
+    if slugs_path is None:
+        for exe_path in os.environ['PATH'].split(':'):
+            if os.path.exists(os.path.join(exe_path, 'slugs')):
+                slugs_path = os.path.join(exe_path, 'slugs')
+                break
 
     if slugs_path is None:
         raise Exception('slugs not found in path.')
@@ -174,14 +247,15 @@ def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
 
     if not os.path.exists(slugs_compiler_path):
         raise Exception('slugs/compiler.py not found.')
+    return slugs_path, slugs_compiler_path
 
-    with tempfile.NamedTemporaryFile(delete=False) as slugs_infile:
-        subprocess.check_call([slugs_compiler_path, filename],
-                              stdout=slugs_infile,
-                              stderr=subprocess.STDOUT,
-                              universal_newlines=True)
 
-    options = [slugs_path, slugs_infile.name]
+def _slugs_options(synth, symbolic):
+    """Return command-line options for `slugs`.
+
+    @rtype: C{list} of C{str}
+    """
+    options = list()
     if synth:
         if symbolic:
             options.extend(['--symbolicStrategy', BDD_FILE])
@@ -196,30 +270,24 @@ def _call_slugs(filename, synth=True, symbolic=True, slugs_compiler_path=None):
         # provide `--onlyRealizability` leads to error message from
         # `slugs`: "Error: Parameter '--onlyRealizability' is unknown."
         pass
-    logger.debug('Calling: ' + ' '.join(options))
-    try:
-        p = subprocess.Popen(
-            options,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True)
-    except OSError as e:
-        if e.errno == os.errno.ENOENT:
-            raise Exception('slugs not found in path.')
-        else:
-            raise
-    out, err = p.communicate()
+    return options
+
+
+def _check_slugs_output(returncode, out, err):
+    """Return `True` if `slugs` reported realizability.
+
+    Raise `Exception` if `slugs` failed.
+    """
     msg = (
-        '\n slugs return code: {c}\n\n'.format(c=p.returncode) +
+        '\n slugs return code: {c}\n\n'.format(c=returncode) +
         '\n slugs stderr: {c}\n\n'.format(c=err) +
         '\n slugs stdout:\n\n {out}\n\n'.format(out=out))
     logger.debug(msg)
     # error ?
-    if p.returncode != 0:
+    if returncode != 0:
         raise Exception(msg)
     realizable = 'Specification is realizable' in err
     # check sanity
     if not realizable:
         assert 'Specification is unrealizable' in err
-    return realizable, out
+    return realizable
@@ -32,4 +32,4 @@
 """Specification subpackage of TuLiP"""
 from __future__ import absolute_import
 from .form import LTL, GRSpec
-from .translation import translate
+from .translation import translate, translate_iter
@@ -36,6 +36,7 @@ Syntax taken originally roughly from:
 http://spot.lip6.fr/wiki/LtlSyntax
 """
 import logging
+import weakref
 logger = logging.getLogger(__name__)
 
 
@@ -70,17 +71,55 @@ FULL_OPERATOR_NAMES = {
 }
 
 
+class _HashConsing(type):
+    """Metaclass that returns an existing node, if constructed before.
+
+    Nodes are looked up by class and constructor arguments.
+    Operands are compared by identity, so equal subtrees
+    built bottom-up are a single object.
+    The table holds weak references, so unused nodes are freed.
+
+    Nodes must not be changed after construction.
+    C{copy.copy} bypasses the table, and returns a new node
+    that can be changed.
+    """
+
+    def __call__(cls, *args, **kw):
+        table = cls._table
+        if table is None or kw:
+            return super(_HashConsing, cls).__call__(*args, **kw)
+        key = (cls,) + args
+        try:
+            u = table.get(key)
+        except TypeError:
+            # unhashable argument, let the constructor raise
+            return super(_HashConsing, cls).__call__(*args)
+        if u is None:
+            u = super(_HashConsing, cls).__call__(*args)
+            table[key] = u
+        return u
+
+
+# base with metaclass, for both python 2 and 3
+_HashConsed = _HashConsing('_HashConsed', (object,), dict(_table=None))
+
+
 def make_nodes(opmap=None):
     """Return class with attributes the AST node classes.
 
     The tree is defined recursively,
     not with a graph data structure.
     L{Tree} is a graph data structure for that purpose.
+
+    Nodes are hash-consed: constructing a node equal to
+    an existing one returns the existing node.
+    So identical subformulas are shared, and nodes must
+    be treated as immutable. Each call creates a new table.
     """
     if opmap is None:
         opmap = OPMAP
 
-    class Node(object):
+    class Node(_HashConsed):
         """Base class for AST nodes."""
         opmap = None
 
@@ -94,6 +133,7 @@ def make_nodes(opmap=None):
             pass
 
     Node.opmap = opmap
+    Node._table = weakref.WeakValueDictionary()
 
     # Do not confuse "term" with the abbreviation of "terminal".
     # A "term" in FOL can comprise of terminals,
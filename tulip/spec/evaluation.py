@@ -0,0 +1,250 @@
+# Copyright by California Institute of Technology
+# All rights reserved. See LICENSE file at:
+# https://github.com/tulip-control/tulip-control
+"""Compile formulas to python functions that evaluate them.
+
+A state is a C{dict} that maps variable names to values.
+A compiled formula is a function C{f(s, t=None)},
+where C{s} is the current state and C{t} the next state.
+Primed variables (under the operator C{X}) are read from C{t}.
+
+With C{vectorize=True} each value is an array instead
+(for example, a column of a table of states), so one call
+evaluates the formula over many states, using C{numpy}.
+The result is then a Boolean array.
+
+Temporal operators other than C{X} are not state predicates,
+so compiling them raises a C{ValueError}.
+Clauses of progress parts of a L{GRSpec} are compiled without
+the surrounding C{[]<>}, and of safety parts without C{[]}.
+"""
+from __future__ import absolute_import
+import logging
+import weakref
+
+import numpy
+
+from tulip.spec import ast
+from tulip.spec import parser
+from tulip.spec import translation as ts
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_closure_nodes():
+    """AST classes that flatten to python expressions.
+
+    Variable C{x} flattens to C{s['x']},
+    and C{x'} to C{t['x']}.
+    """
+    opmap = {
+        'True': 'True', 'False': 'False',
+        '!': '(not {0})', 'X': None,
+        '&': '({0} and {1})', '|': '({0} or {1})',
+        '^': '({0} != {1})',
+        '->': '((not {0}) or {1})', '<->': '({0} == {1})',
+        '<': '({0} < {1})', '<=': '({0} <= {1})',
+        '=': '({0} == {1})', '!=': '({0} != {1})',
+        '>=': '({0} >= {1})', '>': '({0} > {1})',
+        '+': '({0} + {1})', '-': '({0} - {1})',
+        '*': '({0} * {1})', '/': '({0} // {1})',
+        'ite': '({1} if {0} else {2})'}
+    return _make_nodes(opmap)
+
+
+def make_numpy_nodes():
+    """AST classes that flatten to C{numpy} expressions.
+
+    Same as L{make_closure_nodes}, but connectives
+    apply elementwise to arrays.
+    """
+    opmap = {
+        'True': 'True', 'False': 'False',
+        '!': 'numpy.logical_not({0})', 'X': None,
+        '&': 'numpy.logical_and({0}, {1})',
+        '|': 'numpy.logical_or({0}, {1})',
+        '^': 'numpy.logical_xor({0}, {1})',
+        '->': 'numpy.logical_or(numpy.logical_not({0}), {1})',
+        '<->': 'numpy.equal({0}, {1})',
+        '<': '({0} < {1})', '<=': '({0} <= {1})',
+        '=': '({0} == {1})', '!=': '({0} != {1})',
+        '>=': '({0} >= {1})', '>': '({0} > {1})',
+        '+': '({0} + {1})', '-': '({0} - {1})',
+        '*': '({0} * {1})', '/': '({0} // {1})',
+        'ite': 'numpy.where({0}, {1}, {2})'}
+    return _make_nodes(opmap)
+
+
+def _make_nodes(opmap):
+    """Return AST classes that flatten by the templates in C{opmap}."""
+    nodes = ast.make_fol_nodes(opmap)
+
+    class Var(nodes.Var):
+        def flatten(self, prime=False, **kw):
+            return '{s}[{v!r}]'.format(
+                s='t' if prime else 's', v=self.value)
+
+    class Num(nodes.Num):
+        def flatten(self, *arg, **kw):
+            return str(int(self.value))
+
+    class Str(nodes.Str):
+        def flatten(self, *arg, **kw):
+            return repr(self.value)
+
+    class Operator(nodes.Operator):
+        def flatten(self, *arg, **kw):
+            template = self.opmap.get(self.operator)
+            if template is None:
+                raise ValueError(
+                    'cannot compile operator "{op}" in: {f}'.format(
+                        op=self.operator, f=self))
+            return template.format(
+                *[x.flatten(*arg, **kw) for x in self.operands])
+
+    class Unary(Operator, nodes.Unary):
+        def flatten(self, *arg, **kw):
+            if self.operator != 'X':
+                return super(Unary, self).flatten(*arg, **kw)
+            if kw.get('prime'):
+                raise ValueError(
+                    'nested next operators in: {f}'.format(f=self))
+            kw.update(prime=True)
+            return self.operands[0].flatten(*arg, **kw)
+
+    class Binary(Operator, nodes.Binary):
+        pass
+
+    class Comparator(Operator, nodes.Comparator):
+        pass
+
+    class Arithmetic(Operator, nodes.Arithmetic):
+        pass
+
+    nodes.Var = Var
+    nodes.Num = Num
+    nodes.Str = Str
+    nodes.Operator = Operator
+    nodes.Unary = Unary
+    nodes.Binary = Binary
+    nodes.Comparator = Comparator
+    nodes.Arithmetic = Arithmetic
+    return nodes
+
+
+lang2nodes = {
+    'closure': make_closure_nodes(),
+    'numpy': make_numpy_nodes()}
+# memoized translations, as in `translation.translate_ast`
+_translated = {lang: weakref.WeakKeyDictionary() for lang in lang2nodes}
+_classes = {lang: dict() for lang in lang2nodes}
+
+
+def to_expression(tree, vectorize=False):
+    """Return python expression of formula C{tree}, as C{str}.
+
+    The expression reads variables from the states
+    C{s} and C{t} (see module docstring).
+
+    @param tree: recursive AST
+    @param vectorize: if C{True}, then use C{numpy} functions
+    @type vectorize: C{bool}
+    @rtype: C{str}
+    """
+    lang = 'numpy' if vectorize else 'closure'
+    u = ts._ast_to_lang(
+        tree, lang2nodes[lang], _translated[lang], _classes[lang])
+    return u.flatten()
+
+
+def compile_formula(tree, vectorize=False):
+    """Return function that evaluates formula C{tree}.
+
+    @param tree: recursive AST, or C{str} to parse
+    @param vectorize: see module docstring
+    @type vectorize: C{bool}
+    @return: function of current and next state
+    @rtype: callable
+    """
+    return compile_clauses([tree], vectorize)
+
+
+def compile_clauses(clauses, vectorize=False):
+    """Return function that evaluates the conjunction of C{clauses}.
+
+    @param clauses: recursive ASTs or C{str} to parse
+    @type clauses: iterable
+    @param vectorize: see module docstring
+    @type vectorize: C{bool}
+    @rtype: callable
+    """
+    exprs = list()
+    for c in clauses:
+        if isinstance(c, str):
+            c = parser.parse(c)
+        exprs.append(to_expression(c, vectorize))
+    logger.debug('compile: {e}'.format(e=exprs))
+    if not vectorize:
+        if not exprs:
+            exprs = ['True']
+        s = 'lambda s, t=None: ' + ' and '.join(exprs)
+        return eval(s, dict())
+    fs = [eval('lambda s, t=None: ' + e, dict(numpy=numpy))
+          for e in exprs]
+
+    def f(s, t=None):
+        n = _length(s, t)
+        r = numpy.ones(n, dtype=bool)
+        for g in fs:
+            numpy.logical_and(r, g(s, t), out=r)
+        return r
+    return f
+
+
+def compile_part(spec, part, no_str=False, vectorize=False):
+    """Return function that evaluates the conjunction of C{part}.
+
+    For example, C{compile_part(spec, 'sys_safety')}
+    checks a transition C{(s, t)} against the system's safety
+    clauses, and C{compile_part(spec, 'env_init')} checks
+    a state C{s} against the initial assumption.
+
+    @type spec: L{GRSpec}
+    @param part: name of an attribute of C{spec},
+        for example C{'env_init'}
+    @type part: C{str}
+    @param no_str: if C{True}, then compile the clauses
+        with string variables replaced by integers,
+        as in L{GRSpec.compile_init}
+    @param vectorize: see module docstring
+    @rtype: callable
+    """
+    return compile_clauses(part_asts(spec, part, no_str), vectorize)
+
+
+def part_asts(spec, part, no_str=False):
+    """Return C{list} of ASTs of the clauses in C{part} of C{spec}.
+
+    @param no_str: see L{compile_part}
+    """
+    if part not in spec._parts:
+        raise ValueError(
+            'unknown part "{p}", available: {a}'.format(
+                p=part, a=sorted(spec._parts)))
+    clauses = getattr(spec, part)
+    if no_str:
+        spec.str_to_int()
+        clauses = [spec._bool_int[x] for x in clauses]
+    return [spec.ast(x) for x in clauses]
+
+
+def _length(s, t):
+    """Return length of arrays in states C{s} and C{t}."""
+    for d in (s, t):
+        if not d:
+            continue
+        for v in d.values():
+            return len(v)
+    raise ValueError('cannot infer the number of states, '
+                     'because no values are given')
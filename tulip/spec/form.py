@@ -357,6 +357,8 @@ class GRSpec(LTL):
         """
         self.parser = parser
         self._ast = dict()
+        # parsed, but identifiers not checked yet
+        self._unchecked_ast = dict()
         self._cache = {
             'string': dict(),
             'jtlv': dict(),
@@ -400,12 +402,10 @@ class GRSpec(LTL):
                     setattr(self, formula_component, [])
                 else:
                     setattr(self, formula_component, [x])
-            elif not isinstance(x, list):
+            else:
+                # clauses are strings, so a shallow copy suffices
                 setattr(self, formula_component, list(x))
 
-            setattr(self, formula_component,
-                    copy.deepcopy(getattr(self, formula_component)))
-
         LTL.__init__(self, formula=self.to_canon(),
                      input_variables=self.env_vars,
                      output_variables=self.sys_vars)
@@ -588,25 +588,41 @@ class GRSpec(LTL):
                     ' found in {name}: {f}'.format(f=f, name=name))
 
     def copy(self):
-        """Return a copy of `self`."""
-        r = GRSpec(
-            env_vars=dict(self.env_vars),
-            sys_vars=dict(self.sys_vars),
-            env_init=copy.copy(self.env_init),
-            env_safety=copy.copy(self.env_safety),
-            env_prog=copy.copy(self.env_prog),
-            sys_init=copy.copy(self.sys_init),
-            sys_safety=copy.copy(self.sys_safety),
-            sys_prog=copy.copy(self.sys_prog))
-        r.moore = self.moore
-        r.plus_one = self.plus_one
-        r.qinit = self.qinit
+        """Return a copy of `self`.
+
+        The clause lists and variable declarations are copied.
+        Cached ASTs are shared, because they are not changed
+        (they are hash-consed), so the copy need not parse again.
+        """
+        r = GRSpec.__new__(GRSpec)
+        r.__dict__.update(self.__dict__)
+        r.env_vars = copy.deepcopy(self.env_vars)
+        r.sys_vars = copy.deepcopy(self.sys_vars)
+        r.input_variables = r.env_vars
+        r.output_variables = r.sys_vars
+        for x in self._parts:
+            setattr(r, x, list(getattr(self, x)))
+        r._ast = dict(self._ast)
+        r._unchecked_ast = dict(self._unchecked_ast)
+        r._bool_int = dict(self._bool_int)
+        r._cache = {k: dict(v) for k, v in self._cache.items()}
         return r
 
     def __or__(self, other):
         """Create union of two specifications."""
+        if not isinstance(other, GRSpec):
+            raise TypeError('type(other) must be GRSpec')
         result = self.copy()
+        result |= other
+        return result
 
+    def __ior__(self, other):
+        """Add the variables and clauses of C{other} to C{self}.
+
+        Takes time linear in the size of C{other},
+        so a spec can be built by repeated unions.
+        The cached ASTs of C{other} are reused.
+        """
         if not isinstance(other, GRSpec):
             raise TypeError('type(other) must be GRSpec')
 
@@ -617,21 +633,30 @@ class GRSpec(LTL):
         assert self.qinit == other.qinit, (
             self.qinit, other.qinit)
         # common vars have same types ?
-        for varname in set(other.env_vars) & set(result.env_vars):
-            if other.env_vars[varname] != result.env_vars[varname]:
+        for varname in set(other.env_vars) & set(self.env_vars):
+            if other.env_vars[varname] != self.env_vars[varname]:
                 raise ValueError('Mismatched variable domains')
 
-        for varname in set(other.sys_vars) & set(result.sys_vars):
-            if other.sys_vars[varname] != result.sys_vars[varname]:
+        for varname in set(other.sys_vars) & set(self.sys_vars):
+            if other.sys_vars[varname] != self.sys_vars[varname]:
                 raise ValueError('Mismatched variable domains')
 
-        result.env_vars.update(other.env_vars)
-        result.sys_vars.update(other.sys_vars)
+        self.env_vars.update(copy.deepcopy(other.env_vars))
+        self.sys_vars.update(copy.deepcopy(other.sys_vars))
 
         for x in self._parts:
-            getattr(result, x).extend(getattr(other, x))
-
-        return result
+            clauses = getattr(other, x)
+            getattr(self, x).extend(clauses)
+            # parsed with the same domains
+            for c in clauses:
+                if c in self._ast or c not in other._ast:
+                    continue
+                self._ast[c] = other._ast[c]
+                f = other._bool_int.get(c)
+                if f in other._ast:
+                    self._bool_int[c] = f
+                    self._ast[f] = other._ast[f]
+        return self
 
     def to_canon(self):
         """Output formula in TuLiP LTL syntax.
@@ -685,11 +710,10 @@ class GRSpec(LTL):
             keyed by original clause (before substitution).
         """
         logger.info('substitute values for variables...')
-        a = copy.deepcopy(self._ast)
-        for formula, tree in a.items():
-            g = tx.Tree.from_recursive_ast(tree)
-            tx.sub_values(g, var_values)
-            a[formula] = g.to_recursive_ast()
+        self._collect_cache_garbage(self._ast)
+        a = dict()
+        for formula, tree in self._ast.items():
+            a[formula] = tx.sub_values(tree, var_values)
         logger.info('done with substitutions.\n')
         return a
 
@@ -755,9 +779,7 @@ class GRSpec(LTL):
                 # get AST
                 a = self.ast(x)
                 # create AST copy with int and bool vars only
-                g = tx.Tree.from_recursive_ast(a)
-                tx.sub_constants(g, fvars)
-                b = g.to_recursive_ast()
+                b = tx.sub_constants(a, fvars)
                 # formula of int/bool AST
                 f = b.flatten()
                 self._ast[f] = b  # cache
@@ -799,30 +821,39 @@ class GRSpec(LTL):
                 if x in self._ast:
                     logger.debug(str(x) + ' is already in cache')
                     continue
-                logger.debug('parse: ' + str(x))
-                tree = self.parser.parse(x)
-                g = tx.Tree.from_recursive_ast(tree)
-                tx.check_for_undefined_identifiers(g, vardoms)
+                tree = self._unchecked_ast.pop(x, None)
+                if tree is None:
+                    logger.debug('parse: ' + str(x))
+                    tree = self.parser.parse(x)
+                tx.check_for_undefined_identifiers(tree, vardoms)
                 self._ast[x] = tree
         # rm cached ASTs that correspond to deleted clauses
-        self._collect_cache_garbage(self._ast)
+        n = sum(len(getattr(self, p)) for p in self._parts)
+        if len(self._ast) > 4 * n:
+            self._collect_cache_garbage(self._ast)
         logger.info('done parsing ASTs.\n')
 
     def _collect_cache_garbage(self, cache):
+        """Remove entries of clauses that were deleted.
+
+        Each clause has at most two entries, itself and
+        its int/bool-only form (in C{_bool_int}).
+        So when called only after C{cache} has doubled
+        relative to those, at least half of the cache is removed,
+        and the cost per removed entry is constant.
+        """
         logger.info('collecting garbage from GRSpec cache...')
-        # rm cached ASTs that correspond to deleted clauses
-        s = set(cache)
+        clauses = set()
         for p in self._parts:
-            # emptied earlier ?
-            if not s:
-                break
-            w = getattr(self, p)
-            # exclude given formulas
-            s.difference_update(w)
-            # exclude int/bool-only forms of formulas
-            s.difference_update({self._bool_int.get(x) for x in w})
+            clauses.update(getattr(self, p))
+        # exclude given formulas, and their int/bool-only forms
+        keep = set(clauses)
+        keep.update(self._bool_int.get(x) for x in clauses)
+        s = [x for x in cache if x not in keep]
         for x in s:
             cache.pop(x)
+        for x in [x for x in self._bool_int if x not in clauses]:
+            self._bool_int.pop(x)
         logger.info('cleaned ' + str(len(s)) + ' cached elements.\n')
 
 
@@ -840,8 +871,7 @@ def replace_dependent_vars(spec, bool2form):
             logger.debug(str(boolvar) + ' is indeed Boolean')
         else:
             logger.debug('spec does not contain var: ' + str(boolvar))
-        tree = parser.parse(formula)
-        bool2subtree[boolvar] = tx.Tree.from_recursive_ast(tree)
+        bool2subtree[boolvar] = parser.parse(formula)
     for s in {'env_init', 'env_safety', 'env_prog',
               'sys_init', 'sys_safety', 'sys_prog'}:
         part = getattr(spec, s)
@@ -849,9 +879,7 @@ def replace_dependent_vars(spec, bool2form):
         for clause in part:
             logger.debug('replacing in clause:\n\t' + clause)
             tree = spec.ast(clause)
-            g = tx.Tree.from_recursive_ast(tree)
-            tx.sub_bool_with_subtree(g, bool2subtree)
-            f = g.to_recursive_ast().flatten()
+            f = tx.sub_bool_with_subtree(tree, bool2subtree).flatten()
             new.append(f)
             logger.debug('caluse tree after replacement:\n\t' + f)
         setattr(spec, s, new)
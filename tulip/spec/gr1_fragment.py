@@ -50,117 +50,74 @@ from __future__ import print_function
 import logging
 logger = logging.getLogger(__name__)
 
-import networkx as nx
-from tulip import transys as trs
-from tulip.spec import lexyacc, GRSpec
+from tulip.spec import GRSpec
 from tulip.spec import transformation as tx
 from tulip.spec import parser
-from tulip.spec import ast as sast
 
 
-def check(formula):
-    """Parse formula string and create abstract syntax tree (AST).
-    """
-    ast = lexyacc.parse(formula)
-
-    dfa = trs.automata.FiniteWordAutomaton(atomic_proposition_based=False,
-                                           deterministic=True)
-
-    dfa.alphabet |= {'!', 'W', 'U', 'G', 'F',
-                     'U_left', 'U_right',
-                     'W_left', 'W_right'}
-
-    dfa.states.add_from({'gf', 'fg', 'g', 'f'})
-    dfa.states.initial.add('gf')
-
-    dfa.transitions.add('gf', 'fg', letter='!')
-    dfa.transitions.add('fg', 'gf', letter='!')
-    dfa.transitions.add('g', 'f', letter='!')
-    dfa.transitions.add('f', 'g', letter='!')
-
-    dfa.transitions.add('gf', 'gf', letter='W')
-    dfa.transitions.add('gf', 'gf', letter='U_left')
-    dfa.transitions.add('gf', 'gf', letter='G')
-
-    dfa.transitions.add('fg', 'fg', letter='U')
-    dfa.transitions.add('fg', 'fg', letter='F')
-    dfa.transitions.add('fg', 'fg', letter='W_right')
-
-    dfa.transitions.add('gf', 'f', letter='U_right')
-    dfa.transitions.add('gf', 'f', letter='F')
-
-    dfa.transitions.add('fg', 'g', letter='W_left')
-    dfa.transitions.add('fg', 'g', letter='G')
+# temporal classes of subformulas, ordered
+STATE = 0  # no temporal operators
+NEXT = 1  # "next" only
+TEMPORAL = 2  # other temporal operators, except "next"
+_TEMPORAL_OPERATORS = {'G', 'F', 'U', 'V', 'R'}
+# deterministic automaton that accepts the paths of operators
+# in the parse tree of formulas in the fragment (reference 1)
+_FRAGMENT = {
+    ('gf', '!'): 'fg', ('gf', 'W'): 'gf', ('gf', 'U_left'): 'gf',
+    ('gf', 'G'): 'gf', ('gf', 'U_right'): 'f', ('gf', 'F'): 'f',
+    ('fg', '!'): 'gf', ('fg', 'U'): 'fg', ('fg', 'F'): 'fg',
+    ('fg', 'W_right'): 'fg', ('fg', 'W_left'): 'g', ('fg', 'G'): 'g',
+    ('g', '!'): 'f', ('g', 'W'): 'g', ('g', 'G'): 'g',
+    ('f', '!'): 'g', ('f', 'U'): 'f', ('f', 'F'): 'f'}
 
-    dfa.transitions.add('g', 'g', letter='W')
-    dfa.transitions.add('g', 'g', letter='G')
 
-    dfa.transitions.add('f', 'f', letter='U')
-    dfa.transitions.add('f', 'f', letter='F')
-
-    # plot tree automaton
-    # dfa.save('dfa.pdf')
+def check(formula):
+    """Parse formula string and check that it is in the fragment.
 
-    # plot parse tree
-    sast.dump_dot(ast, 'ast.dot')
+    The parse tree is traversed once, in product with
+    a deterministic automaton over the operators.
 
+    @return: AST of C{formula}
+    @raise Exception: if C{formula} is not in the fragment
+    """
+    ast = parser.parse(formula)
     # sync product of AST with DFA,
     # to check acceptance
     Q = [(ast, 'gf')]
+    visited = set(Q)
+    # rendering each subtree would take quadratic time
+    debug = logger.isEnabledFor(logging.DEBUG)
     while Q:
         s, q = Q.pop()
-        logger.info('visiting: ' + str(s) + ', ' + str(q))
-
-        if isinstance(s, sast.Unary):
-            op = s.operator
-
-            if op in {'!', 'G', 'F'}:
-                t = dfa.transitions.find(q, letter=op)
-
-                if not t:
-                    raise Exception('not in fragment')
-
-                qi, qj, w = t[0]
-
-                Q.append((s.operand, qj))
-            else:
-                # ignore
-                Q.append((s.operand, q))
-        elif isinstance(s, sast.Binary):
-            op = s.operator
-
-            if op in {'W', 'U'}:
-                t = dfa.transitions.find(q, letter=op)
-                if t:
-                    qi, qj, w = t[0]
-                    Q.append((s.op_l, qj))
-                    Q.append((s.op_r, qj))
-                else:
-                    t = dfa.transitions.find(q, letter=op + '_left')
-
-                    if not t:
-                        raise Exception('not in fragment')
-
-                    qi, qj, w = t[0]
-
-                    Q.append((s.op_l, qj))
-
-                    t = dfa.transitions.find(q, letter=op + '_right')
-
-                    if not t:
-                        raise Exception('not in fragment')
+        if debug:
+            logger.debug('visiting: %s, %s', type(s).__name__, q)
+        if not hasattr(s, 'operands'):
+            continue
+        op = s.operator
+        if op in {'!', 'G', 'F'}:
+            succ = [(v, _fragment_step(q, op)) for v in s.operands]
+        elif op in {'W', 'U'} and (q, op) in _FRAGMENT:
+            qj = _FRAGMENT[(q, op)]
+            succ = [(v, qj) for v in s.operands]
+        elif op in {'W', 'U'}:
+            left, right = s.operands
+            succ = [(left, _fragment_step(q, op + '_left')),
+                    (right, _fragment_step(q, op + '_right'))]
+        else:
+            # ignore
+            succ = [(v, q) for v in s.operands]
+        for x in succ:
+            if x not in visited:
+                visited.add(x)
+                Q.append(x)
+    return ast
 
-                    qi, qj, w = t[0]
 
-                    Q.append((s.op_r, qj))
-            else:
-                # ignore
-                Q.append((s.op_l, q))
-                Q.append((s.op_r, q))
-        elif isinstance(s, sast.Var):
-            print('reached var')
-
-    return ast
+def _fragment_step(q, letter):
+    try:
+        return _FRAGMENT[(q, letter)]
+    except KeyError:
+        raise Exception('not in fragment')
 
 
 def str_to_grspec(f):
@@ -173,20 +130,34 @@ def str_to_grspec(f):
     where each of A, G is a conjunction of terms: `B`, `[]C`, `[]<>B`.
     For more details on `B, C`, see [split_gr1].
 
+    Each term becomes a clause of the `GRSpec`,
+    and the AST of each clause is passed to the `GRSpec`,
+    so the clauses are not parsed again.
+    Undefined identifiers are still detected,
+    after the variables are declared, by `GRSpec.parse`.
+
     @type f: `str`
     @rtype: [GRSpec]
     """
     t = parser.parse(f)
     assert t.operator == '->'
     env, sys = t.operands
-    d = {'assume': split_gr1(env),
-         'assert': split_gr1(sys)}
-    return GRSpec(env_init=d['assume']['init'],
-                  env_safety=d['assume']['G'],
-                  env_prog=d['assume']['GF'],
-                  sys_init=d['assert']['init'],
-                  sys_safety=d['assert']['G'],
-                  sys_prog=d['assert']['GF'])
+    d = {'env': split_gr1_ast(env),
+         'sys': split_gr1_ast(sys)}
+    parts = {'init': 'init', 'G': 'safety', 'GF': 'prog'}
+    kw = dict()
+    asts = dict()
+    for player, split in d.items():
+        for part, trees in split.items():
+            clauses = list()
+            for u in trees:
+                x = _flatten(u)
+                clauses.append(x)
+                asts[x] = u
+            kw[player + '_' + parts[part]] = clauses
+    spec = GRSpec(**kw)
+    spec._unchecked_ast.update(asts)
+    return spec
 
 
 def split_gr1(f):
@@ -206,87 +177,115 @@ def split_gr1(f):
         `'init', 'G', 'GF'`
     @rtype: `dict` of `str`: `list` of `str`
     """
+    d = split_gr1_ast(f)
+    # conjoin (except for progress)
+    init = ' & '.join(_flatten(u) for u in d['init'])
+    safe = ' & '.join(_flatten(u) for u in d['G'])
+    # flatten individual progress formulae
+    prog = [_flatten(u) for u in d['GF']]
+    return {'init': [init], 'G': [safe], 'GF': prog}
+
+
+def split_gr1_ast(f):
+    """Return `dict` of GR(1) subformulae, as ASTs.
+
+    Same as `split_gr1`, but the terms are not conjoined.
+    Each value is a `list` of ASTs, in the syntactic order
+    of the terms in `f`, and each AST is a subtree of `f`.
+    The temporal class of each node is computed once,
+    so the time is linear in the size of `f`.
+
+    @param f: temporal logic formula
+    @type f: `str` or AST
+    @rtype: `dict` of `str`: `list` of AST
+    """
     # TODO: preprocess by applying syntactic identities: [][] = [] etc
     try:
         f + 's'
         t = parser.parse(f)
     except TypeError:
         t = f
-    g = tx.Tree.from_recursive_ast(t)
+    classes = temporal_classes(t)
+    d = {'init': list(), 'G': list(), 'GF': list()}
     # collect boundary of conjunction operators
-    Q = [g.root]
-    b = list()  # use lists to preserve as much given syntactic order
+    Q = [t]
     while Q:
         u = Q.pop()
-        # terminal ?
-        if not g.succ.get(u):
-            b.append(u)
-            continue
-        # operator
-        if u.operator == '&':
-            # use `u.operands` instead of `g.successors`
-            # to preserve original order
-            Q.extend(u.operands)
-        else:
-            b.append(u)
-    d = {'init': list(), 'G': list(), 'GF': list()}
-    for u in b:
-        # terminal ?
-        if not g.succ.get(u):
+        op = getattr(u, 'operator', None)
+        if op == '&':
+            Q.extend(reversed(u.operands))
+        elif op != 'G':
             d['init'].append(u)
-            continue
-        # some operator
-        if u.operator != 'G':
-            d['init'].append(u)
-            continue
-        # G
-        (v,) = u.operands
-        # terminal in G ?
-        if not g.succ.get(v):
-            d['G'].append(v)
-            continue
-        # some operator in G
-        if v.operator == 'F':
-            (w,) = v.operands
-            d['GF'].append(w)
         else:
-            # not a GF
-            d['G'].append(v)
+            (v,) = u.operands
+            if getattr(v, 'operator', None) == 'F':
+                (w,) = v.operands
+                d['GF'].append(w)
+            else:
+                d['G'].append(v)
     # assert only admissible temporal operators
-    ops = {'G', 'F', 'U', 'V', 'R'}
-    operators = {'G': ops}
-    ops = set(ops)
-    ops.add('X')
-    operators.update(init=ops, GF=ops)
+    bound = {'init': STATE, 'G': NEXT, 'GF': STATE}
     for part, f in d.items():
-        ops = operators[part]
         for u in f:
-            op = has_operator(u, g, ops)
-            if op is None:
+            if classes[u] <= bound[part]:
                 continue
+            ops = set(_TEMPORAL_OPERATORS)
+            if bound[part] == STATE:
+                ops.add('X')
+            op = has_operator(u, None, ops)
             raise AssertionError((
                 'found inadmissible operator "{op}" '
                 'in "{f}" formula').format(
                     op=op, f=u))
-    # conjoin (except for progress)
-    init = ' & '.join(u.flatten() for u in reversed(d['init']))
-    d['init'] = [init]
-    safe = ' & '.join(u.flatten() for u in reversed(d['G']))
-    d['G'] = [safe]
-    # flatten individual progress formulae
-    d['GF'] = [u.flatten() for u in d['GF']]
     return d
 
 
+def temporal_classes(t):
+    """Return temporal class of each node in AST `t`.
+
+    The class of a node is `STATE` if its subtree contains
+    no temporal operators, `NEXT` if it contains only "next",
+    and `TEMPORAL` otherwise.
+    Each node is visited once, without recursion,
+    and shared subtrees once in total.
+
+    @type t: recursive AST
+    @rtype: `dict` that maps nodes to classes
+    """
+    classes = dict()
+    Q = [t]
+    while Q:
+        u = Q[-1]
+        if u in classes:
+            Q.pop()
+            continue
+        operands = getattr(u, 'operands', ())
+        pending = [v for v in operands if v not in classes]
+        if pending:
+            Q.extend(pending)
+            continue
+        Q.pop()
+        if not operands:
+            c = STATE
+        elif u.operator in _TEMPORAL_OPERATORS:
+            c = TEMPORAL
+        elif u.operator == 'X':
+            c = NEXT
+        else:
+            c = STATE
+        classes[u] = max([c] + [classes[v] for v in operands])
+    return classes
+
+
 def has_operator(u, g, operators):
-    try:
-        if u.operator in operators:
-            return u.operator
-    except AttributeError:
-        pass
-    for v in nx.descendants(g, u):
+    """Return an operator in `operators` found in the AST `u`.
+
+    Return `None` if there is none.
+    The argument `g` is unused.
+    """
+    for v in tx.iter_nodes(u):
         # terminal
-        if not g.succ.get(v):
+        if not hasattr(v, 'operands'):
             continue
         # operator
         # is it temporal except for 'X' ?
@@ -295,6 +294,38 @@ def has_operator(u, g, operators):
     return None
 
 
+def _flatten(t):
+    """Return `t.flatten()`, computed without recursion.
+
+    Building the string bottom-up takes time quadratic in
+    the depth of `t`, so pieces are collected and joined once.
+    """
+    pieces = list()
+    Q = [t]
+    while Q:
+        u = Q.pop()
+        if isinstance(u, str):
+            pieces.append(u)
+            continue
+        if not hasattr(u, 'operands'):
+            pieces.append(u.flatten())
+            continue
+        op = u.opmap[u.operator]
+        if len(u.operands) == 2:
+            # infix, as `Binary.flatten`
+            left, right = u.operands
+            items = ['( ', left, ' ' + op + ' ', right, ' )']
+        else:
+            items = ['( ' + op + ' ']
+            for i, v in enumerate(u.operands):
+                if i:
+                    items.append(', ')
+                items.append(v)
+            items.append(' )')
+        Q.extend(reversed(items))
+    return ''.join(pieces)
+
+
 def stability_to_gr1(p, aux='aux'):
     """Convert C{<>[] p} to GR(1).
 
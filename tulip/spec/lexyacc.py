@@ -36,8 +36,12 @@ using AST classes from spec.ast
 from __future__ import absolute_import
 from __future__ import print_function
 
+import importlib
 import logging
 logger = logging.getLogger(__name__)
+import os
+import re
+import sys
 import warnings
 import ply.lex
 import ply.yacc
@@ -45,6 +49,7 @@ import tulip.spec.ast
 
 
 TABMODULE = 'tulip.spec.ltl_parsetab'
+LEXTAB = 'tulip.spec.ltl_lextab'
 LEX_LOGGER = 'tulip.ltl_lex_log'
 YACC_LOGGER = 'tulip.ltl_yacc_log'
 PARSER_LOGGER = 'tulip.ltl_parser_log'
@@ -54,6 +59,7 @@ PARSER_LOGGER = 'tulip.ltl_parser_log'
 class Lexer(object):
     """Token rules to build LTL lexer."""
 
+    lextab = LEXTAB
     reserved = {
         'ite': 'ITE',
         'next': 'NEXT',
@@ -75,9 +81,11 @@ class Lexer(object):
 
     def __init__(self, debug=False):
         # for setting the logger, call build explicitly
+        # sorted, because the parser table signature
+        # depends on the order of tokens
         self.tokens = (
             self.delimiters + self.operators +
-            self.misc + list(set(self.reserved.values())))
+            self.misc + sorted(set(self.reserved.values())))
         self.build(debug=debug)
 
     def t_NAME(self, t):
@@ -157,6 +165,9 @@ class Lexer(object):
     def build(self, debug=False, debuglog=None, **kwargs):
         """Create a lexer.
 
+        Unless C{debug} or C{kwargs} are given, load the table
+        module C{self.lextab}, if it matches the token rules.
+
         @param kwargs: Same arguments as C{ply.lex.lex}:
 
           - except for C{module} (fixed to C{self})
@@ -164,6 +175,8 @@ class Lexer(object):
         """
         if debug and debuglog is None:
             debuglog = logging.getLogger(LEX_LOGGER)
+        if not debug and not kwargs and _lextab_is_fresh(self):
+            kwargs = dict(optimize=True, lextab=self.lextab)
         self.lexer = ply.lex.lex(
             module=self,
             debug=debug,
@@ -211,11 +224,19 @@ class Parser(object):
 
         Default table module is `self.tabmodule`.
         Default logger is `YACC_LOGGER`
+
+        If the table module matches the grammar, then it is loaded.
+        Otherwise, the tables are generated, which takes longer.
         """
         if tabmodule is None:
             tabmodule = self.tabmodule
         if debug and debuglog is None:
             debuglog = logging.getLogger(YACC_LOGGER)
+        if not write_tables and not _parsetab_is_fresh(self, tabmodule):
+            logger.debug((
+                'table module "{t}" is missing or stale, '
+                'generating parser tables. To update it, run: '
+                'python -m tulip.spec.lexyacc').format(t=tabmodule))
         self.parser = ply.yacc.yacc(
             method='LALR',
             module=self,
@@ -342,25 +363,101 @@ def parse(formula):
     return parser.parse(formula)
 
 
+def generate_tables(outputdir=None, debuglog=None):
+    """Write lexer and parser table modules.
+
+    The modules are generated by C{setup.py} when installing,
+    with the installed PLY, so that parsers are created
+    without generating tables. They are not under version control,
+    because the table format depends on the PLY version.
+    L{Lexer.build} and L{Parser.build} check whether
+    the table modules match the token rules and grammar.
+
+    @param outputdir: default is the directory of this module
+    @param debuglog: logger for the parser generator,
+        default is the logger C{"ltl_yacc_log"}
+    """
+    if outputdir is None:
+        outputdir = os.path.dirname(os.path.abspath(__file__))
+    if debuglog is None:
+        debuglog = logging.getLogger(YACC_LOGGER)
+    lextab = LEXTAB.split('.')[-1]
+    tabmodule = TABMODULE.split('.')[-1]
+    for name in (lextab, tabmodule):
+        for ext in ('.py', '.pyc'):
+            fname = os.path.join(outputdir, name + ext)
+            if os.path.isfile(fname):
+                os.remove(fname)
+    for name in (LEXTAB, TABMODULE):
+        sys.modules.pop(name, None)
+    lexer = Lexer()
+    lexer.build(optimize=True, lextab=lextab, outputdir=outputdir)
+    parser = Parser(lexer=lexer)
+    parser.build(tabmodule, outputdir=outputdir,
+                 write_tables=True, debug=True, debuglog=debuglog)
+
+
+def _lextab_is_fresh(lexer):
+    """Return `True` if table module matches token rules of `lexer`.
+
+    @type lexer: L{Lexer}
+    """
+    tab = _import_table(lexer.lextab)
+    if tab is None:
+        return False
+    if tab._tabversion != ply.lex.__tabversion__:
+        return False
+    if tab._lextokens != set(lexer.tokens):
+        return False
+    if tab._lexstateignore.get('INITIAL') != lexer.t_ignore:
+        return False
+    regex = ''.join(r for r, _ in tab._lexstatere['INITIAL'])
+    rules = [
+        (name, getattr(lexer, name)) for name in dir(lexer)
+        if name.startswith('t_') and
+        name not in ('t_ignore', 't_error')]
+    if len(re.findall(r'\(\?P<t_', regex)) != len(rules):
+        return False
+    for name, rule in rules:
+        if callable(rule):
+            rule = rule.__doc__
+        group = '(?P<{name}>{rule})'.format(name=name, rule=rule)
+        if group not in regex:
+            return False
+    return True
+
+
+def _parsetab_is_fresh(parser, tabmodule):
+    """Return `True` if table module matches grammar of `parser`.
+
+    @type parser: L{Parser}
+    @param tabmodule: name of table module
+    """
+    tab = _import_table(tabmodule)
+    if tab is None:
+        return False
+    if tab._tabversion != ply.yacc.__tabversion__:
+        return False
+    pdict = {k: getattr(parser, k) for k in dir(parser)}
+    pinfo = ply.yacc.ParserReflect(pdict)
+    pinfo.get_all()
+    return tab._lr_signature == pinfo.signature()
+
+
+def _import_table(name):
+    """Return table module, or `None` if it cannot be imported."""
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
 if __name__ == '__main__':
     h = logging.FileHandler('log.txt', mode='w')
     h.setLevel(logging.DEBUG)
     log = logging.getLogger(YACC_LOGGER)
     log.setLevel(logging.DEBUG)
     log.addHandler(h)
-    import os
-    tabmodule = TABMODULE.split('.')[-1]
-    outputdir = './'
-    tablepy = tabmodule + '.py'
-    tablepyc = tabmodule + '.pyc'
-    try:
-        os.remove(tablepy)
-    except:
-        print('no "{t}" found'.format(t=tablepy))
-    try:
-        os.remove(tablepyc)
-    except:
-        print('no "{t}" found'.format(t=tablepyc))
-    parser = Parser()
-    parser.build(tabmodule, outputdir=outputdir,
-                 write_tables=True, debug=True)
+    generate_tables()
@@ -0,0 +1,233 @@
+# Copyright by California Institute of Technology
+# All rights reserved. See LICENSE file at:
+# https://github.com/tulip-control/tulip-control
+"""Runtime monitor for GR(1) specifications.
+
+A L{Monitor} consumes a sequence of states,
+for example the valuations of inputs and outputs
+produced by a L{MealyMachine} reacting to its environment,
+and reports the clauses of a L{GRSpec} that each step violates.
+"""
+from __future__ import absolute_import
+import logging
+
+from tulip.spec import evaluation
+
+
+logger = logging.getLogger(__name__)
+INIT = ('env_init', 'sys_init')
+SAFETY = ('env_safety', 'sys_safety')
+PROGRESS = ('env_prog', 'sys_prog')
+
+
+class Monitor(object):
+    """Check a sequence of states against a L{GRSpec}.
+
+    Call L{init} with the first state, and L{step} with each
+    following state. A state is a C{dict} from variable names
+    to values. L{step} accepts only the variables that changed,
+    and the values of the rest are carried over.
+
+    Each clause is compiled once, with L{evaluation}. Initial
+    conditions are evaluated only by L{init}. Safety and progress
+    clauses are indexed by the variables they read, primed and
+    unprimed. A step evaluates
+    only the clauses that read changed variables, so its cost is
+    proportional to the changes and the clauses they touch,
+    not the size of the specification.
+
+    Attributes:
+
+      - C{violations}: C{list} of C{(step, part, clause)}, for each
+        clause that was false, where C{step} is 0 for initial
+        conditions, and C{n} for the transition into state C{n}.
+
+      - C{counts}: C{dict} that maps C{'env_prog'} and C{'sys_prog'}
+        to a C{list} with the number of states where each goal held.
+
+      - C{last}: same as C{counts}, but with the last step where each
+        goal held, or C{None}.
+
+    Goals are evaluated only when their variables change,
+    so C{counts} and C{last} are computed when read.
+
+    @type spec: L{GRSpec}
+    @param no_str: if C{True}, then states give integers for string
+        variables, as in strategies (see L{evaluation.compile_part}).
+    """
+
+    def __init__(self, spec, no_str=False):
+        self.spec = spec
+        # clauses, each: (part, formula, function)
+        self._clauses = list()
+        # maps variable to indices of clauses that read it
+        self._index = dict()
+        self._primed_index = dict()
+        self._parts = {p: list() for p in INIT + SAFETY + PROGRESS}
+        for part in self._parts:
+            formulas = getattr(spec, part)
+            trees = evaluation.part_asts(spec, part, no_str)
+            for formula, tree in zip(formulas, trees):
+                i = len(self._clauses)
+                f = evaluation.compile_formula(tree)
+                self._clauses.append((part, formula, f))
+                self._parts[part].append(i)
+                # initial conditions are evaluated only by `init`
+                if part in INIT:
+                    continue
+                unprimed, primed = _read_vars(tree)
+                for var in unprimed:
+                    self._index.setdefault(var, list()).append(i)
+                for var in primed:
+                    self._primed_index.setdefault(var, list()).append(i)
+        self.state = None
+
+    def init(self, state):
+        """Start monitoring at C{state}.
+
+        @type state: C{dict}
+        @return: C{(part, clause)} of each initial
+            condition that C{state} violates
+        @rtype: C{list}
+        """
+        self._s = dict(state)
+        self._t = dict(state)
+        self.state = self._t
+        self.n = 0
+        self.violations = list()
+        # for each goal: step since it holds (or `None`),
+        # and count and last step of earlier intervals
+        self._since = dict()
+        self._count = dict()
+        self._last = dict()
+        # safety clauses read two states, so are evaluated at the first step
+        self._dirty = set()
+        for part in SAFETY:
+            self._dirty.update(self._parts[part])
+        self._false = set()
+        violated = list()
+        for part in INIT:
+            for i in self._parts[part]:
+                _, formula, f = self._clauses[i]
+                if not f(self._s):
+                    violated.append((part, formula))
+        for part in PROGRESS:
+            for i in self._parts[part]:
+                self._since[i] = None
+                self._count[i] = 0
+                self._last[i] = None
+                self._evaluate(i)
+        self._record(violated)
+        return violated
+
+    def step(self, changes):
+        """Move to the next state, and check the transition.
+
+        @param changes: values of the variables that changed,
+            or of all variables
+        @type changes: C{dict}
+        @return: C{(part, clause)} of each safety clause
+            that the transition violates
+        @rtype: C{list}
+        """
+        if self.state is None:
+            raise ValueError('call `init` before `step`')
+        s, t = self._s, self._t
+        changed = [v for v, x in changes.items()
+                   if v not in t or t[v] != x]
+        t.update(changes)
+        self.n += 1
+        # unprimed reads changed in the previous step
+        touched = self._dirty
+        for var in changed:
+            touched.update(self._primed_index.get(var, ()))
+        for i in touched:
+            self._evaluate(i)
+        # now `s` becomes `t`, so clauses with unprimed
+        # reads of changed variables need evaluation next time
+        # (progress clauses are evaluated on `t` now)
+        s.update(changes)
+        self._dirty = set()
+        for var in changed:
+            for i in self._index.get(var, ()):
+                if self._clauses[i][0] in PROGRESS:
+                    self._evaluate(i)
+                else:
+                    self._dirty.add(i)
+        violated = [self._clauses[i][:2] for i in self._false]
+        self._record(violated)
+        return violated
+
+    @property
+    def counts(self):
+        """Return number of states where each goal held."""
+        return {part: [self._count[i] + self._open(i)
+                       for i in self._parts[part]]
+                for part in PROGRESS}
+
+    @property
+    def last(self):
+        """Return last step where each goal held, or C{None}."""
+        return {part: [self.n if self._since[i] is not None
+                       else self._last[i]
+                       for i in self._parts[part]]
+                for part in PROGRESS}
+
+    def _open(self, i):
+        """Return number of states in current interval of goal C{i}."""
+        since = self._since[i]
+        if since is None:
+            return 0
+        return self.n - since + 1
+
+    @property
+    def env_violated(self):
+        """Return C{True} if an assumption has been violated."""
+        return any(p.startswith('env_') for _, p, _ in self.violations)
+
+    @property
+    def sys_violated(self):
+        """Return C{True} if a guarantee has been violated."""
+        return any(p.startswith('sys_') for _, p, _ in self.violations)
+
+    def _evaluate(self, i):
+        part, _, f = self._clauses[i]
+        if part not in PROGRESS:
+            if f(self._s, self._t):
+                self._false.discard(i)
+            else:
+                self._false.add(i)
+            return
+        since = self._since[i]
+        if f(self._t):
+            if since is None:
+                self._since[i] = self.n
+        elif since is not None:
+            # the goal held until the previous state
+            self._count[i] += self.n - since
+            self._last[i] = self.n - 1
+            self._since[i] = None
+
+    def _record(self, violated):
+        for part, formula in violated:
+            logger.info('step {n}: violated {p}: {f}'.format(
+                n=self.n, p=part, f=formula))
+            self.violations.append((self.n, part, formula))
+
+
+def _read_vars(tree):
+    """Return unprimed and primed variables in C{tree}.
+
+    @rtype: C{(set, set)}
+    """
+    unprimed = set()
+    primed = set()
+    stack = [(tree, False)]
+    while stack:
+        u, prime = stack.pop()
+        if u.type == 'var':
+            (primed if prime else unprimed).add(u.value)
+        elif hasattr(u, 'operands'):
+            prime = prime or u.operator == 'X'
+            stack.extend((v, prime) for v in u.operands)
+    return unprimed, primed
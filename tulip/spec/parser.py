@@ -34,26 +34,38 @@
 from __future__ import absolute_import
 from __future__ import print_function
 import re
-from tulip.spec import ast, lexyacc
+from tulip.spec import ast, lexyacc, pratt
 
 
 # cache
 parsers = dict()
+PARSERS = {
+    'ply': lexyacc.Parser,
+    'pratt': pratt.Parser}
 
 
-def parse(formula, full_operators=False):
+def parse(formula, full_operators=False, parser='ply'):
     """Parse formula string and create abstract syntax tree (AST).
 
     @param full_operators: replace full names of operators
         with their symbols (case insensitive,
         each operator must be a separate word).
     @type full_operators: C{bool}
+
+    @param parser: which parser to use. Both return the same AST.
+        - C{'ply'}: L{lexyacc.Parser}
+        - C{'pratt'}: L{pratt.Parser}, faster
+    @type parser: C{str}
     """
     if full_operators:
         formula = _replace_full_name_operators(formula)
-    if parsers.get('ply') is None:
-        parsers['ply'] = lexyacc.Parser()
-    spec = parsers['ply'].parse(formula)
+    if parser not in PARSERS:
+        raise ValueError(
+            'unknown parser "{p}", available: {a}'.format(
+                p=parser, a=sorted(PARSERS)))
+    if parsers.get(parser) is None:
+        parsers[parser] = PARSERS[parser]()
+    spec = parsers[parser].parse(formula)
     # did ply fail merely printing warnings ?
     if spec is None:
         raise Exception('Parsing formula:\n{f}\nfailed'.format(f=formula))
@@ -0,0 +1,221 @@
+# Copyright by California Institute of Technology
+# All rights reserved. See LICENSE file at:
+# https://github.com/tulip-control/tulip-control
+"""Hand-written parser for TuLiP LTL syntax,
+using AST classes from spec.ast
+
+Parses the same language as L{lexyacc.Parser}, to the same
+abstract syntax trees, by precedence climbing (Pratt parsing),
+without the overhead of a table-driven parser.
+Select it with C{spec.parser.parse(formula, parser='pratt')}.
+"""
+from __future__ import absolute_import
+import logging
+import re
+import warnings
+
+import tulip.spec.ast
+from tulip.spec.lexyacc import Lexer
+
+
+logger = logging.getLogger(__name__)
+
+
+def _token_rules(lexer):
+    """Return `list` of `(type, regex)` from the rules of `lexer`.
+
+    In the order that `ply.lex` tries the rules:
+    skipped characters, then functions as defined,
+    then strings by decreasing length, then the error rule.
+    """
+    rules = vars(lexer)
+    functions = list()
+    strings = list()
+    for k in sorted(rules):
+        if not k.startswith('t_') or k in ('t_ignore', 't_error'):
+            continue
+        rule = rules[k]
+        if callable(rule):
+            functions.append(
+                (rule.__code__.co_firstlineno, k[2:], rule.__doc__))
+        else:
+            strings.append((k[2:], rule))
+    strings.sort(key=lambda x: len(x[1]), reverse=True)
+    ignore = '[{c}]+'.format(c=re.escape(lexer.t_ignore))
+    return (
+        [('ignore', ignore)] +
+        [(name, rule) for _, name, rule in sorted(functions)] +
+        strings + [('error', '.')])
+
+
+TOKENS = _token_rules(Lexer)
+_regex = re.compile('|'.join(
+    '(?P<{name}>{rule})'.format(name=name, rule=rule)
+    for name, rule in TOKENS))
+# matched, but not tokens
+_SKIP = {'ignore', 'newline', 'comment'}
+# values of tokens that `lexyacc.Lexer` rewrites
+_VALUES = dict(ALWAYS='G', EVENTUALLY='F', AND='&', OR='|')
+# Binding power, lowest to highest, as `lexyacc.Parser.precedence`.
+# The rule for `TRUNCATE` has no precedence in `lexyacc.Parser`,
+# so it is reduced before any other operator.
+TRUNCATE = 1
+BIMP = 2
+IMP = 3
+XOR = 4
+OR = 5
+AND = 6
+ALWAYS = 7
+UNTIL = 8
+EQUALS = 9
+LT = 10
+PLUS = 11
+TIMES = 12
+NOT = 13
+NEXT = 14
+PRIME = 15
+PREFIX = dict(
+    NOT=NOT, ALWAYS=ALWAYS, EVENTUALLY=ALWAYS, NEXT=NEXT)
+# infix and postfix operators: binding power, and AST class name
+INFIX = dict(
+    BIMP=(BIMP, 'Binary'),
+    IMP=(IMP, 'Binary'),
+    XOR=(XOR, 'Binary'),
+    OR=(OR, 'Binary'),
+    AND=(AND, 'Binary'),
+    UNTIL=(UNTIL, 'Binary'),
+    WEAK_UNTIL=(UNTIL, 'Binary'),
+    RELEASE=(UNTIL, 'Binary'),
+    EQUALS=(EQUALS, 'Comparator'),
+    NEQUALS=(EQUALS, 'Comparator'),
+    LT=(LT, 'Comparator'),
+    LE=(LT, 'Comparator'),
+    GT=(LT, 'Comparator'),
+    GE=(LT, 'Comparator'),
+    PLUS=(PLUS, 'Arithmetic'),
+    MINUS=(PLUS, 'Arithmetic'),
+    TIMES=(TIMES, 'Arithmetic'),
+    DIV=(TIMES, 'Arithmetic'),
+    TRUNCATE=(TRUNCATE, None),
+    PRIME=(PRIME, None))
+_END = (None, None)
+
+
+def tokenize(formula):
+    """Return `list` of `(type, value)` tokens in `formula`.
+
+    Token types and values are those of L{lexyacc.Lexer}.
+    """
+    reserved = Lexer.reserved
+    values = Lexer.values
+    tokens = list()
+    for m in _regex.finditer(formula):
+        typ = m.lastgroup
+        value = m.group()
+        if typ == 'NAME':
+            value = values.get(value, value)
+            typ = reserved.get(value, 'NAME')
+            lower = value.lower()
+            if lower == 'false' or lower == 'true':
+                typ = reserved[lower]
+        elif typ in _SKIP:
+            continue
+        elif typ == 'error':
+            warnings.warn('Illegal character "{t}"'.format(t=value))
+            continue
+        else:
+            value = _VALUES.get(typ, value)
+        tokens.append((typ, value))
+    return tokens
+
+
+class Parser(object):
+    """Precedence-climbing parser for TuLiP LTL syntax."""
+
+    def __init__(self, ast=None):
+        if ast is None:
+            ast = tulip.spec.ast.nodes
+        self.ast = ast
+        self._infix = {
+            k: (level, getattr(ast, cls) if cls else None)
+            for k, (level, cls) in INFIX.items()}
+
+    def parse(self, formula):
+        """Parse formula string and create abstract syntax tree (AST)."""
+        self._tokens = tokenize(formula)
+        self._tokens.append(_END)
+        self._pos = 0
+        root = self._expr(0)
+        typ, value = self._tokens[self._pos]
+        if typ is not None:
+            self._error(value)
+        return root
+
+    def _expr(self, level):
+        """Return AST of the longest expression that binds
+        tighter than `level`, starting at the current token."""
+        ast = self.ast
+        tokens = self._tokens
+        typ, value = tokens[self._pos]
+        self._pos += 1
+        if typ == 'NAME':
+            left = ast.Var(value)
+        elif typ == 'NUMBER':
+            left = ast.Num(value)
+        elif typ in PREFIX:
+            left = ast.Unary(value, self._expr(PREFIX[typ]))
+        elif typ == 'LPAREN':
+            if tokens[self._pos][0] == 'ITE':
+                op = tokens[self._pos][1]
+                self._pos += 1
+                x = self._expr(0)
+                self._expect('COMMA')
+                y = self._expr(0)
+                self._expect('COMMA')
+                z = self._expr(0)
+                left = ast.Operator(op, x, y, z)
+            else:
+                left = self._expr(0)
+            self._expect('RPAREN')
+        elif typ == 'TRUE' or typ == 'FALSE':
+            left = ast.Bool(value)
+        elif typ == 'MINUS':
+            left = ast.Num('-' + self._expect('NUMBER'))
+        elif typ == 'DQUOTES':
+            left = ast.Str(self._expect('NAME'))
+            self._expect('DQUOTES')
+        else:
+            self._pos -= 1
+            self._error(value)
+        infix = self._infix
+        while True:
+            typ, value = tokens[self._pos]
+            if typ not in infix:
+                return left
+            op_level, cls = infix[typ]
+            if op_level <= level:
+                return left
+            self._pos += 1
+            if typ == 'PRIME':
+                left = ast.Unary('X', left)
+            elif typ == 'TRUNCATE':
+                right = ast.Num(self._expect('NUMBER'))
+                left = ast.Arithmetic(value, left, right)
+            else:
+                left = cls(value, left, self._expr(op_level))
+
+    def _expect(self, typ):
+        """Consume token of type `typ`, and return its value."""
+        t, value = self._tokens[self._pos]
+        if t != typ:
+            self._error(value)
+        self._pos += 1
+        return value
+
+    def _error(self, value):
+        if value is None:
+            raise Exception('Syntax error at end of input')
+        s = [v for _, v in self._tokens[self._pos + 1:-1]]
+        raise Exception(
+            'Syntax error at "{p}"\n'.format(p=value) +
+            'remaining input:\n{s}\n'.format(s=' '.join(s)))
@@ -88,6 +88,10 @@ class Tree(nx.MultiDiGraph):
             self.add_node(u)
         elif hasattr(u, 'operator'):
             for i, v in enumerate(u.operands):
+                # hash-consed subformulas can occur more than once,
+                # but each vertex must have a single parent
+                if v in self:
+                    v = copy.copy(v)
                 self.add_edge(u, v, key=i)
                 self._recurse(v)
         else:
@@ -174,16 +178,69 @@ def ast_to_labeled_graph(tree, detailed):
     return g
 
 
+def iter_nodes(t):
+    """Yield the nodes of recursive AST C{t} in preorder.
+
+    The traversal is iterative,
+    so it works for formulas of any depth.
+    """
+    stack = [t]
+    while stack:
+        u = stack.pop()
+        yield u
+        if hasattr(u, 'operands'):
+            stack.extend(reversed(u.operands))
+
+
+def map_terminals(t, f):
+    """Return recursive AST with each terminal C{u} replaced by C{f(u, path)}.
+
+    C{path} is the C{list} of operators from the root to C{u}.
+    Operators with replaced terminals below them are constructed
+    anew, so they are hash-consed, and the rest of C{t} is shared
+    with the result.
+    The traversal is iterative.
+
+    @param t: recursive AST, which remains unchanged
+    @param f: maps a terminal and C{path} to a node,
+        return C{u} to keep it
+    @type f: callable
+    """
+    if not hasattr(t, 'operands'):
+        return f(t, list())
+    path = [t]
+    # new operands of each operator in `path`
+    stack = [list()]
+    while True:
+        u = path[-1]
+        operands = stack[-1]
+        i = len(operands)
+        if i < len(u.operands):
+            v = u.operands[i]
+            if hasattr(v, 'operands'):
+                path.append(v)
+                stack.append(list())
+            else:
+                operands.append(f(v, path))
+            continue
+        path.pop()
+        stack.pop()
+        if any(x is not y for x, y in zip(operands, u.operands)):
+            w = type(u)(u.operator, *operands)
+        else:
+            w = u
+        if not path:
+            return w
+        stack[-1].append(w)
+
+
 def check_for_undefined_identifiers(tree, domains):
     """Check that types in C{tree} are incompatible with C{domains}.
 
-    Raise a C{ValueError} if C{tree} either:
-
-      - contains a variable missing from C{domains}
-      - binary operator between variable and
-        invalid value for that variable.
+    Raise a C{ValueError} if C{tree} contains a variable
+    missing from C{domains}.
 
-    @type tree: L{Tree}
+    @type tree: recursive AST or L{Tree}
 
     @param domains: variable definitions:
 
@@ -192,77 +249,43 @@ def check_for_undefined_identifiers(tree, domains):
         See L{GRSpec} for more details of available domain types.
     @type domains: C{dict}
     """
-    for u in tree:
+    if isinstance(tree, Tree):
+        tree = tree.root
+    for u in iter_nodes(tree):
         if u.type == 'var' and u.value not in domains:
             var = u.value
             raise ValueError(
                 ('Undefined variable "{var}" missing from '
                  'symbol table:\n\t{doms}\n'
                  'in subformula:\n\t{f}').format(
-                     var=var, f=tree.to_recursive_ast(), doms=domains))
-
-        if u.type not in {'str', 'num'}:
-            continue
-
-        # is a Const or Num
-        var, c = pair_node_to_var(tree, u)
-
-        if c.type == 'str':
-            dom = domains[var]
-
-            if not isinstance(dom, list):
-                raise Exception(
-                    ('String constant "{c}" assigned to non-string '
-                     'variable "{var}" with domain:\n\t{dom}').format(
-                         var=var, c=c, dom=dom))
-
-            if c.value not in domains[var.value]:
-                raise ValueError(
-                    ('String constant "{c}" is not in the domain '
-                     'of variable "{var}"').format(var=var, c=c))
-
-        if c.type == 'num':
-            dom = domains[var]
-
-            if not isinstance(dom, tuple):
-                raise Exception(
-                    ('Number: {c}, assigned to non-integer ' + str(c) +
-                     'variable "{var}" with domain:\n\t{dom}').format(
-                         var=var, c=c, dom=dom))
-
-            if not dom[0] <= c.value <= dom[1]:
-                raise Exception(
-                    ('Integer variable "{var}", is assigned the '
-                     'value: {c}, that is out of its domain:'
-                     '{dom[0]} ... {dom[1]}').format(
-                         var=var, c=c, dom=dom))
+                     var=var, f=tree, doms=domains))
 
 
 def sub_values(tree, var_values):
     """Substitute given values for variables.
 
-    @param tree: AST
+    @param tree: AST, which remains unchanged
+        if it is a recursive AST, or is updated if a L{Tree}.
+    @type tree: recursive AST or L{Tree}
 
     @type var_values: C{dict}
 
     @return: AST with L{Var} nodes replaces by
         L{Num}, L{Const}, or L{Bool}
     """
-    old2new = dict()
-    for u in tree.nodes_iter():
+    def f(u, path):
         if u.type != 'var':
-            continue
+            return u
         val = var_values[u.value]
         # instantiate appropriate value type
         if isinstance(val, bool):
-            v = nodes.Bool(val)
+            return nodes.Bool(val)
         elif isinstance(val, int):
-            v = nodes.Num(val)
+            return nodes.Num(val)
         elif isinstance(val, str):
-            v = nodes.Str(val)
-        old2new[u] = v
-    # replace variable by value
-    nx.relabel_nodes(tree, old2new, copy=False)
+            return nodes.Str(val)
+        return u
+    return _map_tree(tree, f)
 
 
 def sub_constants(tree, var_str2int):
@@ -271,42 +294,88 @@ def sub_constants(tree, var_str2int):
     To be used for converting arbitrary finite domains
     to integer domains prior to calling gr1c.
 
+    @param tree: AST, which remains unchanged
+        if it is a recursive AST, or is updated if a L{Tree}.
+    @type tree: recursive AST or L{Tree}
+
     @param const2int: {'varname':['const_val0', ...], ...}
     @type const2int: C{dict} of C{list}
+
+    @return: AST with L{Str} nodes replaced by L{Num}
     """
-    # logger.info('substitute ints for constants in:\n\t' + str(self))
-    old2new = dict()
-    for u in tree.nodes_iter():
+    def f(u, path):
         if u.type != 'str':
-            continue
-        var, op = pair_node_to_var(tree, u)
-        # now: c, is the operator and: v, the variable
+            return u
+        var = _paired_var(u, path)
         str2int = var_str2int[str(var)]
         x = str2int.index(u.value)
-        num = nodes.Num(str(x))
-        # replace Const with Num
-        old2new[u] = num
-    nx.relabel_nodes(tree, old2new, copy=False)
-    # logger.info('result after substitution:\n\t' + str(self) + '\n')
+        return nodes.Num(str(x))
+    return _map_tree(tree, f)
 
 
 def sub_bool_with_subtree(tree, bool2subtree):
     """Replace selected Boolean variables with given AST.
 
-    @type tree: L{LTL_AST}
+    @param tree: AST, which remains unchanged
+        if it is a recursive AST, or is updated if a L{Tree}.
+    @type tree: recursive AST or L{Tree}
 
     @param bool2form: map from each Boolean variable to some
         equivalent formula. A subset of Boolean varibles may be used.
 
         Note that the types of variables in C{tree}
         are defined by C{bool2form}.
-    @type bool2form: C{dict} from C{str} to L{Tree}
+    @type bool2form: C{dict} from C{str} to recursive AST or L{Tree}
+
+    @return: AST with the subtrees in place of variables
     """
-    for u in tree.nodes():
+    bool2subtree = {
+        k: v.root if isinstance(v, Tree) else v
+        for k, v in bool2subtree.items()}
+
+    def f(u, path):
         if u.type == 'var' and u.value in bool2subtree:
-            # tree.write(str(id(tree)) + '_before.png')
-            tree.add_subtree(u, bool2subtree[u.value])
-            # tree.write(str(id(tree)) + '_after.png')
+            return bool2subtree[u.value]
+        return u
+    return _map_tree(tree, f)
+
+
+def _map_tree(tree, f):
+    """Apply L{map_terminals} to recursive AST, or in place to L{Tree}."""
+    if not isinstance(tree, Tree):
+        return map_terminals(tree, f)
+    t = map_terminals(tree.root, f)
+    tree.clear()
+    tree.root = t
+    tree._recurse(t)
+    return t
+
+
+def _paired_var(c, path):
+    """Return variable paired with C{c} by a binary operator.
+
+    Same as L{pair_node_to_var}, for recursive ASTs.
+
+    @param c: terminal
+    @param path: operators from the root to C{c}
+    @type path: C{list}
+    """
+    # find parent Binary operator
+    old = c
+    for u in reversed(path):
+        if len(u.operands) == 2:
+            break
+        old = u
+    else:
+        raise ValueError(
+            'no binary operator above: {c}'.format(c=c))
+    p, q = u.operands
+    v = p if q is old else q
+    # go down until terminal found
+    # assuming correct syntax for gr1c
+    while hasattr(v, 'operands'):
+        v = v.operands[0]
+    return v
 
 
 def pair_node_to_var(tree, c):
@@ -422,8 +491,7 @@ def _check_var_conflicts(s, variables):
 
 def check_var_name_conflict(f, varname):
     t = parser.parse(f)
-    g = Tree.from_recursive_ast(t)
-    v = {x.value for x in g.variables}
+    v = {x.value for x in iter_nodes(t) if x.type == 'var'}
     if varname in v:
         raise ValueError('var name "{v}" already used'.format(v=varname))
     return v
@@ -434,7 +502,6 @@ def collect_primed_vars(t):
 
     @type t: recursive AST
     """
-    g = Tree.from_recursive_ast(t)
     # (node, context)
     Q = [(t, False)]
     primed = set()
@@ -446,7 +513,7 @@ def collect_primed_vars(t):
             c = (u.operator == 'X') or c
         except AttributeError:
             pass
-        Q.extend((v, c) for v in g.successors_iter(u))
+        Q.extend((v, c) for v in getattr(u, 'operands', ()))
     return primed
 
 
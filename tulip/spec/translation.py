@@ -44,7 +44,9 @@
 import logging
 logger = logging.getLogger(__name__)
 # import pprint
+import itertools
 import re
+import weakref
 from tulip.spec import ast
 import tulip.spec.form
 
@@ -197,6 +199,11 @@ lang2nodes = {
     'smv': make_smv_nodes(),
     'python': make_python_nodes(),
     'wring': make_wring_nodes()}
+# translated AST of each hash-consed node, per language
+_translated = {lang: weakref.WeakKeyDictionary() for lang in lang2nodes}
+# node class of each language for each source node class,
+# to dispatch by a dict lookup, instead of by class name
+_classes = {lang: dict() for lang in lang2nodes}
 
 
 def _to_jtlv(d):
@@ -243,6 +250,15 @@ def _to_gr1c(d):
 
     Cf. L{interfaces.gr1c}.
     """
+    return ''.join(_iter_gr1c(d))
+
+
+def _iter_gr1c(d):
+    """Yield pieces of gr1c specification string.
+
+    The clauses in C{d} can be iterators,
+    which are consumed in the order of output.
+    """
     def _to_gr1c_print_vars(vardict):
         output = ''
         for var, dom in vardict.items():
@@ -259,19 +275,21 @@ def _to_gr1c(d):
         return output
 
     logger.info('translate to gr1c...')
-    output = (
-        'ENV:' + _to_gr1c_print_vars(d['env_vars']) + ';\n' +
-        'SYS:' + _to_gr1c_print_vars(d['sys_vars']) + ';\n' +
-
-        _gr1c_str(d['env_init'], 'ENVINIT', '') +
-        _gr1c_str(d['env_safety'], 'ENVTRANS', '[]') +
-        _gr1c_str(d['env_prog'], 'ENVGOAL', '[]<>') + '\n' +
-
-        _gr1c_str(d['sys_init'], 'SYSINIT', '') +
-        _gr1c_str(d['sys_safety'], 'SYSTRANS', '[]') +
-        _gr1c_str(d['sys_prog'], 'SYSGOAL', '[]<>')
-    )
-    return output
+    yield 'ENV:' + _to_gr1c_print_vars(d['env_vars']) + ';\n'
+    yield 'SYS:' + _to_gr1c_print_vars(d['sys_vars']) + ';\n'
+    for x in _gr1c_str(d['env_init'], 'ENVINIT', ''):
+        yield x
+    for x in _gr1c_str(d['env_safety'], 'ENVTRANS', '[]'):
+        yield x
+    for x in _gr1c_str(d['env_prog'], 'ENVGOAL', '[]<>'):
+        yield x
+    yield '\n'
+    for x in _gr1c_str(d['sys_init'], 'SYSINIT', ''):
+        yield x
+    for x in _gr1c_str(d['sys_safety'], 'SYSTRANS', '[]'):
+        yield x
+    for x in _gr1c_str(d['sys_prog'], 'SYSGOAL', '[]<>'):
+        yield x
 
 def _to_wring(d):
     """Dump to LTL formula in Wring syntax
@@ -327,37 +345,62 @@ def convert_domain(dom):
 
 
 def _gr1c_str(s, name='SYSGOAL', prefix='[]<>'):
-    if not s:
-        return '{name}:;\n'.format(name=name)
-    f = '\n& '.join([
-        prefix + '({u})'.format(u=x) for x in s])
-    return '{name}: {f};\n'.format(name=name, f=f)
+    """Yield pieces of gr1c section C{name} with clauses C{s}."""
+    s = iter(s)
+    x = next(s, None)
+    if x is None:
+        yield '{name}:;\n'.format(name=name)
+        return
+    yield '{name}: {prefix}({u})'.format(name=name, prefix=prefix, u=x)
+    for x in s:
+        yield '\n& {prefix}({u})'.format(prefix=prefix, u=x)
+    yield ';\n'
 
 
 def _to_slugs(d):
     """Return structured slugs spec.
     """
-    f = _slugs_str
-    return (
-        _format_slugs_vars(d['env_vars'], 'INPUT') +
-        _format_slugs_vars(d['sys_vars'], 'OUTPUT') +
+    return ''.join(_iter_slugs(d))
 
-        f(d['env_safety'], 'ENV_TRANS') +
-        f(d['env_prog'], 'ENV_LIVENESS') +
-        f(d['env_init'], 'ENV_INIT', sep='&') +
 
-        f(d['sys_safety'], 'SYS_TRANS') +
-        f(d['sys_prog'], 'SYS_LIVENESS') +
-        f(d['sys_init'], 'SYS_INIT', sep='&')
-    )
+def _iter_slugs(d):
+    """Yield pieces of structured slugs spec.
+
+    The clauses in C{d} can be iterators,
+    which are consumed in the order of output.
+    """
+    yield _format_slugs_vars(d['env_vars'], 'INPUT')
+    yield _format_slugs_vars(d['sys_vars'], 'OUTPUT')
+    sections = [
+        ('env_safety', 'ENV_TRANS', '\n'),
+        ('env_prog', 'ENV_LIVENESS', '\n'),
+        ('env_init', 'ENV_INIT', '&'),
+        ('sys_safety', 'SYS_TRANS', '\n'),
+        ('sys_prog', 'SYS_LIVENESS', '\n'),
+        ('sys_init', 'SYS_INIT', '&')]
+    for part, name, sep in sections:
+        for x in _slugs_str(d[part], name, sep):
+            yield x
 
 
 def _slugs_str(r, name, sep='\n'):
-    if not r:
-        return '[{name}]\n'.format(name=name)
+    """Yield pieces of slugs section C{name} with clauses C{r}."""
+    r = iter(r)
+    x = next(r, None)
+    if x is None:
+        yield '[{name}]\n'.format(name=name)
+        return
+    yield '[{name}]\n'.format(name=name)
     sep = ' {sep} '.format(sep=sep)
-    f = sep.join(x for x in r if x)
-    return '[{name}]\n{f}\n\n'.format(name=name, f=f)
+    first = True
+    for x in itertools.chain([x], r):
+        if not x:
+            continue
+        if not first:
+            yield sep
+        first = False
+        yield x
+    yield '\n\n'
 
 
 def _format_slugs_vars(vardict, name):
@@ -376,6 +419,7 @@ def _format_slugs_vars(vardict, name):
 
 to_lang = {'jtlv': _to_jtlv, 'gr1c': _to_gr1c, 'slugs': _to_slugs,
            'wring': _to_wring}
+iter_lang = {'gr1c': _iter_gr1c, 'slugs': _iter_slugs}
 
 
 def translate(spec, lang):
@@ -393,23 +437,78 @@ def translate(spec, lang):
         - C{str} if gr1c or slugs
         - (assumption, guarantee), where each element of the tuple is C{str}
     """
+    if lang in iter_lang:
+        return ''.join(translate_iter(spec, lang))
+    d = _translate_parts(spec, lang)
+    for p in spec._parts:
+        d[p] = list(d[p])
+    return to_lang[lang](d)
+
+
+def translate_iter(spec, lang):
+    """Yield pieces of C{str} in tool format.
+
+    Joined, the pieces equal L{translate}C{(spec, lang)}.
+    Each clause is translated when its piece is reached,
+    so the pieces can be written to a file or pipe
+    without constructing the whole string.
+
+    @type spec: L{GRSpec}
+    @type lang: 'gr1c' or 'slugs'
+    @rtype: generator of C{str}
+    """
+    if lang not in iter_lang:
+        raise ValueError(
+            'unknown language "{lang}", available: {a}'.format(
+                lang=lang, a=sorted(iter_lang)))
+    d = _translate_parts(spec, lang)
+    return iter_lang[lang](d)
+
+
+def _translate_parts(spec, lang):
+    """Return C{dict} of parts, as iterators of translated clauses.
+
+    Also contains the variables of C{spec}.
+    """
     if not isinstance(spec, tulip.spec.form.GRSpec):
         raise TypeError('translate requires first argument (spec) to be of type GRSpec')
     spec.check_syntax()
     spec.str_to_int()
     # pprint.pprint(spec._bool_int)
-    d = {p: [translate_ast(spec.ast(spec._bool_int[x]), lang).flatten(
-             env_vars=spec.env_vars, sys_vars=spec.sys_vars)
-         for x in getattr(spec, p)] for p in spec._parts}
-    # pprint.pprint(d)
+    # int/bool clauses can repeat within or among parts,
+    # so keep their flattened form until their last occurrence
+    count = dict()
+    for p in spec._parts:
+        for x in getattr(spec, p):
+            f = spec._bool_int[x]
+            count[f] = count.get(f, 0) + 1
+    flat = dict()
+
+    def clauses(part):
+        for x in part:
+            f = spec._bool_int[x]
+            s = flat.pop(f, None)
+            if s is None:
+                s = translate_ast(spec.ast(f), lang).flatten(
+                    env_vars=spec.env_vars, sys_vars=spec.sys_vars)
+            count[f] -= 1
+            if count[f]:
+                flat[f] = s
+            yield s
+
+    d = {p: clauses(getattr(spec, p)) for p in spec._parts}
     d['env_vars'] = spec.env_vars
     d['sys_vars'] = spec.sys_vars
-    return to_lang[lang](d)
+    return d
 
 
 def translate_ast(tree, lang):
     """Return AST of formula C{tree}.
 
+    The translation of each node is memoized,
+    so subformulas shared by hash-consing, within C{tree}
+    or with earlier calls, are translated once.
+
     @type tree: L{Nodes.Node}
     @type lang: 'gr1c' or 'slugs' or 'jtlv' or
       'promela' or 'smv' or 'python' or 'wring'
@@ -417,35 +516,56 @@ def translate_ast(tree, lang):
     @return: tree using AST nodes of C{lang}
     @rtype: L{FOL.Node}
     """
+    memo = _translated[lang]
+    classes = _classes[lang]
     if lang == 'python':
-        return _ast_to_python(tree, lang2nodes[lang])
+        return _ast_to_python(tree, lang2nodes[lang], memo, classes)
     else:
-        return _ast_to_lang(tree, lang2nodes[lang])
+        return _ast_to_lang(tree, lang2nodes[lang], memo, classes)
+
+
+def _node_class(u, nodes, classes):
+    """Return class in C{nodes} with same name as class of C{u}."""
+    t = type(u)
+    cls = classes.get(t)
+    if cls is None:
+        cls = getattr(nodes, t.__name__)
+        classes[t] = cls
+    return cls
 
 
-def _ast_to_lang(u, nodes):
-    cls = getattr(nodes, type(u).__name__)
+def _ast_to_lang(u, nodes, memo, classes):
+    r = memo.get(u)
+    if r is not None:
+        return r
+    cls = _node_class(u, nodes, classes)
     if hasattr(u, 'value'):
-        return cls(u.value)
+        r = cls(u.value)
     elif hasattr(u, 'operator'):
-        xyz = [_ast_to_lang(x, nodes) for x in u.operands]
-        return cls(u.operator, *xyz)
+        xyz = [_ast_to_lang(x, nodes, memo, classes) for x in u.operands]
+        r = cls(u.operator, *xyz)
     else:
         raise TypeError('Unknown node type "{t}"'.format(
             t=type(u).__name__))
+    memo[u] = r
+    return r
 
 
-def _ast_to_python(u, nodes):
-    cls = getattr(nodes, type(u).__name__)
+def _ast_to_python(u, nodes, memo, classes):
+    r = memo.get(u)
+    if r is not None:
+        return r
+    cls = _node_class(u, nodes, classes)
     if hasattr(u, 'value'):
-        return cls(u.value)
+        r = cls(u.value)
     elif not hasattr(u, 'operands'):
         raise TypeError(
             'AST node: {u}'.format(u=type(u).__name__) +
             ', is neither terminal nor operator.')
     elif len(u.operands) == 1:
         assert u.operator == '!'
-        return cls(u.operator, _ast_to_python(u.operands[0], nodes))
+        r = cls(u.operator,
+                _ast_to_python(u.operands[0], nodes, memo, classes))
     elif len(u.operands) == 2:
         assert u.operator in {'&', '|', '^', '->', '<->',
                               '>', '>=', '=', '!=', '<=', '<',
@@ -454,9 +574,11 @@ def _ast_to_python(u, nodes):
             cls = nodes.Imp
         elif u.operator == '<->':
             cls = nodes.BiImp
-        return cls(u.operator,
-                   _ast_to_python(u.operands[0], nodes),
-                   _ast_to_python(u.operands[1], nodes))
+        r = cls(u.operator,
+                _ast_to_python(u.operands[0], nodes, memo, classes),
+                _ast_to_python(u.operands[1], nodes, memo, classes))
     else:
         raise ValueError(
             'Operator: {u}, is neither unary nor binary.'.format(u=u))
+    memo[u] = r
+    return r
@@ -39,11 +39,14 @@ import warnings
 from tulip.interfaces import gr1c
 from tulip.interfaces import gr1py
 from tulip.interfaces import omega as omega_int
+from tulip.interfaces import _stats
+from tulip.interfaces._stats import SynthesisStats
 try:
     from tulip.interfaces import slugs
 except ImportError:
     slugs = None
 from tulip.spec import GRSpec
+from tulip.spec import evaluation
 from tulip import transys
 
 
@@ -172,19 +175,23 @@ def _conj_actions(actions_dict, solver_expr=None, nxt=False):
     Includes solver expression substitution.
     See also L{_conj_action}.
     """
-    logger.debug('conjunction of actions: ' + str(actions_dict))
-    logger.debug('mapping to solver equivalents: ' + str(solver_expr))
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug('conjunction of actions: ' + str(actions_dict))
+        logger.debug('mapping to solver equivalents: ' + str(solver_expr))
     if not actions_dict:
-        logger.debug('actions_dict empty, returning empty string\n')
+        if debug:
+            logger.debug('actions_dict empty, returning empty string\n')
         return ''
     if solver_expr is not None:
         actions = [solver_expr[type_name][action_value]
                    for type_name, action_value in actions_dict.items()]
     else:
         actions = actions_dict
-    logger.debug('after substitution: ' + str(actions))
     conjuncted_actions = _conj(actions)
-    logger.debug('conjuncted actions: ' + str(conjuncted_actions) + '\n')
+    if debug:
+        logger.debug('after substitution: ' + str(actions))
+        logger.debug('conjuncted actions: ' + str(conjuncted_actions) + '\n')
     if nxt:
         return ' X' + _pstr(conjuncted_actions)
     else:
@@ -256,8 +263,10 @@ def iter2var(states, variables, statevar, bool_states, must):
     if not states:
         logger.debug('empty container, so empty dict for solver expr')
         return dict(), None
-    logger.debug('mapping domain: ' + str(states) + '\n\t'
-                 'to expression understood by a GR(1) solver.')
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug('mapping domain: ' + str(states) + '\n\t'
+                     'to expression understood by a GR(1) solver.')
     assert must in {'mutex', 'xor', None}
     # options for modeling actions
     if must in {'mutex', 'xor'}:
@@ -326,10 +335,11 @@ def iter2var(states, variables, statevar, bool_states, must):
         state_ids = {x: f(x) for x in states}
         variables[statevar] = domain
         constraint = None
-    logger.debug(
-        'for tulip variable: ' + str(statevar) + '\n'
-        'the map from [tulip action values] ---> '
-        '[solver expressions] is:\n' + 2 * '\t' + str(state_ids))
+    if debug:
+        logger.debug(
+            'for tulip variable: ' + str(statevar) + '\n'
+            'the map from [tulip action values] ---> '
+            '[solver expressions] is:\n' + 2 * '\t' + str(state_ids))
     return state_ids, constraint
 
 
@@ -443,7 +453,8 @@ def sys_to_spec(
     @return: logic formula in GR(1) form representing C{ofts}.
     @rtype: L{GRSpec}
     """
-    if not isinstance(ofts, transys.FiniteTransitionSystem):
+    if not isinstance(ofts, (transys.FiniteTransitionSystem,
+                             transys.CompactFTS)):
         raise TypeError('ofts must be FTS, got instead: ' + str(type(ofts)))
     assert ofts.owner == 'sys'
     aps = ofts.aps
@@ -522,7 +533,8 @@ def env_to_spec(
     ========
     L{sys_open_fts2spec}
     """
-    if not isinstance(ofts, transys.FiniteTransitionSystem):
+    if not isinstance(ofts, (transys.FiniteTransitionSystem,
+                             transys.CompactFTS)):
         raise TypeError('ofts must be FTS, got instead: ' + str(type(ofts)))
     assert ofts.owner == 'env'
     aps = ofts.aps
@@ -653,30 +665,34 @@ def _sys_trans_from_ts(
     @param env_action_ids: same as C{sys-action_ids}
     """
     logger.debug('modeling sys transitions in logic')
+    debug = logger.isEnabledFor(logging.DEBUG)
     sys_trans = list()
     # Transitions
     for from_state in states:
         from_state_id = state_ids[from_state]
         precond = _pstr(from_state_id)
         cur_trans = trans.find([from_state])
-        msg = ('from state: ' + str(from_state) +
-               ', the available transitions are:\n\t' + str(cur_trans))
-        logger.debug(msg)
+        if debug:
+            msg = ('from state: ' + str(from_state) +
+                   ', the available transitions are:\n\t' + str(cur_trans))
+            logger.debug(msg)
         # no successor states ?
         if not cur_trans:
-            logger.debug('state: ' + str(from_state) + ' is deadend !')
+            if debug:
+                logger.debug('state: ' + str(from_state) + ' is deadend !')
             sys_trans += [precond + ' -> X(False)']
             continue
         cur_str = list()
         for (from_state, to_state, label) in cur_trans:
             to_state_id = state_ids[to_state]
             postcond = ['X' + _pstr(to_state_id)]
-            logger.debug('label = ' + str(label))
             if 'previous' in label:
                 previous = label['previous']
             else:
                 previous = set()
-            logger.debug('previous = ' + str(previous))
+            if debug:
+                logger.debug('label = ' + str(label))
+                logger.debug('previous = ' + str(previous))
             env_actions = {k: v for k, v in label.items() if 'env' in k}
             prev_env_act = {k: v for k, v in env_actions.items()
                             if k in previous}
@@ -706,11 +722,12 @@ def _sys_trans_from_ts(
                 postcond += [_conj_action(label, 'actions',
                                           ids=action_ids, nxt=True)]
             cur_str += [_conj(postcond)]
-            msg = (
-                'guard to state: ' + str(to_state) +
-                ', with state_id: ' + str(to_state_id) +
-                ', has post-conditions: ' + str(postcond))
-            logger.debug(msg)
+            if debug:
+                msg = (
+                    'guard to state: ' + str(to_state) +
+                    ', with state_id: ' + str(to_state_id) +
+                    ', has post-conditions: ' + str(postcond))
+                logger.debug(msg)
         sys_trans += [precond + ' -> (' + _disj(cur_str) + ')']
     return sys_trans
 
@@ -734,6 +751,7 @@ def _env_trans_from_sys_ts(states, state_ids, trans, env_action_ids):
     # this probably useless for multiple action types
     if not env_action_ids:
         return env_trans
+    debug = logger.isEnabledFor(logging.DEBUG)
     for from_state in states:
         from_state_id = state_ids[from_state]
         precond = _pstr(from_state_id)
@@ -750,13 +768,15 @@ def _env_trans_from_sys_ts(states, state_ids, trans, env_action_ids):
             env_actions = {k: v for k, v in label.items() if 'env' in k}
             if not env_actions:
                 continue
-            logger.debug('env_actions: ' + str(env_actions))
-            logger.debug('env_action_ids: ' + str(env_action_ids))
             env_action_comb = _conj_actions(env_actions, env_action_ids)
-            logger.debug('env_action_comb: ' + str(env_action_comb))
+            if debug:
+                logger.debug('env_actions: ' + str(env_actions))
+                logger.debug('env_action_ids: ' + str(env_action_ids))
+                logger.debug('env_action_comb: ' + str(env_action_comb))
             next_env_action_combs.add(env_action_comb)
         next_env_actions = _disj(next_env_action_combs)
-        logger.debug('next_env_actions: ' + str(next_env_actions))
+        if debug:
+            logger.debug('next_env_actions: ' + str(next_env_actions))
         # no next env actions ?
         if not next_env_actions:
             continue
@@ -818,6 +838,8 @@ def _env_trans_from_env_ts(
             for action_type, codomain in sys_action_ids.items():
                 conj = _conj_neg(codomain.values())
                 cur_list += [conj]
+                if not logger.isEnabledFor(logging.DEBUG):
+                    continue
                 msg = (
                     'for action_type: ' + str(action_type) + '\n' +
                     'with codomain: ' + str(codomain) + '\n' +
@@ -923,7 +945,8 @@ def map_ap_to_states(fts):
 
 
 def synthesize_many(specs, ts=None, ignore_init=None,
-                    solver='omega'):
+                    solver='omega', use_cudd=None, bdd_options=None,
+                    stats=None):
     """Synthesize from logic specs and multiple transition systems.
 
     The transition systems are composed synchronously, i.e.,
@@ -977,10 +1000,15 @@ def synthesize_many(specs, ts=None, ignore_init=None,
     @param solver: See function `synthesize` for
         available options.
     @type solver: str
+
+    @param use_cudd, bdd_options, stats: See function `synthesize`.
     """
     assert isinstance(ts, dict), ts
+    # extended in place below
+    specs = specs.copy()
     for name, t in ts.items():
-        assert isinstance(t, transys.FiniteTransitionSystem), t
+        assert isinstance(t, (transys.FiniteTransitionSystem,
+                              transys.CompactFTS)), t
         ignore = name in ignore_init
         statevar = name
         if t.owner == 'sys':
@@ -991,7 +1019,9 @@ def synthesize_many(specs, ts=None, ignore_init=None,
             env_spec = env_to_spec(t, ignore, statevar)
             _copy_options_from_ts(env_spec, t, specs)
             specs |= env_spec
-    return _synthesize(specs, solver, rm_deadends=True)
+    return _synthesize(
+        specs, solver, rm_deadends=True,
+        use_cudd=use_cudd, bdd_options=bdd_options, stats=stats)
 
 
 def synthesize(
@@ -1001,7 +1031,11 @@ def synthesize(
         ignore_env_init=False,
         ignore_sys_init=False,
         rm_deadends=True,
-        solver='omega'):
+        solver='omega',
+        use_cudd=None,
+        bdd_options=None,
+        symbolic=False,
+        stats=None):
     """Function to call the appropriate synthesis tool on the specification.
 
     There are three attributes of C{specs} that define what
@@ -1089,65 +1123,121 @@ def synthesize(
           - C{"slugs"}: use slugs via L{interfaces.slugs}.
             C++ using CUDD, symbolic
 
+    @param use_cudd: if C{solver == "omega"}, then select
+        the BDD package: C{dd.cudd} if C{True},
+        C{dd.bdd} if C{False}, and C{dd.cudd} if it is
+        installed if C{None}.
+    @type use_cudd: bool or None
+
+    @param bdd_options: if C{solver == "omega"}, then settings
+        of the BDD manager, for example dynamic reordering,
+        cache size, and memory bound.
+        See L{interfaces.omega._init_bdd}.
+    @type bdd_options: dict
+
+    @param symbolic: if C{True}, then return the strategy
+        represented with BDDs, without enumerating it.
+        Available only for C{solver == "omega"}.
+    @type symbolic: bool
+
+    @param stats: record in this object the translation time,
+        solver wall and CPU time, peak memory, strategy size,
+        and time to convert the strategy to a Mealy machine.
+    @type stats: L{SynthesisStats}
+
     @return: If spec is realizable,
-        then return a Mealy machine implementing the strategy.
+        then return a Mealy machine implementing the strategy,
+        or a L{interfaces.omega.SymbolicController} if C{symbolic}.
         Otherwise return None.
-    @rtype: L{MealyMachine} or None
+    @rtype: L{MealyMachine} or
+        L{interfaces.omega.SymbolicController} or None
     """
     specs = _spec_plus_sys(
         specs, env, sys,
         ignore_env_init,
         ignore_sys_init)
-    return _synthesize(specs, solver, rm_deadends)
-
-
-def _synthesize(specs, solver, rm_deadends):
+    if symbolic:
+        if solver != 'omega':
+            raise ValueError(
+                'symbolic strategies are available only '
+                'from the solver "omega", not "{s}"'.format(s=solver))
+        if stats is None:
+            stats = SynthesisStats()
+        stats.solver = solver
+        return omega_int.synthesize_symbolic_streett(
+            specs, use_cudd=use_cudd, bdd_options=bdd_options,
+            stats=stats)
+    return _synthesize(
+        specs, solver, rm_deadends,
+        use_cudd=use_cudd, bdd_options=bdd_options, stats=stats)
+
+
+def _synthesize(specs, solver, rm_deadends,
+                use_cudd=None, bdd_options=None, stats=None):
     """Return `MealyMachine` or `None` that implements `specs`.
 
     @type specs: L{spec.GRSpec}
     @type rm_deadends: C{bool}
+    @type stats: L{SynthesisStats}
     @rtype: L{MealyMachine} or C{None}
     """
+    if stats is None:
+        stats = SynthesisStats()
+    stats.solver = solver
     if solver == 'gr1c':
-        strategy = gr1c.synthesize(specs)
+        strategy = gr1c.synthesize(specs, stats=stats)
     elif solver == 'slugs':
         if slugs is None:
             raise ValueError(
                 'Import of slugs interface failed. '
                 'Please verify installation of "slugs".')
-        strategy = slugs.synthesize(specs)
+        strategy = slugs.synthesize(specs, stats=stats)
     elif solver == 'gr1py':
-        strategy = gr1py.synthesize(specs)
+        strategy = gr1py.synthesize(specs, stats=stats)
     elif solver == 'omega':
-        strategy = omega_int.synthesize_enumerated_streett(specs)
+        strategy = omega_int.synthesize_enumerated_streett(
+            specs, use_cudd=use_cudd, bdd_options=bdd_options,
+            stats=stats)
     else:
         options = {'gr1c', 'gr1py', 'omega', 'slugs'}
         raise Exception((
             'Unknown solver: "{solver}". '
             'Available options are: {options}').format(
                 solver=solver, options=options))
-    return _trim_strategy(strategy, specs, rm_deadends=rm_deadends)
+    ctrl = _trim_strategy(
+        strategy, specs, rm_deadends=rm_deadends, stats=stats)
+    logger.info('synthesis statistics:\n{s}'.format(s=stats))
+    return ctrl
 
 
-def _trim_strategy(strategy, specs, rm_deadends):
+def _trim_strategy(strategy, specs, rm_deadends, stats=None):
     """Return C{MealyMachine} without deadends, or C{None}.
 
     If C{strategy is None}, then return C{None}.
 
     @param rm_deadends: if C{True}, then remove deadends
         from the Mealy machine
+    @param stats: record strategy size and conversion time
+    @type stats: L{SynthesisStats}
     """
     # While the return values of the solver interfaces vary, we expect
     # here that strategy is either None to indicate unrealizable or a
     # networkx.DiGraph ready to be passed to strategy2mealy().
     if strategy is None:
         return None
+    if stats is None:
+        stats = SynthesisStats()
+    start = _stats.clock()
+    stats.strategy_size = len(strategy)
     ctrl = strategy2mealy(strategy, specs)
     logger.debug(
         'Mealy machine has: n = {n} states.'.format(
             n=len(ctrl.states)))
     if rm_deadends:
-        ctrl.remove_deadends()
+        removed = ctrl.remove_deadends(quiet=True)
+        logger.info('removed {r} deadends from the Mealy machine'.format(
+            r=len(removed)))
+    stats.add_conversion(start)
     return ctrl
 
 
@@ -1157,7 +1247,10 @@ def is_realizable(
         sys=None,
         ignore_env_init=False,
         ignore_sys_init=False,
-        solver='omega'):
+        solver='omega',
+        use_cudd=None,
+        bdd_options=None,
+        stats=None):
     """Check realizability.
 
     For details see L{synthesize}.
@@ -1165,18 +1258,23 @@ def is_realizable(
     specs = _spec_plus_sys(
         specs, env, sys,
         ignore_env_init, ignore_sys_init)
+    if stats is None:
+        stats = SynthesisStats()
+    stats.solver = solver
     if solver == 'gr1c':
-        r = gr1c.check_realizable(specs)
+        r = gr1c.check_realizable(specs, stats=stats)
     elif solver == 'slugs':
         if slugs is None:
             raise ValueError(
                 'Import of slugs interface failed. '
                 'Please verify installation of "slugs".')
-        r = slugs.check_realizable(specs)
+        r = slugs.check_realizable(specs, stats=stats)
     elif solver == 'gr1py':
-        r = gr1py.check_realizable(specs)
+        r = gr1py.check_realizable(specs, stats=stats)
     elif solver == 'omega':
-        r = omega_int.is_realizable(specs)
+        r = omega_int.is_realizable(
+            specs, use_cudd=use_cudd, bdd_options=bdd_options,
+            stats=stats)
     else:
         raise Exception(
             'Undefined synthesis solver. '
@@ -1186,6 +1284,7 @@ def is_realizable(
         logger.debug('is realizable')
     else:
         logger.debug('is not realizable')
+    logger.info('realizability statistics:\n{s}'.format(s=stats))
     return r
 
 
@@ -1204,7 +1303,8 @@ def _spec_plus_sys(
             statevar=statevar)
         _copy_options_from_ts(sys_formula, sys, specs)
         specs = specs | sys_formula
-        logger.debug('sys TS:\n' + str(sys_formula.pretty()) + _hl)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('sys TS:\n' + str(sys_formula.pretty()) + _hl)
     if env is not None:
         if hasattr(env, 'state_varname'):
             statevar = sys.state_varname
@@ -1217,8 +1317,10 @@ def _spec_plus_sys(
             statevar=statevar)
         _copy_options_from_ts(env_formula, env, specs)
         specs = specs | env_formula
-        logger.debug('env TS:\n' + str(env_formula.pretty()) + _hl)
-    logger.info('Overall Spec:\n' + str(specs.pretty()) + _hl)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('env TS:\n' + str(env_formula.pretty()) + _hl)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info('Overall Spec:\n' + str(specs.pretty()) + _hl)
     return specs
 
 
@@ -1266,6 +1368,8 @@ def strategy2mealy(A, spec):
         k: v for k, v in sys_vars.items()
         if isinstance(v, list)})
     mach.states.add_from(A)
+    info = logger.isEnabledFor(logging.INFO)
+    debug = logger.isEnabledFor(logging.DEBUG)
     # transitions labeled with I/O
     for u in A:
         for v in A.successors_iter(u):
@@ -1273,7 +1377,8 @@ def strategy2mealy(A, spec):
             d = _int2str(d, str_vars)
             mach.transitions.add(u, v, **d)
 
-            logger.info('node: {v}, state: {d}'.format(v=v, d=d))
+            if info:
+                logger.info('node: {v}, state: {d}'.format(v=v, d=d))
     # special initial state, for first reaction
     initial_state = 'Sinit'
     mach.states.add(initial_state)
@@ -1287,10 +1392,10 @@ def strategy2mealy(A, spec):
     except Exception:
         logger.warning('strategy has no states.')
     # to store tuples of dict values for fast search
-    isinit = spec.compile_init(no_str=True)
+    env_init = evaluation.compile_part(spec, 'env_init', no_str=True)
+    sys_init = evaluation.compile_part(spec, 'sys_init', no_str=True)
     # Mealy reaction to initial env input
     init_valuations = set()
-    tmp = dict()
     for u, d in A.nodes_iter(data=True):
         var_values = d['state']
         vals = tuple(var_values[k] for k in keys)
@@ -1298,8 +1403,7 @@ def strategy2mealy(A, spec):
         if vals in init_valuations:
             continue
         # add edge: Sinit -> u ?
-        tmp.update(var_values)
-        if eval(isinit, tmp):
+        if not env_init(var_values) or sys_init(var_values):
             label = _int2str(var_values, str_vars)
             mach.transitions.add(initial_state, u, **label)
             # remember variable values to avoid
@@ -1313,9 +1417,11 @@ def strategy2mealy(A, spec):
             # non-uniqueness here would be equivalent to
             # multiple choices for initializing the hidden memory.
             init_valuations.add(vals)
-            logger.debug('found initial state: {u}'.format(u=u))
-        logger.debug('machine vertex: {u}, has var values: {v}'.format(
-                     u=u, v=var_values))
+            if debug:
+                logger.debug('found initial state: {u}'.format(u=u))
+        if debug:
+            logger.debug('machine vertex: {u}, has var values: {v}'.format(
+                         u=u, v=var_values))
     n = len(A)
     m = len(mach)
     assert m == n + 1, (n, m)
@@ -43,6 +43,7 @@ from .transys import (
     LabeledGameGraph,
     tuple2fts, line_labeled_with, cycle_labeled_with
 )
+from .compact import CompactFTS
 
 from .automata import (
     BuchiAutomaton, BA, tuple2ba,
@@ -53,4 +54,4 @@ from .automata import (
 
 from .machines import MooreMachine, MealyMachine
 
-from .products import OnTheFlyProductAutomaton
+from .products import OnTheFlyProductAutomaton, find_accepting_lasso
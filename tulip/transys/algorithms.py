@@ -33,16 +33,16 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
-import logging
 import copy
+import logging
 from tulip.transys.transys import FiniteTransitionSystem
 from tulip.transys.automata import BuchiAutomaton
-import networkx as nx
 from tulip.interfaces import ltl2ba as ltl2baint
 # possible future:
 # from tulip.transys.transys import TransitionSystem
 # from tulip.transys.automata import Automaton
 from tulip.transys.labeled_graphs import LabeledDiGraph
+from tulip.transys.mathset import MathSet
 
 
 _hl = 40 * '-'
@@ -73,98 +73,195 @@ def ltl2ba(formula):
     return ba
 
 
-def _multiply_mutable_states(self, other, prod_graph, prod_sys):
-    def prod_ids2states(prod_state_id, self, other):
-        (idx1, idx2) = prod_state_id
-        state1 = self.states._int2mutant(idx1)
-        state2 = other.states._int2mutant(idx2)
-        prod_state = (state1, state2)
-        return prod_state
+def _product(g1, g2, prod_sys, sync):
+    """Add the reachable part of the product of C{g1}, C{g2} to C{prod_sys}.
+
+    The initial states of the product are the pairs of initial states.
+    If a factor has no initial states, then all its states are initial.
+    Product states are explored breadth-first from the initial ones,
+    so unreachable pairs are never constructed.  The edges are added
+    in bulk with L{Transitions.add_from_arrays}, one call for
+    each set of label keys.
+
+    The label of a product state maps each key to the union
+    (C{|} or C{+}) of the labels of the factors.  The label of an edge
+    of the synchronous product maps each key to the pair of the
+    labels of the factor edges (C{None} if missing), as in
+    C{networkx.tensor_product}.  An edge of the asynchronous product
+    has the label of the factor edge that it moves along.
+
+    @param prod_sys: graph to add the product to.
+        If C{None}, then return a new L{LabeledDiGraph}, with a label
+        type for each key, whose values are the labels that occur.
+    @param sync: if C{True}, then both factors move at each step,
+        otherwise one factor moves at each step
+    """
+    out1 = _out_edges(g1)
+    out2 = _out_edges(g2)
+    init1 = list(g1.states.initial) or list(g1)
+    init2 = list(g2.states.initial) or list(g2)
+    initial = [(u, z) for u in init1 for z in init2]
+    visited = set(initial)
+    states = list(initial)
+    edges = list()
+    layer = initial
+    while layer:
+        succ = _successors(layer, out1, out2, sync)
+        layer = list()
+        for edge in succ:
+            edges.append(edge)
+            v = edge[1]
+            if v not in visited:
+                visited.add(v)
+                states.append(v)
+                layer.append(v)
+    logger.info('product has {n} reachable states and {m} edges'.format(
+        n=len(states), m=len(edges)))
+    labels = [_label_union(g1.node[u], g2.node[z]) for u, z in states]
+    if prod_sys is None:
+        prod_sys = LabeledDiGraph(
+            node_label_types=_label_types(labels),
+            edge_label_types=_label_types(d for _, _, d in edges))
+    for state, label in zip(states, labels):
+        prod_sys.states.add(state, **label)
+    prod_sys.states.initial |= initial
+    # group edges by label keys, for bulk insertion
+    groups = dict()
+    for u, v, d in edges:
+        keys = tuple(sorted(d))
+        if keys not in groups:
+            groups[keys] = (list(), list(), {k: list() for k in keys})
+        us, vs, labels = groups[keys]
+        us.append(u)
+        vs.append(v)
+        for k in keys:
+            labels[k].append(d[k])
+    for us, vs, labels in groups.values():
+        prod_sys.transitions.add_from_arrays(us, vs, labels=labels)
+    return prod_sys
+
+
+def _out_edges(g):
+    """Return C{dict} that maps each node to its labeled out-edges."""
+    return {
+        u: [(v, dict(d))
+            for v, keydict in g.succ[u].items()
+            for d in keydict.values()]
+        for u in g}
+
+
+def _successors(states, out1, out2, sync):
+    """Return labeled edges from C{states}, see L{_product}."""
+    edges = list()
+    for state in states:
+        u, z = state
+        if sync:
+            for v, d1 in out1[u]:
+                for w, d2 in out2[z]:
+                    d = {k: (d1.get(k), d2.get(k))
+                         for k in set(d1).union(d2)}
+                    edges.append((state, (v, w), d))
+            continue
+        loops = list()
+        for v, d in out1[u]:
+            edges.append((state, (v, z), d))
+            if v == u:
+                loops.append(d)
+        for w, d in out2[z]:
+            # both factors can self-loop with the same label
+            if w == z and d in loops:
+                continue
+            edges.append((state, (u, w), d))
+    return edges
+
+
+def _label_types(labels):
+    """Return label types with the values that occur in C{labels}."""
+    values = dict()
+    for d in labels:
+        for k, v in d.items():
+            if k not in values:
+                values[k] = MathSet()
+            if v not in values[k]:
+                values[k].add(v)
+    return [dict(name=k, values=v) for k, v in values.items()]
+
+
+def _fts_prod_sys(ts1, ts2, sync):
+    """Return empty L{FiniteTransitionSystem} for product of FTS.
+
+    The atomic propositions are the union of those of the factors.
+    The actions of the synchronous product are pairs of actions,
+    with C{None} for an edge without action, and those of the
+    asynchronous product are the union of actions.
+    """
+    prod_ts = FiniteTransitionSystem()
+    # union of AP sets
+    prod_ts.atomic_propositions |= \
+        ts1.atomic_propositions | ts2.atomic_propositions
+    for k in ('env_actions', 'sys_actions'):
+        a = list(getattr(ts1, k))
+        b = list(getattr(ts2, k))
+        if sync:
+            # Cartesian product of action sets
+            a.append(None)
+            b.append(None)
+            getattr(prod_ts, k).add_from(
+                (x, y) for x in a for y in b
+                if x is not None or y is not None)
+        else:
+            # union of action sets
+            getattr(prod_ts, k).add_from(a)
+            getattr(prod_ts, k).add_from(b)
+    return prod_ts
 
-    def label_union(nx_label):
-        (v1, v2) = nx_label
 
+def _label_union(attr1, attr2):
+    """Return union of state labels of the factors, per key."""
+    label = dict()
+    for k in set(attr1).union(attr2):
+        v1 = attr1.get(k)
+        v2 = attr2.get(k)
         if v1 is None or v2 is None:
             raise Exception(
                 'At least one factor has unlabeled state, '
                 "or the state sublabel types don't match.")
         try:
-            return v1 | v2
-        except:
+            label[k] = v1 | v2
+            continue
+        except TypeError:
             pass
         try:
-            return v2 + v2
-        except:
+            label[k] = v1 + v2
+        except TypeError:
             raise TypeError(
                 'The state sublabel types should support ' +
                 'either | or + for labeled system products.')
-
-    def state_label_union(attr_dict):
-        prod_attr_dict = dict()
-        for k, v in attr_dict.items():
-            prod_attr_dict[k] = label_union(v)
-        return prod_attr_dict
-
-    # union of state labels from the networkx tuples
-    for prod_state_id, attr_dict in prod_graph.nodes_iter(data=True):
-        prod_attr_dict = state_label_union(attr_dict)
-        prod_state = prod_ids2states(prod_state_id, self, other)
-
-        prod_sys.states.add(prod_state)
-        prod_sys.states.add(prod_state, **prod_attr_dict)
-    print(prod_sys.states)
-
-    # prod of initial states
-    inits1 = self.states.initial
-    inits2 = other.states.initial
-
-    prod_init = []
-    for (init1, init2) in zip(inits1, inits2):
-        new_init = (init1, init2)
-        prod_init.append(new_init)
-    prod_sys.states.initial |= prod_init
-
-    # # multiply mutable states (only the reachable added)
-    # if self.states.mutants or other.states.mutants:
-    #     for idx, prod_state_id in enumerate(prod_graph.nodes_iter() ):
-    #         prod_state = prod_ids2states(prod_state_id, self, other)
-    #         prod_sys.states.mutants[idx] = prod_state
-    #
-    #     prod_sys.states.min_free_id = idx +1
-    # # no else needed: otherwise self already not mutant
-
-    # action labeling is taken care by nx,
-    # since transition taken at a time
-    for from_state_id, to_state_id, edge_dict in prod_graph.edges_iter(data=True):
-
-        from_state = prod_ids2states(from_state_id, self, other)
-        to_state = prod_ids2states(to_state_id, self, other)
-
-        prod_sys.transitions.add(
-            from_state, to_state, **edge_dict)
-    return prod_sys
+    return label
 
 
 # binary operators (for magic binary operators: see above)
 def tensor_product(self, other, prod_sys=None):
-    """Return strong product with given graph.
+    """Return tensor (synchronous) product with given graph.
+
+    If u,v are nodes in C{self} and z,w nodes in C{other},
+    then ((u,z), (v,w) ) is an edge in the tensor product
+    if and only if (u,v) is an edge in C{self} and
+    (z,w) is an edge in C{other}.
+
+    Only the states reachable from the initial states are added,
+    see L{_product} for the labeling.  If C{prod_sys is None} and
+    both factors are L{FiniteTransitionSystem}, then the product
+    is a L{FiniteTransitionSystem}, see L{_fts_prod_sys}.
 
     Reference
     =========
-    http://en.wikipedia.org/wiki/Strong_product_of_graphs
-    nx.algorithms.operators.product.strong_product
+    http://en.wikipedia.org/wiki/Tensor_product_of_graphs
+    nx.algorithms.operators.product.tensor_product
     """
-    prod_graph = nx.product.tensor_product(self, other)
-    # not populating ?
-    if prod_sys is None:
-        if self.states.mutants or other.states.mutants:
-            mutable = True
-        else:
-            mutable = False
-        prod_sys = LabeledDiGraph(mutable=mutable)
-    prod_sys = self._multiply_mutable_states(
-        other, prod_graph, prod_sys)
-    return prod_sys
+    if prod_sys is None and _are_fts(self, other):
+        prod_sys = _fts_prod_sys(self, other, sync=True)
+    return _product(self, other, prod_sys, True)
 
 
 def cartesian_product(self, other, prod_sys=None):
@@ -195,40 +292,41 @@ def cartesian_product(self, other, prod_sys=None):
     would accurately model the existence of multiple cores,
     not just multiple processes executing on a single core.
 
+    Only the states reachable from the initial states are added,
+    see L{_product} for the labeling.  If C{prod_sys is None} and
+    both factors are L{FiniteTransitionSystem}, then the product
+    is a L{FiniteTransitionSystem}, see L{_fts_prod_sys}.
+
     References
     ==========
       - U{http://en.wikipedia.org/wiki/Cartesian_product_of_graphs}
       - networkx.algorithms.operators.product.cartesian_product
     """
-    prod_graph = nx.product.cartesian_product(self, other)
-    # not populating ?
-    if prod_sys is None:
-        if self.states.mutants or other.states.mutants:
-            mutable = True
-        else:
-            mutable = False
-        prod_sys = LabeledDiGraph(mutable=mutable)
-    prod_sys = self._multiply_mutable_states(
-        other, prod_graph, prod_sys)
-    return prod_sys
+    if prod_sys is None and _are_fts(self, other):
+        prod_sys = _fts_prod_sys(self, other, sync=False)
+    return _product(self, other, prod_sys, False)
+
+
+def _are_fts(g1, g2):
+    return (isinstance(g1, FiniteTransitionSystem) and
+            isinstance(g2, FiniteTransitionSystem))
 
 
 def ts_sync_prod(ts1, ts2):
     """Synchronous (tensor) product with other FTS.
 
+    The actions of the product are pairs of actions of C{ts1}
+    and C{ts2}, with C{None} for an edge without action.
+
     @type ts1, ts2: L{FiniteTransitionSystem}
+
+    @rtype: L{FiniteTransitionSystem}
     """
-    prod_ts = FiniteTransitionSystem()
-    # union of AP sets
-    prod_ts.atomic_propositions |= \
-        ts1.atomic_propositions | ts2.atomic_propositions
-    # use more label sets, instead of this explicit approach
-    #
-    # for synchronous product: Cartesian product of action sets
-    # prod_ts.actions |= ts1.actions * ts2.actions
-    prod_ts = super(FiniteTransitionSystem, self).tensor_product(
-        ts, prod_sys=prod_ts)
-    return prod_ts
+    if not isinstance(ts1, FiniteTransitionSystem):
+        raise TypeError('ts1 must be a FiniteTransitionSystem.')
+    if not isinstance(ts2, FiniteTransitionSystem):
+        raise TypeError('ts2 must be a FiniteTransitionSystem.')
+    return tensor_product(ts1, ts2)
 
 
 def sync_prod(ts, ba):
@@ -377,16 +475,4 @@ def async_prod(self, ts):
     """
     if not isinstance(ts, FiniteTransitionSystem):
         raise TypeError('ts must be a FiniteTransitionSystem.')
-    if self.states.mutants or ts.states.mutants:
-        mutable = True
-    else:
-        mutable = False
-    # union of AP sets
-    prod_ts = FiniteTransitionSystem(mutable=mutable)
-    prod_ts.atomic_propositions |= \
-        self.atomic_propositions | ts.atomic_propositions
-    # for parallel product: union of action sets
-    prod_ts.actions |= self.actions | ts.actions
-    prod_ts = super(FiniteTransitionSystem, self).cartesian_product(
-        ts, prod_sys=prod_ts)
-    return prod_ts
+    return cartesian_product(self, ts)
@@ -0,0 +1,645 @@
+# Copyright by California Institute of Technology
+# All rights reserved. See LICENSE file at:
+# https://github.com/tulip-control/tulip-control
+"""Finite transition systems stored in arrays.
+
+A L{CompactFTS} numbers states from 0, and stores:
+
+  - successors and predecessors in compressed sparse row (CSR) form,
+    as C{numpy} arrays of state numbers
+
+  - each distinct label value once, in a table per label type
+    (C{'ap'} for states, and each action type for edges)
+
+  - the label of each state and edge as an array of indices
+    into these tables (C{-1} if the edge has no value of that type)
+
+This takes a few bytes per edge, instead of the nested C{dict}s
+and L{TypedDict} per edge of a L{FiniteTransitionSystem}.
+The system is not changed after construction.
+It offers the methods that read an L{FTS}, as used by
+L{synth.sys_to_spec}, L{products.ts_ba_sync_prod}, and
+L{transys.simu_abstract}, and converts to and from an L{FTS}.
+"""
+from __future__ import absolute_import
+import logging
+
+import numpy as np
+
+from tulip.transys.labeled_graphs import _as_list, _index_key, _UNINDEXABLE
+from tulip.transys.mathset import MathSet, SubSet
+from tulip.transys.transys import FTS
+
+
+logger = logging.getLogger(__name__)
+
+
+class CompactFTS(object):
+    """Finite transition system with integer states and array storage.
+
+    State C{states[i]} has number C{i}. Edge C{j} is from
+    C{from_states[j]} to C{to_states[j]}, labeled with
+    C{labels[k][j]} for each action type C{k}.
+
+    Example
+    =======
+    >>> ts = CompactFTS(
+            ['a', 'b', 'c'], ['a', 'b', 'c'], ['b', 'c', 'a'],
+            labels={'sys_actions': ['go', 'go', None]},
+            ap=[{'p'}, set(), {'p'}], initial=['a'])
+    >>> ts.states.post('a')
+    {'b'}
+    >>> ts.transitions.find(['a'])
+    [('a', 'b', {'sys_actions': 'go'})]
+
+    Use L{from_fts} and L{to_fts} to convert from and to an L{FTS}.
+
+    @param states: distinct states, hashable
+    @type states: sequence
+    @param from_states: edge sources, existing states
+    @type from_states: sequence, for example C{list} or C{numpy} array
+    @param to_states: edge targets, as many as C{from_states}
+    @param labels: maps each action type to a sequence with
+        one value for each edge, C{None} if the edge has no value
+        of that type. Action types with C{'env'} in their name
+        are environment actions, the rest system actions.
+    @type labels: C{dict}
+    @param ap: set of atomic propositions for each state
+    @type ap: sequence of C{set}
+    @param initial: initial states
+    """
+
+    def __init__(self, states, from_states=(), to_states=(),
+                 labels=None, ap=None, initial=None):
+        self.name = ''
+        self._owner = 'sys'
+        self.env_actions_must = 'xor'
+        self.sys_actions_must = 'xor'
+        self._names = _as_list(states)
+        n = len(self._names)
+        if all(type(x) is int and x == i
+               for i, x in enumerate(self._names)):
+            # states are 0, ..., n - 1, so they are their numbers
+            self._ids = None
+        else:
+            self._ids = {x: i for i, x in enumerate(self._names)}
+            if len(self._ids) != n:
+                raise ValueError('states are not distinct')
+        us = self._array_of_ids(from_states)
+        vs = self._array_of_ids(to_states)
+        if labels is None:
+            labels = dict()
+        columns = {k: _as_list(x) for k, x in labels.items()}
+        m = len(us)
+        if len(vs) != m or any(len(x) != m for x in columns.values()):
+            raise ValueError(
+                'got {n} edge sources, {m} edge targets, and '
+                'label arrays of lengths: {k}'.format(
+                    n=m, m=len(vs),
+                    k={k: len(x) for k, x in columns.items()}))
+        # number edges by source, keeping their given order
+        order = np.argsort(us, kind='mergesort')
+        self._succ_ptr = _pointers(us, n)
+        self._succ = _narrow(vs[order], n)
+        self._pred_ptr = _pointers(vs, n)
+        self._pred_edge = _narrow(
+            np.argsort(vs[order], kind='mergesort'), m)
+        self._pred = self._source_of(self._pred_edge)
+        # label tables
+        self._ap = _Table()
+        if ap is None:
+            ap = [set()] * n
+        ap = [set() if x is None else x for x in ap]
+        if len(ap) != n:
+            raise ValueError(
+                'got {m} state labels for {n} states'.format(
+                    m=len(ap), n=n))
+        self._ap_index = self._ap.intern_all(ap)
+        self._tables = dict()
+        self._edge_index = dict()
+        for k, x in sorted(columns.items()):
+            table = _Table()
+            index = table.intern_all(x)
+            self._tables[k] = table
+            self._edge_index[k] = index[order]
+        # interfaces similar to `FTS`
+        self.atomic_propositions = MathSet()
+        for x in self._ap.values:
+            self.atomic_propositions.add_from(x)
+        self.aps = self.atomic_propositions
+        self.actions = dict(env_actions=MathSet(), sys_actions=MathSet())
+        for k, table in self._tables.items():
+            self.actions.setdefault(k, MathSet()).add_from(table.values)
+        self.states = CompactStates(self)
+        self.transitions = CompactTransitions(self)
+        if initial is not None:
+            self.states.initial |= initial
+
+    @classmethod
+    def from_fts(cls, fts):
+        """Return L{CompactFTS} with the states and edges of C{fts}.
+
+        Labels of types other than C{'ap'} and the action types
+        of C{fts} are omitted.
+
+        @type fts: L{FiniteTransitionSystem}
+        @rtype: L{CompactFTS}
+        """
+        states = list(fts.nodes_iter())
+        ap = [fts.node[u].get('ap', set()) for u in states]
+        us = list()
+        vs = list()
+        columns = {k: list() for k in fts.actions}
+        for u, v, d in fts.edges_iter(data=True):
+            us.append(u)
+            vs.append(v)
+            for k, x in columns.items():
+                x.append(d.get(k))
+        ts = cls(states, us, vs, labels=columns, ap=ap,
+                 initial=fts.states.initial)
+        ts.name = fts.name
+        ts.owner = fts.owner
+        ts.env_actions_must = fts.env_actions_must
+        ts.sys_actions_must = fts.sys_actions_must
+        # copy the sets of `fts`, so that they are iterated in
+        # the same order, as are the variables of `synth.sys_to_spec`
+        aps = MathSet(fts.atomic_propositions)
+        aps.add_from(ts.atomic_propositions)
+        ts.atomic_propositions = aps
+        ts.aps = aps
+        actions = {k: MathSet(v) for k, v in fts.actions.items()}
+        for k, v in actions.items():
+            v.add_from(ts.actions[k])
+        ts.actions = actions
+        return ts
+
+    def to_fts(self):
+        """Return L{FTS} with the same states, edges, and labels.
+
+        @rtype: L{FTS}
+        """
+        env_actions = list()
+        sys_actions = list()
+        for k, codomain in sorted(self.actions.items()):
+            d = dict(name=k, values=MathSet(codomain), setter=True)
+            if 'env' in k:
+                env_actions.append(d)
+            else:
+                sys_actions.append(d)
+        fts = FTS(env_actions, sys_actions)
+        fts.name = self.name
+        fts.owner = self.owner
+        fts.env_actions_must = self.env_actions_must
+        fts.sys_actions_must = self.sys_actions_must
+        fts.atomic_propositions.add_from(self.atomic_propositions)
+        names = self._names
+        fts.states.add_from(names)
+        for u, i in zip(names, self._ap_index.tolist()):
+            fts.node[u]['ap'] = _copy(self._ap.values[i])
+        fts.states.initial |= self.states.initial
+        # add edges grouped by which action types label them
+        types = sorted(self._tables)
+        # code each pattern of present types as the bits of an integer
+        code = np.zeros(len(self._succ), dtype=np.int64)
+        for i, k in enumerate(types):
+            code |= (self._edge_index[k] >= 0).astype(np.int64) << i
+        codes, group = np.unique(code, return_inverse=True)
+        patterns = [[(c >> i) & 1 for i in range(len(types))]
+                    for c in codes.tolist()]
+        sources = self._source_of(np.arange(len(self._succ)))
+        for g, pattern in enumerate(patterns):
+            edges = np.flatnonzero(group == g)
+            labels = {
+                k: self._tables[k].lookup_all(self._edge_index[k][edges])
+                for k, p in zip(types, pattern) if p}
+            fts.transitions.add_from_arrays(
+                [names[i] for i in sources[edges].tolist()],
+                [names[i] for i in self._succ[edges].tolist()],
+                labels=labels)
+        return fts
+
+    def __str__(self):
+        return (
+            'Compact Finite Transition System: ' + self.name +
+            '\n{n} states, {m} transitions, {b} bytes of arrays'.format(
+                n=len(self), m=len(self.transitions), b=self.nbytes))
+
+    def __len__(self):
+        """Number of states."""
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __contains__(self, state):
+        return self._id(state) is not None
+
+    @property
+    def owner(self):
+        return self._owner
+
+    @owner.setter
+    def owner(self, x):
+        if x not in {'env', 'sys'}:
+            raise ValueError("The owner can be either 'sys' or 'env'.")
+        self._owner = x
+
+    @property
+    def env_actions(self):
+        """Values of environment actions of type C{'env_actions'}."""
+        return self._action_type('env_actions')
+
+    @property
+    def sys_actions(self):
+        """Values of system actions of type C{'sys_actions'}."""
+        return self._action_type('sys_actions')
+
+    @property
+    def node(self):
+        """Labels of states, as in C{networkx} graphs.
+
+        C{ts.node[u]} is the same as C{ts.states[u]}.
+        """
+        return self.states
+
+    @property
+    def nbytes(self):
+        """Number of bytes used by the arrays."""
+        arrays = [self._succ_ptr, self._succ, self._pred_ptr,
+                  self._pred, self._pred_edge, self._ap_index]
+        arrays.extend(self._edge_index.values())
+        return sum(x.nbytes for x in arrays)
+
+    def successors(self, state):
+        """Return C{list} of successors of C{state}."""
+        i = self._existing_id(state)
+        a, b = self._succ_ptr[i], self._succ_ptr[i + 1]
+        return self._names_of(np.unique(self._succ[a:b]))
+
+    def predecessors(self, state):
+        """Return C{list} of predecessors of C{state}."""
+        i = self._existing_id(state)
+        a, b = self._pred_ptr[i], self._pred_ptr[i + 1]
+        return self._names_of(np.unique(self._pred[a:b]))
+
+    def save(self, *arg, **kw):
+        """Convert to L{FTS} and save, see L{LabeledDiGraph.save}."""
+        return self.to_fts().save(*arg, **kw)
+
+    def plot(self, *arg, **kw):
+        """Convert to L{FTS} and plot, see L{LabeledDiGraph.plot}."""
+        return self.to_fts().plot(*arg, **kw)
+
+    def _action_type(self, k):
+        try:
+            return self.actions[k]
+        except KeyError:
+            raise AttributeError('no action type: ' + str(k))
+
+    def _id(self, state):
+        """Return number of C{state}, or C{None}."""
+        if self._ids is not None:
+            try:
+                return self._ids.get(state)
+            except TypeError:
+                return None
+        if ((type(state) is int or isinstance(state, np.integer)) and
+                0 <= state < len(self._names)):
+            return int(state)
+        return None
+
+    def _existing_id(self, state):
+        i = self._id(state)
+        if i is None:
+            raise ValueError('no state: ' + str(state))
+        return i
+
+    def _array_of_ids(self, states):
+        """Return C{numpy} array of numbers of existing C{states}."""
+        if self._ids is None and isinstance(states, np.ndarray):
+            x = states.astype(np.int64)
+            n = len(self._names)
+            if len(x) and (x.min() < 0 or x.max() >= n or
+                           not np.array_equal(x, states)):
+                raise ValueError('states must be in range({n})'.format(n=n))
+            return x
+        states = _as_list(states)
+        x = np.fromiter(
+            (-1 if i is None else i for i in map(self._id, states)),
+            dtype=np.int64, count=len(states))
+        if len(x) and x.min() < 0:
+            u = next(u for u, i in zip(states, x) if i < 0)
+            raise ValueError('no state: ' + str(u))
+        return x
+
+    def _ids_of(self, states):
+        """Return numbers of existing states among C{states}."""
+        ids = (self._id(u) for u in states)
+        return sorted({i for i in ids if i is not None})
+
+    def _names_of(self, ids):
+        names = self._names
+        return [names[i] for i in _as_list(ids)]
+
+    def _source_of(self, edges):
+        """Return array of the source of each edge in C{edges}."""
+        return _narrow(
+            np.searchsorted(self._succ_ptr, edges, side='right') - 1,
+            len(self._names))
+
+
+class CompactStates(object):
+    """States of a L{CompactFTS}, with the read methods of L{States}."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.initial = []
+
+    def __getitem__(self, state):
+        """Return label of C{state}, as C{dict}."""
+        g = self.graph
+        i = g._existing_id(state)
+        return dict(ap=_copy(g._ap.values[g._ap_index[i]]))
+
+    def __call__(self, data=False):
+        """Return C{list} of states, or of C{(state, label)} if C{data}."""
+        if not data:
+            return list(self.graph._names)
+        return self._labeled(range(len(self.graph)))
+
+    def __str__(self):
+        return 'States:\n' + str(self())
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __iter__(self):
+        return iter(self.graph)
+
+    def __contains__(self, state):
+        return state in self.graph
+
+    @property
+    def initial(self):
+        """Return L{SubSet} of initial states."""
+        return self._initial
+
+    @initial.setter
+    def initial(self, states):
+        s = SubSet(self)
+        s |= states
+        self._initial = s
+
+    def post(self, states=None):
+        """Return C{set} of successors of C{states}.
+
+        See L{States.post}.
+        """
+        if states is None:
+            return set(self.initial)
+        return self._adjacent(states, self.graph._succ_ptr,
+                              self.graph._succ)
+
+    def pre(self, states):
+        """Return C{set} of predecessors of C{states}.
+
+        See L{States.pre}.
+        """
+        return self._adjacent(states, self.graph._pred_ptr,
+                              self.graph._pred)
+
+    def is_terminal(self, state):
+        """Return C{True} if C{state} has no successors."""
+        g = self.graph
+        i = g._existing_id(state)
+        return bool(g._succ_ptr[i] == g._succ_ptr[i + 1])
+
+    def find(self, states=None, with_attr_dict=None, **with_attr):
+        """Filter by desired states and by desired state labels.
+
+        See L{States.find}.
+
+        @rtype: C{list} of C{(state, label)}
+        """
+        if with_attr_dict is None:
+            with_attr_dict = with_attr
+        else:
+            try:
+                with_attr_dict.update(with_attr)
+            except AttributeError:
+                raise Exception('with_attr_dict must be a dict')
+        g = self.graph
+        if states is None:
+            ids = np.arange(len(g))
+        else:
+            if states in self:
+                states = [states]
+            ids = list()
+            seen = set()
+            for u in states:
+                i = g._id(u)
+                if i is not None and i not in seen:
+                    seen.add(i)
+                    ids.append(i)
+            ids = np.array(ids, dtype=np.int64)
+        if with_attr_dict:
+            if set(with_attr_dict) != {'ap'}:
+                return list()
+            k = g._ap.lookup(with_attr_dict['ap'])
+            if k is None:
+                return list()
+            ids = ids[g._ap_index[ids] == k]
+        return self._labeled(ids)
+
+    def _labeled(self, ids):
+        g = self.graph
+        names = g._names
+        values = g._ap.values
+        index = g._ap_index
+        return [(names[i], dict(ap=_copy(values[index[i]])))
+                for i in _as_list(ids)]
+
+    def _adjacent(self, states, ptr, adj):
+        """Return C{set} of states adjacent to C{states}."""
+        g = self.graph
+        names = g._names
+        if states in self:
+            states = [states]
+        r = set()
+        for u in states:
+            i = g._existing_id(u)
+            r.update(names[j] for j in adj[ptr[i]:ptr[i + 1]].tolist())
+        return r
+
+
+class CompactTransitions(object):
+    """Edges of a L{CompactFTS}, with the read methods of L{Transitions}."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __call__(self, data=False):
+        """Return C{list} of edges, labeled if C{data}."""
+        g = self.graph
+        edges = np.arange(len(g._succ))
+        if data:
+            return self._labeled(edges)
+        return list(zip(g._names_of(g._source_of(edges)),
+                        g._names_of(g._succ)))
+
+    def __str__(self):
+        return 'Transitions:\n' + str(self())
+
+    def __len__(self):
+        return len(self.graph._succ)
+
+    def find(self, from_states=None, to_states=None,
+             with_attr_dict=None, typed_only=False, **with_attr):
+        """Find all edges between given states with given labels.
+
+        See L{Transitions.find}.
+
+        @rtype: C{list} of C{(from_state, to_state, label)}
+        """
+        if with_attr_dict is None:
+            with_attr_dict = with_attr
+        try:
+            with_attr_dict.update(with_attr)
+        except:
+            raise TypeError('with_attr_dict must be a dict')
+        g = self.graph
+        ptr = g._succ_ptr
+        if from_states is None:
+            edges = np.arange(len(g._succ))
+        else:
+            ids = g._ids_of(from_states)
+            if not ids:
+                return list()
+            edges = np.concatenate(
+                [np.arange(ptr[i], ptr[i + 1]) for i in ids])
+        if to_states is not None:
+            targets = g._ids_of(to_states)
+            edges = edges[np.in1d(g._succ[edges], targets)]
+        if with_attr_dict:
+            edges = edges[self._matches(edges, with_attr_dict)]
+        return self._labeled(edges)
+
+    def _matches(self, edges, desired):
+        """Return mask of C{edges} labeled with C{desired}.
+
+        As in L{Transitions.find}, unlabeled edges match any label.
+        """
+        g = self.graph
+        unlabeled = np.ones(len(edges), dtype=bool)
+        for index in g._edge_index.values():
+            unlabeled &= index[edges] < 0
+        if not set(desired).issubset(g._tables):
+            return unlabeled
+        labeled = np.ones(len(edges), dtype=bool)
+        for k, index in g._edge_index.items():
+            if k in desired:
+                x = g._tables[k].lookup(desired[k])
+                if x is None:
+                    return unlabeled
+            else:
+                # the label has no other types
+                x = -1
+            labeled &= index[edges] == x
+        return labeled | unlabeled
+
+    def _labeled(self, edges):
+        g = self.graph
+        edges = _as_list(edges)
+        sources = g._names_of(g._source_of(edges))
+        targets = g._names_of(g._succ[edges])
+        columns = [(k, g._tables[k].values, g._edge_index[k][edges].tolist())
+                   for k in g._edge_index]
+        r = list()
+        for j, (u, v) in enumerate(zip(sources, targets)):
+            d = dict()
+            for k, values, index in columns:
+                i = index[j]
+                if i >= 0:
+                    d[k] = _copy(values[i])
+            r.append((u, v, d))
+        return r
+
+
+class _Table(object):
+    """Distinct label values, numbered from 0."""
+
+    def __init__(self):
+        self.values = list()
+        self._ids = dict()
+
+    def intern(self, x):
+        """Return number of value C{x}, adding it if new.
+
+        A C{set} is stored as C{frozenset}, so that it is not changed.
+        """
+        key = _index_key(x)
+        if key is _UNINDEXABLE:
+            i = self._find(x)
+            if i is not None:
+                return i
+        elif key in self._ids:
+            return self._ids[key]
+        i = len(self.values)
+        if isinstance(x, set):
+            x = frozenset(x)
+        self.values.append(x)
+        if key is not _UNINDEXABLE:
+            self._ids[key] = i
+        return i
+
+    def intern_all(self, xs):
+        """Return array of numbers of C{xs}, C{-1} for C{None}."""
+        index = np.fromiter(
+            (-1 if x is None else self.intern(x) for x in xs),
+            dtype=np.int64, count=len(xs))
+        return _narrow(index, len(self.values))
+
+    def lookup(self, x):
+        """Return number of value C{x}, or C{None}."""
+        key = _index_key(x)
+        if key is _UNINDEXABLE:
+            return self._find(x)
+        return self._ids.get(key)
+
+    def lookup_all(self, index):
+        """Return C{list} of the values numbered by C{index}."""
+        values = self.values
+        return [_copy(values[i]) for i in index.tolist()]
+
+    def _find(self, x):
+        for i, y in enumerate(self.values):
+            if x == y:
+                return i
+        return None
+
+
+def _copy(x):
+    """Return label value C{x}, as C{set} if it is a C{frozenset}."""
+    if isinstance(x, frozenset):
+        return set(x)
+    return x
+
+
+def _index_dtype(n):
+    """Return smallest signed integer type for C{-1, ..., n}."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _narrow(x, n):
+    """Return C{x} as array of the smallest type for C{-1, ..., n}."""
+    return np.asarray(x).astype(_index_dtype(n))
+
+
+def _pointers(ids, n):
+    """Return CSR pointers for C{n} rows, with entries in rows C{ids}."""
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=n), out=ptr[1:])
+    return _narrow(ptr, len(ids))
@@ -36,6 +36,7 @@ from __future__ import print_function
 import logging
 import os
 import copy
+import gc
 from pprint import pformat
 from collections import Iterable
 import warnings
@@ -49,6 +50,8 @@ from tulip.transys.mathset import SubSet, TypedDict
 
 
 logger = logging.getLogger(__name__)
+# label values that need not be copied
+_IMMUTABLE = (str, int, float, frozenset, type(None))
 
 
 def label_is_desired(attr_dict, desired_dict):
@@ -67,12 +70,15 @@ def label_is_desired(attr_dict, desired_dict):
         return False
     # any labels have symbolic semantics ?
     label_def = attr_dict.allowed_values
+    debug = logger.isEnabledFor(logging.DEBUG)
     for type_name, value in attr_dict.items():
-        logger.debug('Checking label type:\n\t' + str(type_name))
+        if debug:
+            logger.debug('Checking label type:\n\t' + str(type_name))
         type_def = label_def[type_name]
         desired_value = desired_dict[type_name]
         if hasattr(type_def, '__call__'):
-            logger.debug('Found label semantics:\n\t' + str(type_def))
+            if debug:
+                logger.debug('Found label semantics:\n\t' + str(type_def))
             # value = guard
             if not type_def(value, desired_value):
                 return False
@@ -87,8 +93,9 @@ def label_is_desired(attr_dict, desired_dict):
 
 
 def test_common_bug(value, desired_value):
-    logger.debug('Label value:\n\t' + str(value))
-    logger.debug('Desired value:\n\t' + str(desired_value))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Label value:\n\t' + str(value))
+        logger.debug('Desired value:\n\t' + str(desired_value))
     if (
         isinstance(value, (set, list)) and
         isinstance(desired_value, (set, list)) and
@@ -173,7 +180,8 @@ class States(object):
         which wraps C{networkx.MultiDiGraph.add_node}.
         """
         self._warn_if_state_exists(new_state)
-        logger.debug('Adding new id: ' + str(new_state))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Adding new id: ' + str(new_state))
         self.graph.add_node(new_state, attr_dict, check, **attr)
 
     def add_from(self, new_states, check=True, **attr):
@@ -343,41 +351,73 @@ class States(object):
             # singleton check
             if states in self:
                 state = states
-                msg = (
-                    'LabeledStates.find got single state: ' +
-                    str(state) + '\n'
-                    'instead of Iterable of states.\n')
                 states = [state]
-                msg += 'Replaced given states = ' + str(state)
-                msg += ' with states = ' + str(states)
-                logger.debug(msg)
+                if logger.isEnabledFor(logging.DEBUG):
+                    msg = (
+                        'LabeledStates.find got single state: ' +
+                        str(state) + '\n'
+                        'instead of Iterable of states.\n')
+                    msg += 'Replaced given states = ' + str(state)
+                    msg += ' with states = ' + str(states)
+                    logger.debug(msg)
         found_state_label_pairs = []
-        for state, attr_dict in self.graph.nodes_iter(data=True):
-            logger.debug('Checking state_id = ' + str(state) +
-                         ', with attr_dict = ' + str(attr_dict))
-            if states is not None:
-                if state not in states:
-                    logger.debug('state_id = ' + str(state) + ', not desired.')
-                    continue
-            msg = (
-                'Checking state label:\n\t attr_dict = ' +
-                str(attr_dict) +
-                '\n vs:\n\t desired_label = ' + str(with_attr_dict))
-            logger.debug(msg)
+        if states is not None:
+            # look up the given states, instead of all
+            nodes = self.graph.node
+            candidates = list()
+            seen = set()
+            for state in states:
+                if state in nodes and state not in seen:
+                    seen.add(state)
+                    candidates.append((state, nodes[state]))
+        else:
+            candidates = self._indexed(with_attr_dict)
+        if candidates is None:
+            candidates = self.graph.nodes_iter(data=True)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for state, attr_dict in candidates:
+            if debug:
+                logger.debug('Checking state_id = ' + str(state) +
+                             ', with attr_dict = ' + str(attr_dict))
+                msg = (
+                    'Checking state label:\n\t attr_dict = ' +
+                    str(attr_dict) +
+                    '\n vs:\n\t desired_label = ' + str(with_attr_dict))
+                logger.debug(msg)
             if not with_attr_dict:
-                logger.debug('Any label acceptable.')
+                if debug:
+                    logger.debug('Any label acceptable.')
                 ok = True
             else:
                 ok = label_is_desired(attr_dict, with_attr_dict)
             if ok:
-                logger.debug('Label Matched:\n\t' + str(attr_dict) +
-                             ' == ' + str(with_attr_dict))
+                if debug:
+                    logger.debug('Label Matched:\n\t' + str(attr_dict) +
+                                 ' == ' + str(with_attr_dict))
                 state_label_pair = (state, dict(attr_dict))
                 found_state_label_pairs.append(state_label_pair)
-            else:
+            elif debug:
                 logger.debug('No match for label---> state discarded.')
         return found_state_label_pairs
 
+    def _indexed(self, with_attr_dict):
+        """Return states that may have the label C{with_attr_dict}.
+
+        Return C{None} if the labels are not indexed,
+        or C{with_attr_dict} has no indexable values
+        (see L{LabeledDiGraph.index_labels}).
+
+        @rtype: C{list} of C{(state, label)}
+        """
+        index = self.graph._label_index
+        if index is None or not with_attr_dict:
+            return None
+        k = index.indexable_key(with_attr_dict, self.graph._node_label_types)
+        if k is None:
+            return None
+        nodes = self.graph.node
+        return [(n, nodes[n]) for n in index.find_nodes(k, with_attr_dict[k])]
+
     def is_terminal(self, state):
         """Return True if state has no outgoing transitions.
 
@@ -453,6 +493,12 @@ class Transitions(object):
         self.graph.add_edges_from(transitions, attr_dict=attr_dict,
                                   check=check, **attr)
 
+    def add_from_arrays(self, from_states, to_states, labels=None,
+                        check=True, **attr):
+        """Wrapper of L{LabeledDiGraph.add_edges_from_arrays}."""
+        self.graph.add_edges_from_arrays(from_states, to_states, labels,
+                                         check=check, **attr)
+
     def add_comb(self, from_states, to_states, attr_dict=None,
                  check=True, **attr):
         """Add an edge for each combination C{(u, v)},
@@ -598,26 +644,56 @@ class Transitions(object):
         except:
             raise TypeError('with_attr_dict must be a dict')
         found_transitions = []
-        u_v_edges = self.graph.edges_iter(nbunch=from_states, data=True)
+        u_v_edges = self._indexed(from_states, with_attr_dict)
+        if u_v_edges is None:
+            u_v_edges = self.graph.edges_iter(nbunch=from_states, data=True)
         if to_states is not None:
             u_v_edges = [(u, v, d)
                          for u, v, d in u_v_edges
                          if v in to_states]
+        debug = logger.isEnabledFor(logging.DEBUG)
         for u, v, attr_dict in u_v_edges:
             ok = True
             if not with_attr_dict:
-                logger.debug('Any label is allowed.')
+                if debug:
+                    logger.debug('Any label is allowed.')
             elif not attr_dict:
-                logger.debug('No labels defined.')
+                if debug:
+                    logger.debug('No labels defined.')
             else:
-                logger.debug('Checking guard.')
+                if debug:
+                    logger.debug('Checking guard.')
                 ok = label_is_desired(attr_dict, with_attr_dict)
             if ok:
-                logger.debug('Transition label matched desired label.')
+                if debug:
+                    logger.debug('Transition label matched desired label.')
                 transition = (u, v, dict(attr_dict))
                 found_transitions.append(transition)
         return found_transitions
 
+    def _indexed(self, from_states, with_attr_dict):
+        """Return edges that may have the label C{with_attr_dict}.
+
+        These are the edges from C{from_states} with an indexed value
+        in C{with_attr_dict}, and the unlabeled edges.
+        Return C{None} if the labels are not indexed, C{from_states}
+        is C{None}, or C{with_attr_dict} has no indexable values
+        (see L{LabeledDiGraph.index_labels}).
+
+        @rtype: C{list} of C{(u, v, label)}
+        """
+        index = self.graph._label_index
+        if index is None or from_states is None or not with_attr_dict:
+            return None
+        k = index.indexable_key(with_attr_dict, self.graph._edge_label_types)
+        if k is None:
+            return None
+        x = with_attr_dict[k]
+        edges = list()
+        for u in self.graph.nbunch_iter(from_states):
+            edges.extend(index.find_edges(u, k, x))
+        return edges
+
 
 class LabeledDiGraph(nx.MultiDiGraph):
     """Directed multi-graph with constrained labeling.
@@ -773,6 +849,8 @@ class LabeledDiGraph(nx.MultiDiGraph):
     Some code in overridden methods of C{networkx.MultiDiGraph}
     is adapted from C{networkx}, which is distributed under a BSD license.
     """
+    # see `index_labels`
+    _label_index = None
 
     def __init__(
             self,
@@ -833,14 +911,36 @@ class LabeledDiGraph(nx.MultiDiGraph):
             setattr(self, name, setter)
         return labeling, defaults
 
+    def index_labels(self):
+        """Index nodes and edges by their labels.
+
+        Then L{States.find} and L{Transitions.find} with C{with_attr_dict}
+        (and C{from_states}, for transitions) look up the nodes and edges
+        with one of the desired label values in a C{dict},
+        instead of checking the label of each node or edge.
+
+        The index is updated when nodes and edges are added,
+        and when labels are assigned, for example
+        C{g.node[n]['ap'] = {'p'}}. Values are not tracked
+        when changed in place, for example C{g.node[n]['ap'].add('p')}.
+        Removed nodes and edges are dropped from the index
+        when a lookup reaches them.
+
+        Calling this method again has no effect.
+        """
+        if self._label_index is None:
+            self._label_index = _LabelIndex(self)
+
     def _check_for_untyped_keys(self, typed_attr, type_defs, check):
         untyped_keys = set(typed_attr).difference(type_defs)
-        msg = (
-            'checking for untyped keys...\n' +
-            'attribute dict: ' + str(typed_attr) + '\n' +
-            'type definitions: ' + str(type_defs) + '\n' +
-            'untyped_keys: ' + str(untyped_keys))
-        logger.debug(msg)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            msg = (
+                'checking for untyped keys...\n' +
+                'attribute dict: ' + str(typed_attr) + '\n' +
+                'type definitions: ' + str(type_defs) + '\n' +
+                'untyped_keys: ' + str(untyped_keys))
+            logger.debug(msg)
         if untyped_keys:
             msg = (
                 'The following edge attributes:\n' +
@@ -855,7 +955,7 @@ class LabeledDiGraph(nx.MultiDiGraph):
             else:
                 msg += '\nAllowed because you passed: check = True'
                 logger.warning(msg)
-        else:
+        elif debug:
             logger.debug('no untyped keys.')
 
     def is_consistent(self):
@@ -897,8 +997,9 @@ class LabeledDiGraph(nx.MultiDiGraph):
         @param check: if True and untyped keys are passed,
             then raise C{AttributeError}.
         """
+        debug = logger.isEnabledFor(logging.DEBUG)
         # avoid multiple additions
-        if n in self:
+        if debug and n in self:
             logger.debug('Graph already has node: ' + str(n))
         attr_dict = self._update_attr_dict_with_attr(attr_dict, attr)
         # define typed dict
@@ -907,11 +1008,15 @@ class LabeledDiGraph(nx.MultiDiGraph):
         typed_attr.update(copy.deepcopy(self._node_label_defaults))
         # type checking happens here
         typed_attr.update(attr_dict)
-        logger.debug('node typed_attr: ' + str(typed_attr))
+        if debug:
+            logger.debug('node typed_attr: ' + str(typed_attr))
         self._check_for_untyped_keys(typed_attr,
                                      self._node_label_types,
                                      check)
+        new = n not in self.succ
         nx.MultiDiGraph.add_node(self, n, attr_dict=typed_attr)
+        if new and self._label_index is not None:
+            self._label_index.add_node(n, typed_attr)
 
     def add_nodes_from(self, nodes, check=True, **attr):
         """Create or label multiple nodes.
@@ -980,8 +1085,10 @@ class LabeledDiGraph(nx.MultiDiGraph):
         typed_attr.update(copy.deepcopy(self._edge_label_defaults))
         # type checking happens here
         typed_attr.update(attr_dict)
-        logger.debug('Given: attr_dict = ' + str(attr_dict))
-        logger.debug('Stored in: typed_attr = ' + str(typed_attr))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug('Given: attr_dict = ' + str(attr_dict))
+            logger.debug('Stored in: typed_attr = ' + str(typed_attr))
         # may be possible to speedup using .succ
         existing_u_v = self.get_edge_data(u, v, default={})
         if dict() in existing_u_v.values():
@@ -1007,27 +1114,33 @@ class LabeledDiGraph(nx.MultiDiGraph):
                                      self._edge_label_types,
                                      check)
         # the only change from nx in this clause is using TypedDict
-        logger.debug('adding edge: ' + str(u) + ' ---> ' + str(v))
+        if debug:
+            logger.debug('adding edge: ' + str(u) + ' ---> ' + str(v))
         if v in self.succ[u]:
-            msg = 'there already exist directed edges with ' +\
-                  'same end-points'
-            logger.debug(msg)
+            if debug:
+                logger.debug('there already exist directed edges with ' +
+                             'same end-points')
             keydict = self.adj[u][v]
             # find a unique integer key
             if key is None:
                 key = len(keydict)
                 while key in keydict:
                     key -= 1
+            new = key not in keydict
             datadict = keydict.get(key, typed_attr)
             datadict.update(typed_attr)
             keydict[key] = datadict
         else:
-            logger.debug('first directed edge between these nodes')
+            if debug:
+                logger.debug('first directed edge between these nodes')
             # selfloops work this way without special treatment
+            new = True
             key = 0
             keydict = {key: typed_attr}
             self.succ[u][v] = keydict
             self.pred[v][u] = keydict
+        if new and self._label_index is not None:
+            self._label_index.add_edge(u, v, key, typed_attr)
 
     def add_edges_from(self, labeled_ebunch, attr_dict=None,
                        check=True, **attr):
@@ -1067,6 +1180,168 @@ class LabeledDiGraph(nx.MultiDiGraph):
             datadict.update(dd)
             self.add_edge(u, v, key=key, attr_dict=datadict, check=check)
 
+    def add_edges_from_arrays(self, from_nodes, to_nodes, labels=None,
+                              check=True, **attr):
+        """Add many labeled edges, checking each label value once.
+
+        Edge C{i} is C{(from_nodes[i], to_nodes[i])},
+        labeled with C{attr} and C{labels[k][i]} for each C{k}.
+        The result is the same as calling L{add_edge} for each edge,
+        but faster for large graphs, because:
+
+          - each distinct label value is checked against
+            its label type once, instead of once per edge
+
+          - label defaults are copied only if mutable
+
+          - duplicate edges are detected with a C{set}
+            of labels per pair of nodes, if the labels are hashable
+
+        Example
+        =======
+        >>> ts = FTS()
+        >>> ts.states.add_from(range(3))
+        >>> ts.sys_actions.add_from({'a', 'b'})
+        >>> ts.add_edges_from_arrays(
+                [0, 1, 2], [1, 2, 0],
+                labels={'sys_actions': ['a', 'b', 'a']})
+
+        @param from_nodes: existing nodes
+        @type from_nodes: sequence, for example C{list} or C{numpy} array
+
+        @param to_nodes: existing nodes, as many as C{from_nodes}
+        @type to_nodes: sequence
+
+        @param labels: maps label types to sequences of values,
+            one value for each edge
+        @type labels: C{dict}
+
+        @param check: see L{add_edge}
+
+        @param attr: labels of all the edges
+        """
+        us = _as_list(from_nodes)
+        vs = _as_list(to_nodes)
+        if labels is None:
+            labels = dict()
+        columns = {k: _as_list(x) for k, x in labels.items()}
+        n = len(us)
+        if len(vs) != n or any(len(x) != n for x in columns.values()):
+            raise ValueError(
+                'got {n} edge sources, {m} edge targets, and '
+                'label arrays of lengths: {k}'.format(
+                    n=n, m=len(vs),
+                    k={k: len(x) for k, x in columns.items()}))
+        if not n:
+            return
+        # check nodes exist
+        for u in set(us).union(vs):
+            if u not in self.succ:
+                raise ValueError('Graph does not have node: ' + str(u))
+        # check labels, once per distinct value
+        types = self._edge_label_types
+        keys = set(attr).union(columns)
+        sample = {k: attr[k] if k in attr else columns[k][0] for k in keys}
+        self._check_for_untyped_keys(sample, types, check)
+        typed_attr = TypedDict()
+        typed_attr.set_types(types)
+        # type checking happens here
+        typed_attr.update(attr)
+        for k, x in columns.items():
+            if k not in types:
+                continue
+            try:
+                values = set(x)
+            except TypeError:
+                values = x
+            for y in values:
+                typed_attr[k] = y
+        defaults = {k: d for k, d in self._edge_label_defaults.items()
+                    if k not in keys}
+        mutable = [k for k, d in defaults.items()
+                   if not isinstance(d, _IMMUTABLE)]
+        common = dict(defaults)
+        common.update(attr)
+        columns = list(columns.items())
+        # the loop allocates many containers, and none in cycles,
+        # so pause the cyclic garbage collector, which would
+        # otherwise traverse the growing graph repeatedly
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._add_edges_from_columns(us, vs, columns, common,
+                                         defaults, mutable)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _add_edges_from_columns(self, us, vs, columns, common,
+                                defaults, mutable):
+        """Add edges with checked labels, see L{add_edges_from_arrays}."""
+        types = self._edge_label_types
+        # labels of edges between each pair of nodes,
+        # or `None` if some label is unhashable
+        pair_labels = dict()
+        succ = self.succ
+        pred = self.pred
+        new_typed_dict = TypedDict.__new__
+        update = dict.update
+        index = self._label_index
+        for i in range(len(us)):
+            u = us[i]
+            v = vs[i]
+            d = dict(common)
+            for k in mutable:
+                d[k] = copy.deepcopy(defaults[k])
+            for k, x in columns:
+                d[k] = x[i]
+            keydict = succ[u].get(v)
+            if keydict is not None:
+                if (u, v) not in pair_labels:
+                    pair_labels[(u, v)] = _label_set(keydict.values())
+                pair = pair_labels[(u, v)]
+                label = _label_key(d)
+                if pair is None or label is None:
+                    unlabeled = dict() in keydict.values()
+                    exists = d in keydict.values()
+                else:
+                    unlabeled = frozenset() in pair
+                    exists = label in pair
+                if unlabeled:
+                    raise Exception(
+                        'Unlabeled transition: '
+                        'from_state-> to_state already exists,\n'
+                        'where:\t from_state = ' + str(u) + '\n'
+                        'and:\t to_state = ' + str(v) + '\n')
+                if exists:
+                    logger.warning(
+                        'Same labeled transition already exists: '
+                        '{u} ---{d}---> {v}'.format(u=u, v=v, d=d))
+                    continue
+                if label is None:
+                    pair_labels[(u, v)] = None
+                elif pair is not None:
+                    pair.add(label)
+            # labels were checked by the caller,
+            # so bypass `TypedDict.__setitem__`
+            typed_attr = new_typed_dict(TypedDict)
+            update(typed_attr, d)
+            typed_attr.allowed_values = types
+            if keydict is None:
+                # selfloops work this way without special treatment
+                key = 0
+                keydict = {key: typed_attr}
+                succ[u][v] = keydict
+                pred[v][u] = keydict
+            else:
+                # find a unique integer key
+                key = len(keydict)
+                while key in keydict:
+                    key -= 1
+                keydict[key] = typed_attr
+            if index is not None:
+                index.add_edge(u, v, key, typed_attr)
+
     def remove_labeled_edge(self, u, v, attr_dict=None, **attr):
         """Remove single labeled edge.
 
@@ -1129,18 +1404,42 @@ class LabeledDiGraph(nx.MultiDiGraph):
                 return True
         return False
 
-    def remove_deadends(self):
-        """Recursively delete nodes with no outgoing transitions."""
+    def remove_deadends(self, quiet=False):
+        """Recursively delete nodes with no outgoing transitions.
+
+        A worklist of nodes without successors is initialized once.
+        The number of remaining successors of each node is decremented
+        when a successor is removed, so the time is linear in the
+        size of the graph.
+
+        @param quiet: if C{True}, then do not print
+            the number of removed nodes
+        @return: removed nodes
+        @rtype: C{set}
+        """
         n = len(self)
-        s = {1}
-        while s:
-            s = {n for n in self if not self.succ[n]}
-            self.states.remove_from(s)
+        succ = self.succ
+        pred = self.pred
+        n_succ = {u: len(succ[u]) for u in self}
+        todo = [u for u, k in n_succ.items() if not k]
+        removed = set(todo)
+        while todo:
+            v = todo.pop()
+            for u in pred[v]:
+                if u in removed:
+                    continue
+                n_succ[u] -= 1
+                if not n_succ[u]:
+                    removed.add(u)
+                    todo.append(u)
+        self.states.remove_from(removed)
         m = len(self)
         assert n == 0 or m > 0, 'removed all {n} nodes!'.format(n=n)
         assert n >= 0, 'added {n} nodes'.format(n=n)
-        print('removed {r} nodes from '
-              '{n} total'.format(r=n - m, n=n))
+        if not quiet:
+            print('removed {r} nodes from '
+                  '{n} total'.format(r=n - m, n=n))
+        return removed
 
     def dot_str(self, wrap=10, **kwargs):
         """Return dot string.
@@ -1282,9 +1581,12 @@ def str2singleton(ap_label):
     can be passed as str '*' instead.
     """
     if isinstance(ap_label, str):
-        logger.debug('Saw str state label:\n\t' + str(ap_label))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug('Saw str state label:\n\t' + str(ap_label))
         ap_label = {ap_label}
-        logger.debug('Replaced with singleton:\n\t' + str(ap_label) + '\n')
+        if debug:
+            logger.debug('Replaced with singleton:\n\t' + str(ap_label) + '\n')
     return ap_label
 
 
@@ -1318,3 +1620,178 @@ def prepend_with(states, prepend_str):
     if prepend_str is None:
         return states
     return [prepend_str + str(s) for s in states]
+
+
+def _as_list(x):
+    """Return C{list} of the items of sequence C{x}.
+
+    Items of C{numpy} arrays are converted to python scalars,
+    so that they can be used as nodes.
+    """
+    if hasattr(x, 'tolist'):
+        return x.tolist()
+    return list(x)
+
+
+def _label_key(d):
+    """Return hashable form of label C{d}, or C{None}."""
+    try:
+        return frozenset(d.items())
+    except TypeError:
+        return None
+
+
+def _label_set(labels):
+    """Return C{set} of hashable forms of C{labels}, or C{None}."""
+    keys = set()
+    for d in labels:
+        key = _label_key(d)
+        if key is None:
+            return None
+        keys.add(key)
+    return keys
+
+
+class _LabelIndex(object):
+    """Nodes and edges of a L{LabeledDiGraph}, by label value.
+
+    Nodes are indexed by C{(key, value)}, and edges by
+    C{(u, key, value)}, where C{u} is the start node.
+    Unlabeled edges are indexed by C{(u, None, None)},
+    because they match any label.
+    Sets are indexed as C{frozenset}, and other unhashable
+    values are not indexed.
+
+    Each indexed label remembers its node or edge, and appends
+    itself to C{changes} when assigned (see L{TypedDict}).
+    The changed labels are indexed again before each lookup.
+    Entries of removed nodes or edges, and of old values,
+    are dropped when a lookup reaches them.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.nodes = dict()
+        self.edges = dict()
+        self.changes = list()
+        for n, d in graph.nodes_iter(data=True):
+            self.add_node(n, d)
+        for u, v, key, d in graph.edges_iter(keys=True, data=True):
+            self.add_edge(u, v, key, d)
+
+    def add_node(self, n, d):
+        d._element = (n,)
+        d._changes = self.changes
+        for k, x in d.items():
+            x = _index_key(x)
+            if x is _UNINDEXABLE:
+                continue
+            self.nodes.setdefault((k, x), dict())[n] = None
+
+    def add_edge(self, u, v, key, d):
+        d._element = (u, v, key)
+        d._changes = self.changes
+        entry = (v, key, d)
+        if not d:
+            self.edges.setdefault((u, None, None), dict())[id(d)] = entry
+        for k, x in d.items():
+            x = _index_key(x)
+            if x is _UNINDEXABLE:
+                continue
+            self.edges.setdefault((u, k, x), dict())[id(d)] = entry
+
+    def update(self):
+        """Index again the labels that changed."""
+        graph = self.graph
+        changes = self.changes
+        while changes:
+            d = changes.pop()
+            e = d._element
+            if len(e) == 1:
+                (n,) = e
+                if graph.node.get(n) is d:
+                    self.add_node(n, d)
+                continue
+            u, v, key = e
+            if graph.succ.get(u, {}).get(v, {}).get(key) is d:
+                self.add_edge(u, v, key, d)
+
+    def indexable_key(self, desired, types):
+        """Return a key of C{desired} with indexable value, or C{None}.
+
+        Keys with callable label types are skipped, because
+        their values are guards (see L{label_is_desired}).
+        """
+        for k, x in desired.items():
+            if hasattr(types.get(k), '__call__'):
+                continue
+            if _index_key(x) is not _UNINDEXABLE:
+                return k
+        return None
+
+    def find_nodes(self, k, x):
+        """Return C{list} of nodes with value C{x} at key C{k}."""
+        self.update()
+        x = _index_key(x)
+        bucket = self.nodes.get((k, x))
+        if not bucket:
+            return list()
+        nodes = self.graph.node
+        found = list()
+        stale = list()
+        for n in bucket:
+            d = nodes.get(n)
+            if d is None or _index_key(d.get(k, _UNINDEXABLE)) != x:
+                stale.append(n)
+            else:
+                found.append(n)
+        for n in stale:
+            del bucket[n]
+        return found
+
+    def find_edges(self, u, k, x):
+        """Return C{list} of edges from C{u} that may match C{x} at C{k}.
+
+        These are the edges labeled with value C{x} at key C{k},
+        and the unlabeled edges.
+        """
+        self.update()
+        x = _index_key(x)
+        succ = self.graph.succ.get(u, {})
+        found = list()
+        for bkey in ((u, k, x), (u, None, None)):
+            bucket = self.edges.get(bkey)
+            if not bucket:
+                continue
+            stale = list()
+            for i, (v, key, d) in bucket.items():
+                if succ.get(v, {}).get(key) is not d:
+                    stale.append(i)
+                elif bkey[1] is None and d:
+                    stale.append(i)
+                elif (bkey[1] is not None and
+                        _index_key(d.get(k, _UNINDEXABLE)) != x):
+                    stale.append(i)
+                else:
+                    found.append((u, v, d))
+            for i in stale:
+                del bucket[i]
+        return found
+
+
+# marks values that cannot be indexed
+_UNINDEXABLE = object()
+
+
+def _index_key(x):
+    """Return hashable form of label value C{x}, or C{_UNINDEXABLE}."""
+    if isinstance(x, (set, frozenset)):
+        try:
+            return frozenset(x)
+        except TypeError:
+            return _UNINDEXABLE
+    try:
+        hash(x)
+    except TypeError:
+        return _UNINDEXABLE
+    return x
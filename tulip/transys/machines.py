@@ -36,6 +36,7 @@ from __future__ import print_function
 import copy
 from pprint import pformat
 from random import choice
+import numpy as np
 from tulip.transys.labeled_graphs import LabeledDiGraph
 # inline imports:
 #
@@ -419,6 +420,8 @@ class MealyMachine(Transducer):
     """
 
     def __init__(self):
+        # see `reaction`
+        self._reactions = dict()
         Transducer.__init__(self)
         # will point to selected values of self._transition_label_def
         self.dot_node_shape = {'normal': 'ellipse'}
@@ -483,6 +486,7 @@ class MealyMachine(Transducer):
             keys are port_names (see arg: new_outputs)
             each function returns bool
         """
+        self._reactions.clear()
         for port_name, port_type in new_outputs.items():
             # append
             self._transition_label_def[port_name] = port_type
@@ -523,7 +527,24 @@ class MealyMachine(Transducer):
         @return: output values and next state.
         @rtype: (outputs, next_state)
           where C{outputs}: C{{'port_name':port_value, ...}}
+
+        The edges from each state are indexed by their input values
+        the first time that the state reacts, so later reactions
+        look up the transition in a C{dict}, see L{_reaction_table}.
         """
+        ports = self.inputs
+        key = tuple((k, inputs[k]) for k in ports if k in inputs)
+        # all inputs given and all are ports ?
+        if (not lazy or len(key) == len(ports)) and len(key) == len(inputs):
+            table = self._reaction_table(from_state)
+            try:
+                enabled = table.get(key, ()) if table is not None else ()
+            except TypeError:
+                enabled = ()
+            if len(enabled) == 1:
+                ((next_state, outputs), ) = enabled
+                return (next_state, dict(outputs))
+        # no match, nondeterminism, or partial inputs
         if lazy:
             restricted_inputs = set(self.inputs).intersection(inputs.keys())
         else:
@@ -568,6 +589,73 @@ class MealyMachine(Transducer):
         outputs = project_dict(attr_dict, self.outputs)
         return (next_state, outputs)
 
+    def _reaction_table(self, from_state):
+        """Return C{dict} of the edges from C{from_state}, by inputs.
+
+        Each key is a C{tuple} of pairs of input port and value,
+        in the order of C{self.inputs}, and each value a C{list}
+        of pairs of next state and output values.
+        The table is stored until an edge from C{from_state}
+        is added or removed, a node is removed, or ports are added.
+        Changes of labels in place, for example C{m[u][v][0]['x'] = 1},
+        are not tracked.
+
+        @return: C{None} if some input value is not hashable
+        @rtype: C{dict}
+        """
+        if from_state in self._reactions:
+            return self._reactions[from_state]
+        ports = self.inputs
+        table = dict()
+        try:
+            for _, v, d in self.edges_iter([from_state], data=True):
+                key = tuple((k, d[k]) for k in ports if k in d)
+                if key not in table:
+                    table[key] = list()
+                table[key].append((v, project_dict(d, self.outputs)))
+        except TypeError:
+            table = None
+        self._reactions[from_state] = table
+        return table
+
+    def add_inputs(self, new_inputs, masks=None):
+        """Wrapper of L{Transducer.add_inputs}."""
+        self._reactions.clear()
+        Transducer.add_inputs(self, new_inputs, masks)
+
+    def add_edge(self, u, v, key=None, attr_dict=None, check=True, **attr):
+        """Wrapper of L{LabeledDiGraph.add_edge}."""
+        self._reactions.pop(u, None)
+        Transducer.add_edge(self, u, v, key=key, attr_dict=attr_dict,
+                            check=check, **attr)
+
+    def add_edges_from_arrays(self, from_nodes, to_nodes, labels=None,
+                              check=True, **attr):
+        """Wrapper of L{LabeledDiGraph.add_edges_from_arrays}."""
+        self._reactions.clear()
+        Transducer.add_edges_from_arrays(
+            self, from_nodes, to_nodes, labels=labels, check=check, **attr)
+
+    def remove_edge(self, u, v, key=None):
+        """Wrapper of C{networkx.MultiDiGraph.remove_edge}."""
+        self._reactions.pop(u, None)
+        Transducer.remove_edge(self, u, v, key=key)
+
+    def remove_node(self, n):
+        """Wrapper of C{networkx.MultiDiGraph.remove_node}."""
+        self._reactions.clear()
+        Transducer.remove_node(self, n)
+
+    def remove_nodes_from(self, nbunch):
+        """Wrapper of C{networkx.MultiDiGraph.remove_nodes_from}."""
+        self._reactions.clear()
+        Transducer.remove_nodes_from(self, nbunch)
+
+    def clear(self):
+        """Wrapper of C{networkx.MultiDiGraph.clear}."""
+        self._reactions.clear()
+        Transducer.clear(self)
+
     def reactionpart(self, from_state, inputs):
         """Wraps reaction() with lazy=True
         """
@@ -637,6 +725,247 @@ def guided_run(mealy, from_state=None, input_sequences=None):
     return (states_seq, output_seqs)
 
 
+class MealyTable(object):
+    """Transition table of a Mealy machine, for running many traces.
+
+    The states and the values of each port are coded by integers:
+    the code of C{states[i]} is C{i}, and the code of
+    C{input_values[port][i]} is C{i}.  The values of each port are
+    sorted, if possible.  L{run} advances many input sequences at once,
+    in lockstep, with C{numpy} operations at each step.
+
+    The table is a copy, so later changes to the machine are ignored.
+
+    Example
+    =======
+    >>> table = MealyTable(mealy)
+    >>> x = table.encode('x', [[0, 1, 1], [1, 1, 0]])
+    >>> states, outputs, status = table.run(dict(x=x))
+    >>> table.decode('y', outputs['y'])
+
+    Each entry of C{status} is one of C{MealyTable.OK},
+    C{INVALID_INPUT}, C{DEAD_END}, C{NONDETERMINISTIC}.
+    """
+
+    OK = 0
+    INVALID_INPUT = 1
+    DEAD_END = 2
+    NONDETERMINISTIC = 3
+
+    def __init__(self, mealy):
+        self.states = list(mealy)
+        self.initial = list(mealy.states.initial)
+        self.inputs = list(mealy.inputs)
+        self.outputs = list(mealy.outputs)
+        edges = mealy.edges(data=True)
+        self.input_values = {
+            k: _port_values(mealy.inputs[k], k, edges)
+            for k in self.inputs}
+        self.output_values = {
+            k: _port_values(mealy.outputs[k], k, edges)
+            for k in self.outputs}
+        self._state_code = {u: i for i, u in enumerate(self.states)}
+        self._codes = {
+            k: {x: i for i, x in enumerate(values)}
+            for d in (self.input_values, self.output_values)
+            for k, values in d.items()}
+        # letters are the input codes in mixed radix
+        n_letters = 1
+        self._radix = list()
+        for k in self.inputs:
+            self._radix.append(n_letters)
+            n_letters *= max(len(self.input_values[k]), 1)
+        if n_letters * max(len(self.states), 1) >= 2**63:
+            raise ValueError(
+                'too many combinations of input values: {n}'.format(
+                    n=n_letters))
+        self._n_letters = n_letters
+        self._build(edges)
+
+    def _build(self, edges):
+        """Store edges sorted by (state, letter) key."""
+        keys = list()
+        succ = list()
+        outputs = {k: list() for k in self.outputs}
+        has_edges = np.zeros(len(self.states), dtype=bool)
+        for u, v, d in edges:
+            i = self._state_code[u]
+            has_edges[i] = True
+            letter = self._letter(d)
+            if letter is None:
+                continue
+            keys.append(i * self._n_letters + letter)
+            succ.append(self._state_code[v])
+            for k in self.outputs:
+                outputs[k].append(self._codes[k].get(d.get(k), -1))
+        keys = np.array(keys, dtype=np.int64)
+        order = np.argsort(keys, kind='mergesort')
+        keys = keys[order]
+        # more than one edge for a state and letter ?
+        repeated = np.zeros(len(keys), dtype=bool)
+        if len(keys):
+            same = keys[1:] == keys[:-1]
+            repeated[1:] |= same
+            repeated[:-1] |= same
+        self._keys = keys
+        self._repeated = repeated
+        self._succ = np.array(succ, dtype=np.int64)[order]
+        self._outputs = {
+            k: np.array(x, dtype=np.int64)[order]
+            for k, x in outputs.items()}
+        self._dead_end = ~has_edges
+
+    def _letter(self, label):
+        """Return code of input values in C{label}, or C{None}."""
+        letter = 0
+        for k, radix in zip(self.inputs, self._radix):
+            try:
+                code = self._codes[k].get(label[k])
+            except (KeyError, TypeError):
+                return None
+            if code is None:
+                return None
+            letter += code * radix
+        return letter
+
+    def encode(self, port, values):
+        """Return array of codes of C{values} of input or output C{port}.
+
+        @param values: nested sequences of port values
+        @rtype: C{numpy} integer array, with the shape of C{values}
+        @raise ValueError: if some value is not a value of C{port}
+        """
+        codes = self._codes[port]
+        values = np.asarray(values, dtype=object)
+        try:
+            return np.array(
+                [codes[x] for x in values.ravel()],
+                dtype=np.int64).reshape(values.shape)
+        except KeyError as e:
+            raise ValueError(
+                'not a value of port "{p}": {x}'.format(p=port, x=e))
+
+    def decode(self, port, codes):
+        """Return array of values of C{port}, given their C{codes}.
+
+        Negative codes (steps after a trace stopped) decode to C{None}.
+
+        @rtype: C{numpy} array of C{object}
+        """
+        if port in self.input_values:
+            values = self.input_values[port]
+        else:
+            values = self.output_values[port]
+        values = np.array(list(values) + [None], dtype=object)
+        codes = np.asarray(codes)
+        return values[np.where(codes < 0, len(values) - 1, codes)]
+
+    def run(self, inputs, from_state=None):
+        """Run the machine for each sequence of inputs.
+
+        Like L{guided_run}, but for C{m} sequences of C{n} inputs,
+        and with port values and states coded as integers.
+        A trace stops at the first step where the input is not
+        a valid code, or enables no edge, or enables more than one
+        edge.  The states and outputs of later steps are C{-1}.
+
+        @param inputs: maps each input port to an integer array
+            of shape C{(m, n)}, see L{encode}
+        @type inputs: C{dict}
+
+        @param from_state: start from this state of the machine.
+            If C{None}, then start from the initial state.
+
+        @return: C{(states, outputs, status)}, where:
+            - C{states} is an integer array of shape C{(m, n)}
+              of the states after each step,
+            - C{outputs} maps each output port to an integer array
+              of shape C{(m, n)} of output values,
+            - C{status} is an integer array of shape C{(m,)},
+              C{OK} for the traces that completed, otherwise the
+              reason why the trace stopped
+        @rtype: C{tuple}
+        """
+        missing = set(self.inputs).difference(inputs)
+        if missing:
+            raise ValueError('missing input port(s): {p}'.format(p=missing))
+        arrays = [np.asarray(inputs[k], dtype=np.int64)
+                  for k in self.inputs]
+        shapes = {x.shape for x in arrays}
+        if len(shapes) > 1 or any(len(s) != 2 for s in shapes):
+            raise ValueError(
+                'input arrays must be 2-dimensional, '
+                'of the same shape, got: {s}'.format(s=shapes))
+        if arrays:
+            m, n = arrays[0].shape
+        else:
+            raise ValueError('the machine has no input ports')
+        if from_state is None:
+            from_state = next(iter(self.initial))
+        state = np.full(m, self._state_code[from_state], dtype=np.int64)
+        states = np.full((m, n), -1, dtype=np.int64)
+        outputs = {k: np.full((m, n), -1, dtype=np.int64)
+                   for k in self.outputs}
+        status = np.zeros(m, dtype=np.int64)
+        sizes = [len(self.input_values[k]) for k in self.inputs]
+        n_keys = len(self._keys)
+        for t in range(n):
+            active = status == self.OK
+            if not active.any():
+                break
+            key = state * self._n_letters
+            valid = np.ones(m, dtype=bool)
+            for x, radix, size in zip(arrays, self._radix, sizes):
+                code = x[:, t]
+                valid &= (code >= 0) & (code < size)
+                key += code * radix
+            if n_keys:
+                pos = np.minimum(np.searchsorted(self._keys, key), n_keys - 1)
+                found = valid & (self._keys[pos] == key)
+                repeated = self._repeated[pos]
+            else:
+                pos = np.zeros(m, dtype=np.int64)
+                found = np.zeros(m, dtype=bool)
+                repeated = found
+            stop = active & ~found
+            status[stop] = np.where(
+                self._dead_end[state[stop]],
+                self.DEAD_END, self.INVALID_INPUT)
+            nondet = active & found & repeated
+            status[nondet] = self.NONDETERMINISTIC
+            ok = active & found & ~repeated
+            p = pos[ok]
+            state[ok] = self._succ[p]
+            states[ok, t] = state[ok]
+            for k, y in outputs.items():
+                y[ok, t] = self._outputs[k][p]
+        return states, outputs, status
+
+
+def _port_values(port_type, port, edges):
+    """Return C{list} of values of C{port}, sorted if possible.
+
+    If C{port_type} is not iterable, then collect
+    the values that label C{edges}.
+    """
+    try:
+        values = list(port_type)
+    except TypeError:
+        values = list()
+        seen = set()
+        for _, _, d in edges:
+            x = d.get(port)
+            if x is None or x in seen:
+                continue
+            seen.add(x)
+            values.append(x)
+    try:
+        values.sort()
+    except TypeError:
+        pass
+    return values
+
+
 def random_run(mealy, from_state=None, N=10):
     """Return run from given state for N random inputs.
 
@@ -748,6 +748,10 @@ class TypedDict(dict):
     # credits for debugging this go here:
     #   http://stackoverflow.com/questions/2060972/
 
+    # if a list, then the dict appends itself to it
+    # when an item is set (used for indexing labels)
+    _changes = None
+
     def __init__(self, *args, **kwargs):
         self.update(*args, **kwargs)
         self.allowed_values = dict()
@@ -773,6 +777,8 @@ class TypedDict(dict):
                 + str(self.allowed_values[i]))
             raise ValueError(msg)
         super(TypedDict, self).__setitem__(i, y)
+        if self._changes is not None:
+            self._changes.append(self)
 
     def __str__(self):
         return 'TypedDict(' + dict.__str__(self) + ')'
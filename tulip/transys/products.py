@@ -81,8 +81,10 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
             )
             warnings.warn(msg)
 
+        debug = logger.isEnabledFor(logging.DEBUG)
         for s0 in s0s:
-            logger.debug('initial state:\t' + str(s0))
+            if debug:
+                logger.debug('initial state:\t' + str(s0))
 
             for q0 in q0s:
                 enabled_ba_trans = find_ba_succ(q0, s0, ts, ba)
@@ -115,8 +117,10 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
         ts = self.ts
         ba = self.ba
 
-        logger.debug('Creating successors from'
-                     ' product state:\t' + str(sq))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug('Creating successors from'
+                         ' product state:\t' + str(sq))
 
         # get next states
         next_ss = ts.states.post(s)
@@ -137,8 +141,9 @@ class OnTheFlyProductAutomaton(automata.BuchiAutomaton):
 
         # new_sqs = {x for x in next_sqs if x not in self}
 
-        logger.debug('next product states: ' + str(next_sqs))
-        logger.debug('new unvisited product states: ' + str(new_sqs))
+        if debug:
+            logger.debug('next product states: ' + str(next_sqs))
+            logger.debug('new unvisited product states: ' + str(new_sqs))
 
         return new_sqs
 
@@ -225,8 +230,10 @@ def ts_ba_sync_prod(transition_system, buchi_automaton):
             'Did you forget to define initial states ?')
         warnings.warn(msg)
 
+    debug = logger.isEnabledFor(logging.DEBUG)
     for s0 in s0s:
-        logger.debug('initial state:\t' + str(s0))
+        if debug:
+            logger.debug('initial state:\t' + str(s0))
 
         for q0 in q0s:
             enabled_ba_trans = find_ba_succ(q0, s0, fts, ba)
@@ -255,7 +262,8 @@ def ts_ba_sync_prod(transition_system, buchi_automaton):
         visited.add(sq)
         (s, q) = sq
 
-        logger.debug('Current product state:\t' + str(sq))
+        if debug:
+            logger.debug('Current product state:\t' + str(sq))
 
         # get next states
         next_ss = fts.states.post(s)
@@ -273,10 +281,11 @@ def ts_ba_sync_prod(transition_system, buchi_automaton):
             next_sqs.update(new_sqs)
             accepting_states_preimage.update(new_accepting)
 
-        logger.debug('next product states: ' + str(next_sqs))
         # discard visited & push them to queue
         new_sqs = {x for x in next_sqs if x not in visited}
-        logger.debug('new unvisited product states: ' + str(new_sqs))
+        if debug:
+            logger.debug('next product states: ' + str(next_sqs))
+            logger.debug('new unvisited product states: ' + str(new_sqs))
         queue.update(new_sqs)
 
     return (prodts, accepting_states_preimage)
@@ -284,8 +293,9 @@ def ts_ba_sync_prod(transition_system, buchi_automaton):
 
 def find_ba_succ(prev_q, next_s, fts, ba):
     q = prev_q
-
-    logger.debug('Next state:\t' + str(next_s))
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug('Next state:\t' + str(next_s))
     try:
         ap = fts.node[next_s]['ap']
     except:
@@ -294,19 +304,21 @@ def find_ba_succ(prev_q, next_s, fts, ba):
             '\n Did you forget labeing it ?')
 
     Sigma_dict = {'letter': ap}
-    logger.debug("Next state's label:\t" + str(ap))
+    if debug:
+        logger.debug("Next state's label:\t" + str(ap))
+    # look up transitions by letter
+    ba.index_labels()
 
     enabled_ba_trans = ba.transitions.find(
         [q], with_attr_dict=Sigma_dict)
     enabled_ba_trans += ba.transitions.find(
         [q], letter={True})
-    logger.debug('Enabled BA transitions:\n\t' +
-                 str(enabled_ba_trans))
-
-    if not enabled_ba_trans:
-        logger.debug('No enabled BA transitions at: ' + str(q))
-
-    logger.debug('---\n')
+    if debug:
+        logger.debug('Enabled BA transitions:\n\t' +
+                     str(enabled_ba_trans))
+        if not enabled_ba_trans:
+            logger.debug('No enabled BA transitions at: ' + str(q))
+        logger.debug('---\n')
 
     return enabled_ba_trans
 
@@ -316,6 +328,7 @@ def find_prod_succ(prev_sq, next_s, enabled_ba_trans, product, ba, fts):
 
     new_accepting = set()
     next_sqs = set()
+    debug = logger.isEnabledFor(logging.DEBUG)
     for (curq, next_q, sublabels) in enabled_ba_trans:
         assert(curq == q)
 
@@ -325,7 +338,8 @@ def find_prod_succ(prev_sq, next_s, enabled_ba_trans, product, ba, fts):
             next_sqs.add(new_sq)
             product.states.add(new_sq)
 
-            logger.debug('Adding state:\t' + str(new_sq))
+            if debug:
+                logger.debug('Adding state:\t' + str(new_sq))
 
         if hasattr(product, 'actions'):
             product.states[new_sq]['ap'] = {next_q}
@@ -333,11 +347,13 @@ def find_prod_succ(prev_sq, next_s, enabled_ba_trans, product, ba, fts):
         # accepting state ?
         if next_q in ba.states.accepting:
             new_accepting.add(new_sq)
-            logger.debug(str(new_sq) +
-                         ' contains an accepting state.')
+            if debug:
+                logger.debug(str(new_sq) +
+                             ' contains an accepting state.')
 
-        logger.debug('Adding transitions:\t' +
-                     str(prev_sq) + '--->' + str(new_sq))
+        if debug:
+            logger.debug('Adding transitions:\t' +
+                         str(prev_sq) + '--->' + str(new_sq))
 
         # is fts transition labeled with an action ?
         enabled_ts_trans = fts.transitions.find(
@@ -347,8 +363,9 @@ def find_prod_succ(prev_sq, next_s, enabled_ba_trans, product, ba, fts):
             assert(from_s == s)
             assert(to_s == next_s)
 
-            logger.debug('Sublabel value:\n\t' +
-                         str(sublabel_values))
+            if debug:
+                logger.debug('Sublabel value:\n\t' +
+                             str(sublabel_values))
 
             # labeled transition ?
             if hasattr(product, 'alphabet'):
@@ -406,13 +423,15 @@ def ba_ts_sync_prod(buchi_automaton, transition_system):
     # which would generate a combinatorially large alphabet
     prod_ba.alphabet.math_set |= buchi_automaton.alphabet.math_set
 
+    debug = logger.isEnabledFor(logging.DEBUG)
     for (from_state, to_state) in prod_ts.transitions():
         # prject prod_TS state to TS state
         ts_to_state = to_state[0]
-        msg = (
-            'prod_TS: to_state =\n\t' + str(to_state) + '\n'
-            'TS: ts_to_state =\n\t' + str(ts_to_state))
-        logger.debug(msg)
+        if debug:
+            msg = (
+                'prod_TS: to_state =\n\t' + str(to_state) + '\n'
+                'TS: ts_to_state =\n\t' + str(ts_to_state))
+            logger.debug(msg)
 
         state_label_pairs = transition_system.states.find(ts_to_state)
         (ts_to_state_, transition_label_dict) = state_label_pairs[0]
@@ -420,3 +439,159 @@ def ba_ts_sync_prod(buchi_automaton, transition_system):
         prod_ba.transitions.add(
             from_state, to_state, letter=transition_label_value)
     return prod_ba
+
+
+def find_accepting_lasso(transition_system, buchi_automaton):
+    """Return an accepting run of the product TS * BA, or C{None}.
+
+    The product is the same as in L{ts_ba_sync_prod}, but it is
+    explored on the fly: successors of product states are computed
+    when the search reaches them, and only the visited product states
+    are stored, not the edges or labels of the product.
+
+    The search is the nested depth-first search of [CVWY92].
+    It stops as soon as it finds a reachable cycle through an
+    accepting state, so if C{buchi_automaton} accepts the runs that
+    violate a property, then the result is a counterexample.
+
+    Example
+    =======
+    >>> lasso = find_accepting_lasso(ts, ba)
+    >>> if lasso is not None:
+    ...     prefix, cycle = lasso
+    ...     path = [s for s, q in prefix + cycle[1:]]
+
+    References
+    ==========
+    1. Courcoubetis C.; Vardi M.; Wolper P.; Yannakakis M.
+       "Memory-efficient algorithms for the verification of
+       temporal properties"
+       Formal Methods in System Design, 1(2-3), pp. 275-288, 1992
+
+    @type transition_system: L{FiniteTransitionSystem}
+        or L{CompactFTS}
+    @type buchi_automaton: L{BuchiAutomaton}
+
+    @return: C{None} if the product accepts no run, otherwise
+        C{(prefix, cycle)}, where C{prefix} is a path from an
+        initial product state to an accepting product state,
+        and C{cycle} a path from that state back to itself.
+        Product states are pairs C{(s, q)} of TS and BA states.
+    @rtype: C{tuple} of C{list}, or C{None}
+    """
+    if not hasattr(buchi_automaton, 'alphabet'):
+        msg = 'buchi_automaton not transys.BuchiAutomaton.\n'
+        msg += 'Actual type passed: ' + str(type(buchi_automaton))
+        raise TypeError(msg)
+    product = _LazyProduct(transition_system, buchi_automaton)
+    accepting = buchi_automaton.states.accepting
+    # outer search
+    visited = set()
+    # inner searches share the states they visit
+    flagged = set()
+    for sq0 in product.initial():
+        if sq0 in visited:
+            continue
+        visited.add(sq0)
+        stack = [(sq0, iter(product.post(sq0)))]
+        while stack:
+            sq, succ = stack[-1]
+            for sq_next in succ:
+                if sq_next not in visited:
+                    visited.add(sq_next)
+                    stack.append((sq_next, iter(product.post(sq_next))))
+                    break
+            else:
+                # postorder, so seeds are searched in the order
+                # that makes shared `flagged` states sound
+                stack.pop()
+                if sq[1] not in accepting:
+                    continue
+                cycle = _find_cycle(sq, product, flagged)
+                if cycle is None:
+                    continue
+                prefix = [x for x, _ in stack]
+                prefix.append(sq)
+                logger.info((
+                    'found accepting lasso after visiting '
+                    '{n} product states').format(
+                        n=len(visited) + len(flagged)))
+                return prefix, cycle
+    logger.info((
+        'no accepting lasso, visited {n} product states').format(
+            n=len(visited) + len(flagged)))
+    return None
+
+
+def _find_cycle(seed, product, flagged):
+    """Return path from C{seed} to itself, or C{None}.
+
+    The search avoids the states in C{flagged},
+    and adds to C{flagged} those it visits.
+    """
+    stack = [(seed, iter(product.post(seed)))]
+    while stack:
+        sq, succ = stack[-1]
+        for sq_next in succ:
+            if sq_next == seed:
+                cycle = [x for x, _ in stack]
+                cycle.append(seed)
+                return cycle
+            if sq_next not in flagged:
+                flagged.add(sq_next)
+                stack.append((sq_next, iter(product.post(sq_next))))
+                break
+        else:
+            stack.pop()
+    return None
+
+
+class _LazyProduct(object):
+    """Successors of states in the product TS * BA, see L{ts_ba_sync_prod}.
+
+    BA successors are cached for each BA state and TS label.
+    """
+
+    def __init__(self, ts, ba):
+        self.ts = ts
+        self.ba = ba
+        self._ba_post = dict()
+        # look up transitions by letter
+        ba.index_labels()
+
+    def initial(self):
+        """Return C{list} of initial product states."""
+        s0s = self.ts.states.initial
+        if not s0s:
+            msg = (
+                'Transition System has no initial states !\n'
+                '=> Empty product system.\n'
+                'Did you forget to define initial states ?')
+            warnings.warn(msg)
+        return [(s0, q)
+                for s0 in s0s
+                for q0 in self.ba.states.initial
+                for q in self._post_ba(q0, s0)]
+
+    def post(self, sq):
+        """Return C{list} of successors of product state C{sq}."""
+        s, q = sq
+        return [(next_s, next_q)
+                for next_s in self.ts.states.post(s)
+                for next_q in self._post_ba(q, next_s)]
+
+    def _post_ba(self, q, next_s):
+        """Return BA states reached from C{q} by reading C{next_s}."""
+        ap = self.ts.node[next_s]['ap']
+        key = (q, frozenset(ap))
+        r = self._ba_post.get(key)
+        if r is None:
+            trans = self.ba.transitions.find(
+                [q], with_attr_dict={'letter': ap})
+            trans += self.ba.transitions.find([q], letter={True})
+            r = list()
+            for _, next_q, _ in trans:
+                if next_q not in r:
+                    r.append(next_q)
+            self._ba_post[key] = r
+        return r
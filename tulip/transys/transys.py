@@ -37,8 +37,6 @@ from pprint import pformat
 from tulip.transys.labeled_graphs import (
     LabeledDiGraph, str2singleton, prepend_with)
 from tulip.transys.mathset import PowerSet, MathSet
-from networkx import MultiDiGraph
-import numpy as np
 # inline imports
 #
 # from tulip.transys.export import graph2promela
@@ -563,6 +561,7 @@ def tuple2fts(S, S0, AP, L, Act, trans, name='fts',
     # note: verbosity before actions below
     # to avoid screening by possible error caused by action
 
+    debug = logger.isEnabledFor(logging.DEBUG)
     # state labeling assigned ?
     if state_labeling is not None:
         for state, ap_label in state_labeling:
@@ -570,26 +569,29 @@ def tuple2fts(S, S0, AP, L, Act, trans, name='fts',
                 ap_label = set()
             ap_label = str2singleton(ap_label)
             state = prepend_str + str(state)
-            logger.debug('Labeling state:\n\t' + str(state) + '\n' +
-                         'with label:\n\t' + str(ap_label) + '\n')
+            if debug:
+                logger.debug('Labeling state:\n\t' + str(state) + '\n' +
+                             'with label:\n\t' + str(ap_label) + '\n')
             ts.states[state]['ap'] = ap_label
     # any transition labeling ?
     if actions is None:
         for from_state, to_state in transitions:
             (from_state, to_state) = prepend_with([from_state, to_state],
                                                   prepend_str)
-            logger.debug('Added unlabeled edge:\n\t' + str(from_state) +
-                         '--->' + str(to_state) + '\n')
+            if debug:
+                logger.debug('Added unlabeled edge:\n\t' + str(from_state) +
+                             '--->' + str(to_state) + '\n')
             ts.transitions.add(from_state, to_state)
     else:
         ts.actions |= actions
         for from_state, to_state, act in transitions:
             (from_state, to_state) = prepend_with([from_state, to_state],
                                                   prepend_str)
-            logger.debug(
-                'Added labeled edge (=transition):\n\t' +
-                str(from_state) + '---[' + str(act) + ']--->' +
-                str(to_state) + '\n')
+            if debug:
+                logger.debug(
+                    'Added labeled edge (=transition):\n\t' +
+                    str(from_state) + '---[' + str(act) + ']--->' +
+                    str(to_state) + '\n')
             ts.transitions.add(from_state, to_state, actions=act)
     return ts
 
@@ -790,32 +792,19 @@ class LabeledGameGraph(GameGraph):
         self.dot_node_shape = {'normal': 'rectangle'}
 
 
-def _pre(graph, list_n):
-    """Find union of predecessors of nodes in graph defined by C{MultiDiGraph}.
-
-    @param graph: a graph structure corresponding to a FTS.
-    @type graph: C{networkx.MultiDiGraph}
-    @param list_n: list of nodes whose predecessors need to be returned
-    @type list_n: list of nodes in C{graph}
-    @return: set of predecessors of C{list_n}
-    @rtype: C{set}
-    """
-    pre_set = set()
-    for n in list_n:
-        pre_set = pre_set.union(graph.predecessors(n))
-    return pre_set
-
-
 def _output_fts(ts, transitions, sol):
-    """Convert the Part from C{nx.MultiDiGraph} to FTS.
+    """Return the FTS with cells C{sol} as states and C{transitions}.
 
     The returned FTS does not contain any edge attribute in the original FTS.
     All the transitions are assumed to be controllable.
 
     @param ts: the input finite transition system
     @type ts: L{FTS}
-    @param Part: the final partition
-    @type Part: C{networkx.MultiDiGraph}
+    @param transitions: pairs C{(i, j)} of cells, for each transition
+        from cell C{i} to cell C{j}
+    @type transitions: C{set} of C{tuple}
+    @param sol: the cells, as sets of states of C{ts}
+    @type sol: C{list} of C{set}
 
     @return: the bi/dual simulation abstraction, and the
         partition of states in input ts
@@ -853,10 +842,7 @@ def _output_fts(ts, transitions, sol):
     ts_simu.atomic_propositions.add_from(AP)
     for i in range(n_cells):
         ts_simu.states.add(i, ap=ts.node[next(iter(sol[i]))]['ap'])
-    for i in range(n_cells):
-        for j in range(n_cells):
-            if transitions[j, i]:
-                ts_simu.transitions.add(i, j)
+    ts_simu.transitions.add_from(sorted(transitions))
     return ts_simu, Part_hash
 
 
@@ -865,12 +851,17 @@ def simu_abstract(ts, simu_type):
 
     @param ts: input finite transition system, the one you want to get
                     its bi/dual-simulation abstraction.
-    @type ts: L{FTS}
+    @type ts: L{FTS} or L{CompactFTS}
     @param simu_type: string 'bi'/'dual', flag used to switch b.w.
                       bisimulation algorithm and dual-simulation algorithm.
     @return: the bi/dual simulation, and the corresponding partition.
     @rtype: L{FTS}, C{dict}
 
+    The bisimulation is computed by partition refinement [PT87],
+    in time C{O(m log n)} for C{m} edges and C{n} states,
+    see L{_bisimulation}.  The cells of the dual simulation
+    are computed by L{_dual_simulation}.
+
 
     References
     ==========
@@ -878,74 +869,213 @@ def simu_abstract(ts, simu_type):
     1. Wagenmaker, A. J.; Ozay, N.
        "A Bisimulation-like Algorithm for Abstracting Control Systems."
        54th Annual Allerton Conference on CCC 2016
+
+    2. Paige, R.; Tarjan, R. E.
+       "Three partition refinement algorithms."
+       SIAM Journal on Computing, 16(6), pp. 973-989, 1987
     """
-    # create MultiDiGraph instance from the input FTS
-    G = MultiDiGraph(ts)
     # build coarsest partition
     S0 = dict()
-    Part = MultiDiGraph()  # a graph associated with the new partition
-    n_cells = 0
-    hash_ap = dict()  # map ap to cells in Part
-    for node in G:
-        ap = repr(G.node[node]['ap'])
+    for node in ts:
+        ap = repr(ts.node[node]['ap'])
         if ap not in S0:
             S0[ap] = set()
-            hash_ap[ap] = set()
-            Part.add_node(n_cells, ap=ap, cov=S0[ap])  # hash table S0--->G
-            n_cells += 1
         S0[ap].add(node)
-
-    sol = []
-    for ap in S0:
-        sol.append(S0[ap])
-
-    IJ = np.ones([n_cells, n_cells])
-    transitions = np.zeros([n_cells, n_cells])
-    while np.sum(IJ) > 0:
-        # get i,j from IJ matrix, i--->j
-        ind = np.nonzero(IJ)
-        i = ind[1][0]
-        j = ind[0][0]
-        IJ[j, i] = 0
-        si = sol[i]
-        sj = sol[j]
-        pre_j = _pre(G, sj)
-        if si.issubset(pre_j):
-            transitions[j, i] = 1
-        else:
-            isect = si.intersection(pre_j)
-            if isect == set():
-                continue
-            else:
-                # check if the isect has existed
-                check_isect = False
-                if simu_type == 'dual':
-                    assert len(sol) == n_cells
-                    for k in range(n_cells):
-                        if sol[k] == isect:
-                            check_isect = True
-                            break
-                if not check_isect:
-                    # assume that i != j
-                    sol.append(isect)
-                    # update transition matrix
-                    transitions = np.pad(transitions, (0, 1), 'constant')
-                    transitions[n_cells, :] = 0
-                    transitions[:, n_cells] = transitions[:, i]
-                    transitions[j, n_cells] = 1
-                    if simu_type == 'bi':
-                        sol[i] = sol[i].difference(sol[n_cells])
-                        transitions[i, :] = 0
-                        if i == j:
-                            transitions[j, n_cells] = 0
-                    # update IJ matrix
-                    IJ = np.pad(IJ, (0, 1), 'constant', constant_values=1)
-                    if simu_type == 'bi':
-                        IJ[i, :] = 1
-                        IJ[:, i] = 1
-                    n_cells += 1
-                else:
-                    transitions[j, k] = 1
-        IJ = ((IJ - transitions) > 0).astype(int)
+    sol = [S0[ap] for ap in S0]
+    edges = ts.transitions()
+    if simu_type == 'bi':
+        transitions = _bisimulation(sol, edges)
+    elif simu_type == 'dual':
+        transitions = _dual_simulation(sol, edges)
+    else:
+        raise ValueError(
+            'unknown `simu_type`: {t}'.format(t=simu_type))
     [ts_simu, part_hash] = _output_fts(ts, transitions, sol)
     return ts_simu, part_hash
+
+
+def _bisimulation(sol, edges):
+    """Refine C{sol} to the coarsest bisimulation, in place.
+
+    This is the relational coarsest partition algorithm of [PT87].
+    Besides the partition Q of states (the cells in C{sol}),
+    it maintains a coarser partition X, each block of X a union
+    of cells.  Q is stable with respect to each block of X.
+    While some block S of X contains more than one cell, the
+    smaller of two cells B in S is removed from S, and cells are
+    split by C{pre(B)} and C{pre(S - B)}.  The second split uses
+    counts of successors of each state in S, so both splits take
+    time linear in the number of edges into B.  Each state is in a
+    block B at most C{log n} times, so the total time is
+    C{O(m log n)}.
+
+    A cell that splits keeps its index for the states outside the
+    splitter, and the others form a new cell, appended to C{sol}.
+
+    @param sol: initial partition (cells are changed)
+    @type sol: C{list} of C{set}
+    @param edges: pairs of states
+    @return: pairs C{(i, j)} of cells, for each transition
+        from cell C{i} to cell C{j}
+    @rtype: C{set} of C{tuple}
+    """
+    nodes = [u for c in sol for u in c]
+    index = {u: k for k, u in enumerate(nodes)}
+    pairs = {(index[u], index[v]) for u, v in edges}
+    # count[e] is a list that holds the number of successors
+    # of src[e] in the block of X that contains the target of e
+    src = list()
+    pre = [list() for u in nodes]
+    out_degree = [[0] for u in nodes]
+    for e, (u, v) in enumerate(sorted(pairs)):
+        src.append(u)
+        pre[v].append(e)
+        out_degree[u][0] += 1
+    count = [out_degree[u] for u in src]
+    # Q: cells and the cell of each state
+    cells = [{index[u] for u in c} for c in sol]
+    cell_of = [None] * len(nodes)
+    for i, c in enumerate(cells):
+        for u in c:
+            cell_of[u] = i
+    # X: sets of cells and the block of each cell
+    blocks = [set(range(len(cells)))]
+    block_of = [0] * len(cells)
+    compound = [0] if len(cells) > 1 else []
+
+    def split(marked):
+        moved = dict()
+        for u in marked:
+            i = cell_of[u]
+            if i not in moved:
+                moved[i] = set()
+            moved[i].add(u)
+        for i in sorted(moved):
+            c = moved[i]
+            if len(c) == len(cells[i]):
+                continue
+            cells[i] -= c
+            k = len(cells)
+            cells.append(c)
+            for u in c:
+                cell_of[u] = k
+            x = block_of[i]
+            block_of.append(x)
+            blocks[x].add(k)
+            if len(blocks[x]) == 2:
+                compound.append(x)
+
+    split(u for u, d in enumerate(out_degree) if d[0])
+    while compound:
+        x = compound.pop()
+        it = iter(blocks[x])
+        i = next(it)
+        j = next(it)
+        b = i if len(cells[i]) <= len(cells[j]) else j
+        blocks[x].remove(b)
+        if len(blocks[x]) > 1:
+            compound.append(x)
+        block_of[b] = len(blocks)
+        blocks.append({b})
+        B = list(cells[b])
+        # successors of each state in B, and in S (before B is removed)
+        in_b = dict()
+        in_s = dict()
+        for v in B:
+            for e in pre[v]:
+                u = src[e]
+                in_b[u] = in_b.get(u, 0) + 1
+                in_s[u] = count[e]
+        split(in_b)
+        split(u for u, n in in_b.items() if n == in_s[u][0])
+        counts = dict()
+        for v in B:
+            for e in pre[v]:
+                u = src[e]
+                count[e][0] -= 1
+                if u not in counts:
+                    counts[u] = [in_b[u]]
+                count[e] = counts[u]
+    sol[:] = [{nodes[u] for u in c} for c in cells]
+    return {(cell_of[u], cell_of[v]) for u, v in pairs}
+
+
+def _dual_simulation(sol, edges):
+    """Extend C{sol} to the cells of the dual simulation, in place.
+
+    The cells are the closure of C{sol} under the operation that maps
+    cells C{si}, C{sj} to C{si & pre(sj)}, if this set is not empty.
+    Cells are numbered in the order they are found, and each cell
+    is paired with itself and the cells before it.  The intersections
+    for a new cell are collected by following edges from (or to)
+    its states to the cells that contain their successors
+    (or predecessors), so disjoint pairs are never visited.
+    Cells are looked up in a C{dict} by their states.
+
+    @param sol: initial cells (new cells are appended)
+    @type sol: C{list} of C{set}
+    @param edges: pairs of states
+    @return: pairs C{(i, j)} of cells, for each transition
+        from cell C{i} to cell C{j}, i.e., C{si <= pre(sj)}
+    @rtype: C{set} of C{tuple}
+    """
+    post = dict()
+    pre = dict()
+    for c in sol:
+        for u in c:
+            post[u] = set()
+            pre[u] = set()
+    for u, v in edges:
+        post[u].add(v)
+        pre[v].add(u)
+    cells_of = {u: list() for u in post}
+    index = dict()
+    transitions = set()
+
+    def add(c):
+        k = len(sol)
+        index[frozenset(c)] = k
+        for u in c:
+            cells_of[u].append(k)
+        sol.append(c)
+
+    def refine(i, j, isect):
+        if len(isect) == len(sol[i]):
+            transitions.add((i, j))
+            return
+        if frozenset(isect) not in index:
+            add(isect)
+
+    initial = list(sol)
+    del sol[:]
+    for c in initial:
+        add(c)
+    k = 0
+    while k < len(sol):
+        c = sol[k]
+        # sk & pre(sj), for j <= k
+        isects = dict()
+        for u in c:
+            for v in post[u]:
+                for j in cells_of[v]:
+                    if j > k:
+                        break
+                    if j not in isects:
+                        isects[j] = set()
+                    isects[j].add(u)
+        for j in sorted(isects):
+            refine(k, j, isects[j])
+        # sj & pre(sk), for j < k
+        isects = dict()
+        for v in c:
+            for u in pre[v]:
+                for j in cells_of[u]:
+                    if j >= k:
+                        break
+                    if j not in isects:
+                        isects[j] = set()
+                    isects[j].add(u)
+        for j in sorted(isects):
+            refine(j, k, isects[j])
+        k += 1
+    return transitions